@@ -1,48 +1,172 @@
+import argparse
+import time
+
+import numpy as np
 import pandas as pd
 import psycopg2
+from openpyxl import load_workbook
+from psycopg2.extras import execute_values
 
-# Configuración de la conexión a la base de datos
-conn = psycopg2.connect(
-    dbname="alumnos",
-    user="evalua",
-    password="Sismas88+",
-    host="69.46.1.49"
-)
-
-# Crear un cursor
-cursor = conn.cursor()
+from src.cache import invalidate_roster_cache
+from src.config import Config
 
-# Leer el archivo XLSX
-df = pd.read_excel('datos.xlsx')
+COLUMNAS = ['f_desde', 'f_hasta', 'idtec', 'idexa', 'regular', 'tiempo']
 
 # Preparar la consulta de inserción
 insert_query = """
 INSERT INTO turnos (f_desde, f_hasta, idtec, idexa, regular, tiempo)
-VALUES (%s, %s, %s, %s, %s, %s)
+VALUES %s
 """
 
-# Iterar sobre las filas del DataFrame e insertar en la base de datos
-for index, row in df.iterrows():
-    # Mapear las columnas del DataFrame a los campos de la tabla
-    valores = (
-        row['f_desde'],  # Asegúrate de que el nombre de la columna coincida con tu Excel
-        row['f_hasta'], 
-        row['idtec'], 
-        row['idexa'], 
-        row['regular'], 
-        row['tiempo']
-    )
-    
+
+def leer_lotes(archivo, hoja=None, lote=1000):
+    """
+    Recorre la planilla en modo read-only y devuelve DataFrames de a
+    ``lote`` filas, de modo que la memoria no crece con el tamaño del archivo.
+    La columna ``fila`` guarda el número de fila en Excel.
+    """
+    wb = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        ws = wb[hoja] if hoja else wb.worksheets[0]
+        filas = ws.iter_rows(values_only=True)
+        encabezado = [str(c).strip() if c is not None else '' for c in next(filas)]
+        faltantes = [c for c in COLUMNAS if c not in encabezado]
+        if faltantes:
+            raise ValueError(f"Faltan columnas en la planilla: {', '.join(faltantes)}")
+        posiciones = [encabezado.index(c) for c in COLUMNAS]
+
+        buffer = []
+        for numero, fila in enumerate(filas, start=2):
+            if all(v is None for v in fila):
+                continue
+            buffer.append([numero] + [fila[p] if p < len(fila) else None for p in posiciones])
+            if len(buffer) >= lote:
+                yield pd.DataFrame(buffer, columns=['fila'] + COLUMNAS)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=['fila'] + COLUMNAS)
+    finally:
+        wb.close()
+
+
+def validar_lote(df, tecnicaturas, examenes):
+    """
+    Valida un lote completo con operaciones vectorizadas.
+    Devuelve (válidas, rechazadas); las rechazadas llevan la columna ``motivo``.
+    """
+    df = df.copy()
+    df['f_desde'] = pd.to_datetime(df['f_desde'], errors='coerce')
+    df['f_hasta'] = pd.to_datetime(df['f_hasta'], errors='coerce')
+    for columna in ('idtec', 'idexa', 'tiempo'):
+        df[columna] = pd.to_numeric(df[columna], errors='coerce')
+    df['regular'] = df['regular'].astype('string').str.strip().str.upper()
+
+    condiciones = [
+        df['f_desde'].isna() | df['f_hasta'].isna(),
+        df['f_desde'] >= df['f_hasta'],
+        ~df['idtec'].isin(tecnicaturas),
+        ~df['idexa'].isin(examenes),
+        ~df['regular'].isin(['COMPLETO', 'INCOMPLETO']).fillna(False),
+        df['tiempo'].isna() | (df['tiempo'] <= 0),
+    ]
+    motivos = [
+        'fecha inválida',
+        'f_desde debe ser anterior a f_hasta',
+        'idtec desconocido',
+        'idexa desconocido',
+        'regular debe ser COMPLETO o INCOMPLETO',
+        'tiempo inválido',
+    ]
+    df['motivo'] = np.select(condiciones, motivos, default='')
+
+    rechazadas = df[df['motivo'] != '']
+    validas = df[df['motivo'] == ''].astype({'idtec': int, 'idexa': int, 'tiempo': int})
+    return validas, rechazadas
+
+
+def importar_turnos(conn, archivo, hoja=None, lote=1000, dry_run=False):
+    """
+    Importa los turnos de ``archivo`` en una sola transacción, insertando de
+    a ``lote`` filas. Con ``dry_run`` se valida e inserta pero al final se
+    hace rollback. Devuelve (insertadas, rechazadas).
+    """
+    cursor = conn.cursor()
     try:
-        cursor.execute(insert_query, valores)
-    except Exception as e:
-        print(f"Error al insertar fila {index}: {e}")
+        cursor.execute("SELECT id FROM tecnicatura")
+        tecnicaturas = [r[0] for r in cursor.fetchall()]
+        cursor.execute("SELECT id FROM examen")
+        examenes = [r[0] for r in cursor.fetchall()]
+
+        insertadas = 0
+        rechazadas = []
+        for df in leer_lotes(archivo, hoja=hoja, lote=lote):
+            validas, malas = validar_lote(df, tecnicaturas, examenes)
+            rechazadas.extend(zip(malas['fila'], malas['motivo']))
+            if validas.empty:
+                continue
+            valores = list(zip(
+                validas['f_desde'].dt.to_pydatetime(),
+                validas['f_hasta'].dt.to_pydatetime(),
+                validas['idtec'].tolist(),
+                validas['idexa'].tolist(),
+                validas['regular'].tolist(),
+                validas['tiempo'].tolist(),
+            ))
+            execute_values(cursor, insert_query, valores, page_size=lote)
+            insertadas += len(valores)
+
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+        return insertadas, rechazadas
+    except Exception:
         conn.rollback()
-    else:
-        conn.commit()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Importa turnos desde una planilla XLSX')
+    parser.add_argument('archivo', nargs='?', default='datos.xlsx')
+    parser.add_argument('--hoja', help='Nombre de la hoja (por defecto la primera)')
+    parser.add_argument('--lote', type=int, default=1000, help='Filas por INSERT')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Validar e insertar dentro de la transacción, pero sin confirmar')
+    args = parser.parse_args()
+
+    # Configuración de la conexión a la base de datos
+    conn = psycopg2.connect(
+        dbname=Config.DB_NAME,
+        user=Config.DB_USER,
+        password=Config.DB_PASSWORD,
+        host=Config.DB_HOST,
+        port=Config.DB_PORT
+    )
+
+    inicio = time.perf_counter()
+    try:
+        insertadas, rechazadas = importar_turnos(
+            conn, args.archivo, hoja=args.hoja, lote=args.lote, dry_run=args.dry_run
+        )
+    finally:
+        conn.close()
+    duracion = time.perf_counter() - inicio
+
+    for fila, motivo in rechazadas:
+        print(f"Fila {fila} rechazada: {motivo}")
+
+    if args.dry_run:
+        print(f"Dry run: {insertadas} turnos válidos, {len(rechazadas)} rechazados. No se guardó nada.")
+        return
+
+    # Avisar a la aplicación que recargue su índice de turnos
+    invalidate_roster_cache()
+
+    print(f"Inserción de datos completada: {insertadas} turnos en {duracion:.2f}s, "
+          f"{len(rechazadas)} rechazados.")
 
-# Cerrar cursor y conexión
-cursor.close()
-conn.close()
 
-print("Inserción de datos completada.")
\ No newline at end of file
+if __name__ == '__main__':
+    main()
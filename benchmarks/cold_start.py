@@ -0,0 +1,124 @@
+# benchmarks/cold_start.py
+"""
+Cold-start benchmark for the serverless entry point.
+
+Each run starts a fresh interpreter (a cold container), imports
+src.app_factory, builds the app with get_serverless_app() and serves one
+request per ``--path`` through the test client. It reports median
+import / create / first-request times, the heavy modules already loaded
+before the first request and any file written to the working directory:
+
+    python -m benchmarks.cold_start --runs 5 --budget-ms 350
+
+Exit status is 1 when the median cold start (import + create + first
+request) exceeds the budget, a heavy module is imported eagerly or the
+start-up writes files.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+# No deben cargarse antes de la primera request que los use
+HEAVY_MODULES = ['sqlalchemy', 'sendgrid', 'psycopg2', 'src.models', 'src.exam_manager']
+
+_CHILD = r'''
+import json, sys, time
+sys.path.insert(0, {root!r})
+t0 = time.perf_counter()
+from src.app_factory import get_serverless_app
+t1 = time.perf_counter()
+app = get_serverless_app()
+t2 = time.perf_counter()
+heavy = [m for m in {heavy!r} if m in sys.modules]
+client = app.test_client()
+first = {{}}
+for path in {paths!r}:
+    start = time.perf_counter()
+    status = client.get(path).status_code
+    first[path] = {{'ms': (time.perf_counter() - start) * 1000, 'status': status}}
+print(json.dumps({{
+    'import_ms': (t1 - t0) * 1000,
+    'create_ms': (t2 - t1) * 1000,
+    'first_request': first,
+    'heavy_modules': heavy,
+}}))
+'''
+
+
+def _child_env():
+    env = dict(os.environ)
+    # Config.validate() sólo exige que estén definidas; '/' no toca la base
+    for key, value in (('DB_HOST', 'localhost'), ('DB_PORT', '5432'), ('DB_NAME', 'alumnos'),
+                       ('DB_USER', 'evalua'), ('DB_PASSWORD', 'evalua'),
+                       ('FLASK_SECRET_KEY', 'cold-start-benchmark')):
+        env.setdefault(key, value)
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+
+def measure_once(paths=('/',)):
+    """One cold start in a fresh interpreter, run from an empty directory"""
+    script = _CHILD.format(root=PROJECT_ROOT, heavy=HEAVY_MODULES, paths=list(paths))
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=workdir, env=_child_env(),
+            capture_output=True, text=True, check=True
+        )
+        written = sorted(os.listdir(workdir))
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample['files_written'] = written
+    return sample
+
+
+def run(runs=5, paths=('/',)):
+    """Median timings over ``runs`` cold starts"""
+    samples = [measure_once(paths) for _ in range(runs)]
+    first_ms = [sum(p['ms'] for p in s['first_request'].values()) for s in samples]
+    totals = [s['import_ms'] + s['create_ms'] + f for s, f in zip(samples, first_ms)]
+    return {
+        'runs': runs,
+        'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'create_ms': round(statistics.median(s['create_ms'] for s in samples), 1),
+        'first_request_ms': round(statistics.median(first_ms), 1),
+        'cold_start_ms': round(statistics.median(totals), 1),
+        'statuses': {path: r['status'] for path, r in samples[-1]['first_request'].items()},
+        'heavy_modules': sorted({m for s in samples for m in s['heavy_modules']}),
+        'files_written': sorted({f for s in samples for f in s['files_written']}),
+    }
+
+
+def problems(report, budget_ms):
+    found = []
+    if report['cold_start_ms'] > budget_ms:
+        found.append(f"arranque en frío {report['cold_start_ms']}ms > {budget_ms}ms")
+    if report['heavy_modules']:
+        found.append(f"módulos importados antes de tiempo: {', '.join(report['heavy_modules'])}")
+    if report['files_written']:
+        found.append(f"archivos escritos al arrancar: {', '.join(report['files_written'])}")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de arranque en frío (serverless)')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--path', action='append', dest='paths',
+                        help='Ruta de la primera request (repetible; por defecto /)')
+    parser.add_argument('--budget-ms', type=float, default=350.0)
+    args = parser.parse_args(argv)
+
+    report = run(args.runs, args.paths or ['/'])
+    print(json.dumps(report, indent=2, sort_keys=True))
+    found = problems(report, args.budget_ms)
+    for problem in found:
+        print(f"PROBLEMA {problem}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,314 @@
+# benchmarks/endpoints.py
+"""
+Load benchmark for the exam API.
+
+Creates a throwaway Postgres database, seeds it with ``--students``
+students whose turno is open now, loads the Flask app in-process against
+it and drives /validate_dni, /start_exam, /check_exam_status and
+/submit_exam at each ``--concurrency`` level. Half of the accesses are
+submitted through the group commit writer (src/group_commit.py) and
+half one transaction per request (submit_exam_per_request), as at the
+deadline burst. The report (throughput, p50/p95/p99 latency, SQL
+statements and commits per request, errors) is printed as JSON and
+optionally compared with a baseline:
+
+    python -m benchmarks.endpoints \\
+        --admin-url postgresql://postgres@localhost/postgres \\
+        --students 2000 --concurrency 1,16,64 --requests 1000 \\
+        --baseline benchmarks/baseline.json --max-regression 0.25
+
+Exit status is 1 when any metric regresses past the threshold.
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.engine import make_url
+
+ENDPOINTS = ['validate_dni', 'start_exam', 'check_exam_status', 'submit_exam',
+             'submit_exam_per_request']
+FIRST_DNI = 20000000
+
+
+@contextmanager
+def disposable_database(admin_url):
+    """Create an empty database next to ``admin_url`` and drop it afterwards"""
+    admin_url = make_url(admin_url)
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    admin = create_engine(admin_url, isolation_level='AUTOCOMMIT')
+    with admin.connect() as connection:
+        connection.execute(text(f'CREATE DATABASE "{name}"'))
+    try:
+        yield admin_url.set(database=name)
+    finally:
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)'))
+        admin.dispose()
+
+
+def seed(engine, students, exam_minutes=120):
+    """Schema + ``students`` alumnos, each inscribed in an open turno"""
+    from src.migrations import migrate_up
+    from src.models import Alumno, Base, Examen, Inscriptos, Tecnicatura, Turnos
+
+    Base.metadata.create_all(engine)
+    # Las migraciones son de Postgres; SQLite alcanza para orm_vs_core
+    if engine.dialect.name == 'postgresql':
+        migrate_up(engine)
+    now = datetime.datetime.now()
+    with engine.begin() as connection:
+        connection.execute(insert(Tecnicatura), [{'id': 1, 'tectun': 'Informatica'}])
+        connection.execute(insert(Examen), [{'id': 1, 'exalink': 'https://github.com/alfa/examen'}])
+        connection.execute(insert(Turnos), [{
+            'id': 1, 'idtec': 1, 'idexa': 1, 'regular': 'COMPLETO', 'tiempo': exam_minutes,
+            'f_desde': now - datetime.timedelta(hours=1),
+            'f_hasta': now + datetime.timedelta(hours=6),
+        }])
+        connection.execute(insert(Alumno), [
+            {'id': i, 'dni': FIRST_DNI + i, 'apenom': f'Alumno {i}'}
+            for i in range(1, students + 1)
+        ])
+        connection.execute(insert(Inscriptos), [
+            {'id': i, 'iddni': i, 'idtectun': 1, 'regular': 'COMPLETO',
+             'email': f'alumno{i}@example.com'}
+            for i in range(1, students + 1)
+        ])
+
+
+def load_app(database_url):
+    """Import main.py against ``database_url``; returns (app, query counter)"""
+    url = make_url(database_url)
+    # Config lee el entorno al importarse
+    os.environ['DATABASE_URL'] = url.render_as_string(hide_password=False)
+    os.environ.setdefault('FLASK_SECRET_KEY', 'benchmark-secret')
+    os.environ.setdefault('EMAIL_TRANSPORT', 'memory')
+    for key, value in (('DB_HOST', url.host or 'localhost'), ('DB_PORT', str(url.port or 5432)),
+                       ('DB_NAME', url.database), ('DB_USER', url.username or 'postgres'),
+                       ('DB_PASSWORD', url.password or 'unused')):
+        os.environ.setdefault(key, value)
+
+    from src.config import Config
+    from src.database import dispose_engine, get_engine
+
+    Config.DATABASE_URL = os.environ['DATABASE_URL']
+    # Todas las requests salen de la misma IP: se mide la app, no el límite
+    Config.RATE_LIMIT_ENABLED = False
+    # Ni 503 de admission control: la concurrencia la fija --concurrency
+    Config.ADMISSION_ENABLED = False
+    # Sin hilo de pre-warm: sus consultas se mezclarían con las contadas
+    Config.PREWARM_ENABLED = False
+    dispose_engine()
+    import main
+
+    logging.getLogger('examenes_finales').setLevel(logging.WARNING)
+    counter = QueryCounter(get_engine())
+    return main.app, counter
+
+
+class QueryCounter:
+    """Counts SQL statements and commits sent through an engine"""
+
+    def __init__(self, engine):
+        self.count = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+        event.listen(engine, 'commit', self._on_commit)
+
+    def _on_execute(self, *args):
+        with self._lock:
+            self.count += 1
+
+    def _on_commit(self, *args):
+        with self._lock:
+            self.commits += 1
+
+    def reset(self):
+        """(statements, commits) since the last reset"""
+        with self._lock:
+            value, self.count = (self.count, self.commits), 0
+            self.commits = 0
+        return value
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def drive(app, counter, payloads, path, concurrency):
+    """POST every payload to ``path`` with ``concurrency`` threads"""
+    local = threading.local()
+    latencies = []
+    errors = []
+    responses = []
+    lock = threading.Lock()
+
+    def call(payload):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        start = time.perf_counter()
+        response = client.post(path, json=payload)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            responses.append((payload, response.status_code, response.get_json(silent=True)))
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+
+    counter.reset()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, payloads))
+    wall = time.perf_counter() - started
+    queries, commits = counter.reset()
+
+    result = {
+        'requests': len(payloads),
+        'throughput_rps': round(len(payloads) / wall, 1) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'queries_per_request': round(queries / len(payloads), 2) if payloads else 0.0,
+        'commits_per_request': round(commits / len(payloads), 2) if payloads else 0.0,
+        'errors': len(errors),
+    }
+    return result, responses
+
+
+@contextmanager
+def group_commit_disabled():
+    from src.config import Config
+
+    Config.SUBMIT_GROUP_COMMIT = False
+    try:
+        yield
+    finally:
+        Config.SUBMIT_GROUP_COMMIT = True
+
+
+def run(database_url, students, concurrency_levels, requests):
+    """Run every endpoint at every concurrency level; returns the report"""
+    app, counter = load_app(database_url)
+    report = {ep: {} for ep in ENDPOINTS}
+    rng = random.Random(1234)
+
+    # Cada nivel de concurrencia usa su propio tramo de inscripciones para
+    # que start/submit no reutilicen accesos ya enviados
+    per_level = min(requests, students // len(concurrency_levels))
+    if per_level <= 0:
+        raise ValueError('Se necesitan más alumnos que niveles de concurrencia')
+
+    for level_index, concurrency in enumerate(concurrency_levels):
+        ids = list(range(level_index * per_level + 1, (level_index + 1) * per_level + 1))
+
+        payloads = [{'dni': str(FIRST_DNI + rng.choice(ids))} for _ in range(requests)]
+        report['validate_dni'][str(concurrency)], _ = drive(
+            app, counter, payloads, '/validate_dni', concurrency)
+
+        payloads = [{'student_data': {'inscriptos': {'id': i}}} for i in ids]
+        report['start_exam'][str(concurrency)], started = drive(
+            app, counter, payloads, '/start_exam', concurrency)
+        sessions = [body for _, status, body in started if status == 200 and body]
+
+        payloads = [
+            {'access_id': s['access_id'], 'exam_token': s.get('exam_token')}
+            for s in (rng.choice(sessions) for _ in range(requests))
+        ] if sessions else []
+        report['check_exam_status'][str(concurrency)], _ = drive(
+            app, counter, payloads, '/check_exam_status', concurrency)
+
+        payloads = [
+            {'access_id': s['access_id'], 'github_link': 'https://github.com/alumno/final'}
+            for s in sessions
+        ]
+        half = len(payloads) // 2
+        report['submit_exam'][str(concurrency)], _ = drive(
+            app, counter, payloads[:half], '/submit_exam', concurrency)
+        with group_commit_disabled():
+            report['submit_exam_per_request'][str(concurrency)], _ = drive(
+                app, counter, payloads[half:], '/submit_exam', concurrency)
+
+    return report
+
+
+def compare(report, baseline, max_regression):
+    """
+    Regressions of ``report`` against ``baseline``: throughput lower, or
+    p95/p99 latency or statements per request higher, by more than
+    ``max_regression`` (a fraction). Errors always count as a regression.
+    """
+    problems = []
+    for endpoint, levels in report.items():
+        for level, current in levels.items():
+            if current.get('errors'):
+                problems.append(f"{endpoint}@{level}: {current['errors']} errores")
+            reference = baseline.get(endpoint, {}).get(level)
+            if not reference:
+                continue
+            if current['throughput_rps'] < reference['throughput_rps'] * (1 - max_regression):
+                problems.append(
+                    f"{endpoint}@{level}: throughput {current['throughput_rps']} < "
+                    f"{reference['throughput_rps']} rps")
+            for metric in ('p95_ms', 'p99_ms', 'queries_per_request'):
+                if current[metric] > reference[metric] * (1 + max_regression):
+                    problems.append(
+                        f"{endpoint}@{level}: {metric} {current[metric]} > {reference[metric]}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de endpoints del examen')
+    parser.add_argument('--admin-url', default=os.getenv('BENCH_ADMIN_URL'),
+                        help='URL de una base desde la que se pueda crear/borrar otra')
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--output', help='Archivo donde guardar el reporte JSON')
+    parser.add_argument('--baseline', help='Reporte previo contra el cual comparar')
+    parser.add_argument('--max-regression', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if not args.admin_url:
+        parser.error('--admin-url (o BENCH_ADMIN_URL) es obligatorio')
+    levels = [int(c) for c in args.concurrency.split(',')]
+
+    with disposable_database(args.admin_url) as url:
+        engine = create_engine(url)
+        seed(engine, args.students)
+        engine.dispose()
+        report = run(url, args.students, levels, args.requests)
+        from src.database import dispose_engine
+        dispose_engine()
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+
+    if args.baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.max_regression)
+        for problem in problems:
+            print(f"REGRESIÓN {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
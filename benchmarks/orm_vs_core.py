@@ -0,0 +1,175 @@
+# benchmarks/orm_vs_core.py
+"""
+ORM entities vs Core rows + NamedTuple records (src/records.py) for the
+lookups of the request hot path, without HTTP in between:
+
+    python -m benchmarks.orm_vs_core --students 1000 --lookups 5000
+
+- ``roster``: the alumno/inscripción/tecnicatura of a DNI plus whether
+  it has an Acceso (/validate_dni). ORM: session.query over the three
+  entities and a second query for Acceso; Core: eligibility_statement
+  into RosterEntry.
+- ``access``: the Acceso of an inscription (/start_exam, /exam_token).
+  ORM: the Acceso entity; Core: start_exam_statement's columns into
+  AccessRecord.
+
+Each lookup opens and closes its own session, like a request. The report
+(JSON) has µs per lookup and the peak memory traced by tracemalloc while
+running them. Defaults to an in-memory SQLite database; ``--database-url``
+points it at an existing, empty Postgres database instead.
+"""
+import argparse
+import datetime
+import json
+import sys
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from .endpoints import FIRST_DNI, seed
+
+
+def seed_accesses(engine, students):
+    """An Acceso for every inscription"""
+    from src.models import Acceso
+
+    now = datetime.datetime.now().replace(microsecond=0)
+    with engine.begin() as connection:
+        connection.execute(insert(Acceso), [
+            {'idins': i, 'acceso': now} for i in range(1, students + 1)
+        ])
+
+
+def orm_roster(session, dni):
+    from src.models import Acceso, Alumno, Inscriptos, Tecnicatura
+
+    found = (
+        session.query(Alumno, Inscriptos, Tecnicatura)
+        .join(Inscriptos, Inscriptos.iddni == Alumno.id)
+        .outerjoin(Tecnicatura, Tecnicatura.id == Inscriptos.idtectun)
+        .filter(Alumno.dni == dni)
+        .first()
+    )
+    alumno, inscriptos, tecnicatura = found
+    access = session.query(Acceso).filter_by(idins=inscriptos.id).first()
+    return (alumno.dni, alumno.apenom, inscriptos.id, inscriptos.email,
+            tecnicatura.tectun, access is not None)
+
+
+def core_roster(session, dni):
+    from src.queries import eligibility_statement
+    from src.records import RosterEntry
+
+    row = session.execute(eligibility_statement(dni)).first()
+    entry = RosterEntry(*row[:-1])
+    return (entry.dni, entry.apenom, entry.inscripcion_id, entry.email,
+            entry.tectun, bool(row.access_exists))
+
+
+def orm_access(session, inscripcion_id):
+    from src.models import Acceso
+
+    access = session.query(Acceso).filter_by(idins=inscripcion_id).first()
+    return (access.id, access.idins, access.acceso, access.extra_minutes)
+
+
+def core_access(session, inscripcion_id):
+    from src.models import Acceso
+    from src.records import AccessRecord
+
+    row = session.execute(
+        select(Acceso.id, Acceso.idins, Acceso.acceso, Acceso.extra_minutes)
+        .where(Acceso.idins == inscripcion_id)
+    ).first()
+    return AccessRecord(*row)
+
+
+CASES = {
+    'roster': (orm_roster, core_roster, lambda i: FIRST_DNI + i),
+    'access': (orm_access, core_access, lambda i: i),
+}
+
+
+def _lookups(Session, lookup, keys):
+    results = []
+    for key in keys:
+        session = Session()
+        try:
+            results.append(lookup(session, key))
+        finally:
+            session.close()
+    return results
+
+
+def measure(Session, lookup, keys):
+    """µs per lookup and tracemalloc peak (KiB) over ``keys``"""
+    _lookups(Session, lookup, keys[:50])  # calentar caché de statements y pool
+    started = time.perf_counter()
+    results = _lookups(Session, lookup, keys)
+    elapsed = time.perf_counter() - started
+
+    # Aparte: tracemalloc distorsiona los tiempos
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        _lookups(Session, lookup, keys)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return results, {
+        'us_per_lookup': round(elapsed / len(keys) * 1e6, 1),
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run(engine, students, lookups):
+    """Report per case: ORM and Core timings plus the speed-up"""
+    Session = sessionmaker(bind=engine)
+    report = {}
+    for name, (orm_lookup, core_lookup, key) in CASES.items():
+        keys = [key(i % students + 1) for i in range(lookups)]
+        orm_results, orm = measure(Session, orm_lookup, keys)
+        core_results, core = measure(Session, core_lookup, keys)
+        if orm_results != core_results:
+            raise AssertionError(f"{name}: ORM y Core devuelven datos distintos")
+        report[name] = {
+            'orm': orm,
+            'core': core,
+            'speedup': round(orm['us_per_lookup'] / core['us_per_lookup'], 2),
+        }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark ORM vs Core + records')
+    parser.add_argument('--database-url',
+                        help='Base vacía donde sembrar los datos (por defecto SQLite en memoria)')
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--output', help='Archivo donde guardar el reporte JSON')
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+    try:
+        seed(engine, args.students)
+        seed_accesses(engine, args.students)
+        report = run(engine, args.students, args.lookups)
+    finally:
+        engine.dispose()
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+# benchmarks/pollers.py
+"""
+WSGI vs ASGI under many concurrent /check_exam_status pollers.
+
+Seeds a throwaway Postgres database (see benchmarks/endpoints.py), gives
+every student a started exam and a signed exam token, then for each
+server (gunicorn + main:app, uvicorn + src.asgi:app) opens ``--pollers``
+keep-alive connections that each poll every ``--interval`` seconds for
+``--duration`` seconds:
+
+    python -m benchmarks.pollers \\
+        --admin-url postgresql://postgres@localhost/postgres \\
+        --pollers 5000 --interval 1 --duration 30 --workers 4
+
+Each poll sends confirm=true like static/js/exam.js, so it reaches the
+database. The report has throughput, p50/p95/p99 latency and failures
+(5xx, timeouts, dropped connections) per server, as JSON.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+from sqlalchemy import create_engine, text
+
+from .endpoints import disposable_database, percentile, seed
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+SECRET = 'pollers-benchmark-secret'
+
+
+def seed_sessions(engine, students):
+    """An Acceso per inscription, returned as (access_id, exam_token)"""
+    os.environ['FLASK_SECRET_KEY'] = SECRET
+    from src.exam_token import issue_token
+
+    now = datetime.datetime.now().replace(microsecond=0)
+    with engine.begin() as connection:
+        rows = connection.execute(text(
+            "INSERT INTO acceso (idins, acceso) SELECT id, :now FROM inscriptos "
+            "ORDER BY id LIMIT :n RETURNING id"
+        ), {'now': now, 'n': students}).all()
+    deadline = now + datetime.timedelta(hours=2)
+    return [(row.id, issue_token(row.id, now, deadline, secret=SECRET)) for row in rows]
+
+
+def server_command(kind, port, workers, threads):
+    if kind == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'main:app', '-b', f'127.0.0.1:{port}',
+                '-w', str(workers), '-k', 'gthread', '--threads', str(threads),
+                '--backlog', '8192', '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'src.asgi:app', '--host', '127.0.0.1',
+            '--port', str(port), '--workers', str(workers), '--backlog', '8192',
+            '--log-level', 'warning', '--no-access-log']
+
+
+def start_server(kind, database_url, port, workers, threads):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': database_url,
+        'FLASK_SECRET_KEY': SECRET,
+        'EMAIL_TRANSPORT': 'memory',
+        'LOG_FILE': '',
+        'LOG_LEVEL': 'WARNING',
+        'RATE_LIMIT_ENABLED': 'false',
+        'ADMISSION_ENABLED': 'false',
+        'PREWARM_ENABLED': 'false',
+        'DB_POOL_SIZE': str(max(threads, 10)),
+    })
+    process = subprocess.Popen(server_command(kind, port, workers, threads),
+                               cwd=PROJECT_ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise RuntimeError(f'{kind} server exited with {process.returncode}')
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+def _request(port, body):
+    return (
+        f'POST /check_exam_status HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n'
+        f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+    ).encode() + body
+
+
+async def _read_response(reader):
+    head = await reader.readuntil(b'\r\n\r\n')
+    status = int(head.split(b' ', 2)[1])
+    length = 0
+    for line in head.split(b'\r\n')[1:]:
+        name, _, value = line.partition(b':')
+        if name.strip().lower() == b'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def poller(port, access_id, token, interval, stop_at, timeout, stats):
+    payload = json.dumps({'access_id': access_id, 'exam_token': token, 'confirm': True}).encode()
+    request = _request(port, payload)
+    reader = writer = None
+    # Arranque escalonado, como navegadores que abren el examen de a poco
+    await asyncio.sleep(random.uniform(0, interval))
+    while time.monotonic() < stop_at:
+        started = time.monotonic()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection('127.0.0.1', port), timeout)
+            writer.write(request)
+            status = await asyncio.wait_for(_read_response(reader), timeout)
+        except asyncio.TimeoutError:
+            stats['timeouts'] += 1
+            writer = None
+        except (OSError, asyncio.IncompleteReadError):
+            stats['dropped'] += 1
+            writer = None
+        else:
+            stats['latencies'].append(time.monotonic() - started)
+            if status >= 500:
+                stats['errors'] += 1
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+    if writer is not None:
+        writer.close()
+
+
+async def drive(port, sessions, pollers, interval, duration, timeout):
+    stats = {'latencies': [], 'errors': 0, 'timeouts': 0, 'dropped': 0}
+    stop_at = time.monotonic() + duration
+    started = time.monotonic()
+    await asyncio.gather(*(
+        poller(port, *sessions[i % len(sessions)], interval, stop_at, timeout, stats)
+        for i in range(pollers)
+    ))
+    wall = time.monotonic() - started
+    latencies = stats['latencies']
+    return {
+        'pollers': pollers,
+        'responses': len(latencies),
+        'throughput_rps': round(len(latencies) / wall, 1),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+        'errors': stats['errors'],
+        'timeouts': stats['timeouts'],
+        'dropped': stats['dropped'],
+    }
+
+
+def _raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def run(database_url, sessions, servers, pollers, interval, duration, workers, threads,
+        timeout=10.0, port=8777):
+    _raise_fd_limit(pollers + 1024)
+    report = {}
+    for kind in servers:
+        process = start_server(kind, database_url, port, workers, threads)
+        try:
+            report[kind] = asyncio.run(drive(port, sessions, pollers, interval, duration, timeout))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='WSGI vs ASGI con muchos pollers')
+    parser.add_argument('--admin-url', default=os.getenv('BENCH_ADMIN_URL'))
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--pollers', type=int, default=5000)
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--duration', type=float, default=30.0)
+    parser.add_argument('--servers', default='wsgi,asgi')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8,
+                        help='Hilos por worker de gunicorn (WSGI)')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--output', help='Archivo donde guardar el reporte JSON')
+    args = parser.parse_args(argv)
+
+    if not args.admin_url:
+        parser.error('--admin-url (o BENCH_ADMIN_URL) es obligatorio')
+
+    with disposable_database(args.admin_url) as url:
+        engine = create_engine(url)
+        seed(engine, args.students)
+        sessions = seed_sessions(engine, args.students)
+        engine.dispose()
+        report = run(url.render_as_string(hide_password=False), sessions,
+                     args.servers.split(','), args.pollers, args.interval, args.duration,
+                     args.workers, args.threads, args.timeout)
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
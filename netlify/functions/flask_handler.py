@@ -7,7 +7,11 @@ sys.path.insert(0, project_root)
 
 import serverless_wsgi
 import json
-from main import app
+from src.app_factory import get_serverless_app
+
+# Se crea una vez por contenedor y se reutiliza (con su engine) mientras
+# la función siga caliente
+app = get_serverless_app()
 
 def handler(event, context):
     try:
@@ -16,4 +20,4 @@ def handler(event, context):
         return {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
-        }
\ No newline at end of file
+        }
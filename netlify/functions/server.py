@@ -1,5 +1,7 @@
-from main import app
+from src.app_factory import get_serverless_app
 import serverless_wsgi
 
+app = get_serverless_app()
+
 def handler(event, context):
     return serverless_wsgi.handle_request(app, event, context)
\ No newline at end of file
@@ -0,0 +1,136 @@
+# src/admission.py
+"""
+Admission control for the routes that hit the database.
+
+Each worker admits at most ADMISSION_MAX_CONCURRENT of those requests
+at a time. Up to ADMISSION_MAX_WAITING more may wait, for at most
+ADMISSION_WAIT_SECONDS, for a slot. Anything past that is shed at once
+with 503, Retry-After and ``{"status": "busy", "retry_after": N}``;
+static/js/index.js retries those with jitter. When a turno opens, the
+spike is then spread over a few seconds instead of piling up on the
+connection pool until requests time out.
+
+AdmissionGate serves the threaded Flask workers; AsyncAdmissionGate
+the ASGI app (one per event loop).
+"""
+import asyncio
+import threading
+
+from . import metrics
+from .config import Config
+
+# Mismos nombres de endpoint en src/routes.py y src/asgi.py
+ADMITTED_ENDPOINTS = frozenset({'validate_dni', 'start_exam', 'submit_exam', 'check_exam_status'})
+
+QUEUE_FULL = 'queue_full'
+TIMEOUT = 'timeout'
+
+
+class AdmissionGate:
+    """Semaphore with a bounded, time-limited wait queue"""
+
+    def __init__(self, max_concurrent, max_waiting, wait_seconds):
+        self.max_waiting = max_waiting
+        self.wait_seconds = wait_seconds
+        self.waiting = 0
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+
+    def enter(self, endpoint):
+        """None when admitted (call leave() afterwards), else the rejection reason"""
+        if self._slots.acquire(blocking=False):
+            return None
+        with self._lock:
+            if self.waiting >= self.max_waiting:
+                return QUEUE_FULL
+            self.waiting += 1
+        metrics.admission_queued.inc(endpoint=endpoint)
+        metrics.admission_queue_depth.inc()
+        try:
+            admitted = self._slots.acquire(timeout=self.wait_seconds)
+        finally:
+            metrics.admission_queue_depth.dec()
+            with self._lock:
+                self.waiting -= 1
+        return None if admitted else TIMEOUT
+
+    def leave(self):
+        self._slots.release()
+
+
+class AsyncAdmissionGate:
+    """AdmissionGate for coroutines; bound to the event loop that uses it"""
+
+    def __init__(self, max_concurrent, max_waiting, wait_seconds):
+        self.max_waiting = max_waiting
+        self.wait_seconds = wait_seconds
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_concurrent)
+
+    async def enter(self, endpoint):
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return None
+        if self.waiting >= self.max_waiting:
+            return QUEUE_FULL
+        self.waiting += 1
+        metrics.admission_queued.inc(endpoint=endpoint)
+        metrics.admission_queue_depth.inc()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.wait_seconds)
+        except asyncio.TimeoutError:
+            return TIMEOUT
+        finally:
+            metrics.admission_queue_depth.dec()
+            self.waiting -= 1
+        return None
+
+    def leave(self):
+        self._slots.release()
+
+
+def gate_from_config(gate_class=AdmissionGate):
+    return gate_class(
+        max_concurrent=Config.ADMISSION_MAX_CONCURRENT,
+        max_waiting=Config.ADMISSION_MAX_WAITING,
+        wait_seconds=Config.ADMISSION_WAIT_SECONDS,
+    )
+
+
+def rejected(endpoint, reason):
+    """Count a shed request; returns (JSON body, headers) of the 503"""
+    metrics.admission_rejected.inc(endpoint=endpoint, reason=reason)
+    retry_after = Config.ADMISSION_RETRY_AFTER
+    body = {
+        'status': 'busy',
+        'message': 'El servidor está ocupado, reintente en unos segundos',
+        'retry_after': retry_after,
+    }
+    return body, {'Retry-After': str(retry_after)}
+
+
+def init_app(app, gate=None):
+    """Gate the admitted endpoints of a Flask app (register after rate_limit)"""
+    from flask import g, jsonify, request
+
+    if not Config.ADMISSION_ENABLED:
+        return None
+    gate = gate or gate_from_config()
+
+    @app.before_request
+    def _admit():
+        if request.endpoint not in ADMITTED_ENDPOINTS:
+            return None
+        reason = gate.enter(request.endpoint)
+        if reason is None:
+            g.admitted = True
+            return None
+        body, headers = rejected(request.endpoint, reason)
+        return jsonify(body), 503, headers
+
+    @app.teardown_request
+    def _release(exc):
+        if g.pop('admitted', False):
+            gate.leave()
+
+    return gate
@@ -0,0 +1,66 @@
+# src/app_factory.py
+"""
+Flask application factory.
+
+main.py builds the long-running app with create_app(); the Netlify
+function uses get_serverless_app(), which keeps one app per warm
+container and avoids work a cold start does not need:
+
+* no filesystem writes (no logs/ dir, no .env), logs go to stdout
+  synchronously so nothing is left queued when the container freezes;
+* SQLAlchemy, the ORM models and SendGrid are imported on first use, not
+  at import; the engine is then reused by every later invocation.
+
+benchmarks/cold_start.py measures import and first-request time.
+"""
+import os
+
+from flask import Flask
+
+from . import admission, logging_config, metrics, rate_limit
+from .config import Config
+from .routes import register_routes
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+_serverless_app = None
+
+
+def create_app():
+    Config.validate()
+    logging_config.setup_logging()
+
+    # Configure Flask app with dynamic template and static paths
+    app = Flask(__name__,
+                root_path=PROJECT_ROOT,
+                template_folder=os.path.join(PROJECT_ROOT, 'template'),
+                static_folder=os.path.join(PROJECT_ROOT, 'static'))
+
+    # Configure Flask with settings from Config
+    app.config.from_object(Config)
+
+    # Latencia por endpoint, SQL por request y /metrics
+    metrics.init_app(app)
+
+    # Cada línea de log lleva la ruta, para el muestreo por endpoint
+    logging_config.init_app(app)
+
+    # 429 antes de tocar la base (después de metrics: también se cuentan)
+    rate_limit.init_app(app)
+
+    # 503 inmediato cuando el worker ya tiene la base ocupada
+    admission.init_app(app)
+
+    register_routes(app)
+    return app
+
+
+def get_serverless_app():
+    """The app of this container, created on the first invocation"""
+    global _serverless_app
+    if _serverless_app is None:
+        Config.LOG_FILE = ''
+        Config.LOG_ASYNC = False
+        Config.ensure_secret_key(persist=False)
+        _serverless_app = create_app()
+    return _serverless_app
@@ -0,0 +1,563 @@
+# src/asgi.py
+"""
+Async deployment mode: the exam API as an ASGI app.
+
+Same routes and JSON contracts as src/routes.py, served by
+AsyncExamManager over asyncpg, so a request waiting on Postgres costs a
+coroutine instead of a worker thread. It also serves /exam_events, the
+Server-Sent Events stream of an exam (see src/exam_events.py), which
+only makes sense here: a stream open for the whole exam would hold a
+WSGI thread.
+
+    pip install -r requirements-asgi.txt
+    uvicorn src.asgi:app --host 0.0.0.0 --port 8000 --workers 4
+
+benchmarks/pollers.py compares it with the WSGI app under many
+concurrent /check_exam_status pollers.
+"""
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import re
+import time
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from starlette.applications import Starlette
+from starlette.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from sqlalchemy.engine import make_url
+
+from . import admission, assets, exam_events, export, metrics, prewarm, rate_limit
+from .async_database import (
+    AsyncDatabaseConnection,
+    _async_connection_string,
+    dispose_async_engine,
+    warm_async_pool,
+)
+from .async_exam_manager import AsyncExamManager
+from .cache import exam_page_cache
+from .config import Config
+from .email_outbox import start_worker_thread
+from .exam_page import cached_page, not_modified, page_headers, parse_exam_id, remember_page
+from .exam_token import InvalidTokenError, read_token
+from .logging_config import LOGGER_NAME, bind_route, setup_logging, unbind_route
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+TEMPLATE_DIR = os.path.join(PROJECT_ROOT, 'template')
+
+Config.ensure_secret_key()
+Config.validate()
+setup_logging()
+logger = logging.getLogger(LOGGER_NAME)
+
+# Las plantillas usan url_for('static', filename=...) y flashes de Flask
+templates = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(['html']),
+)
+templates.globals['url_for'] = lambda endpoint, filename: f'/static/{filename}'
+templates.globals['get_flashed_messages'] = lambda with_categories=False: []
+templates.globals['asset_url'] = assets.asset_url
+PAGE_TEMPLATES = assets.page_templates(TEMPLATE_DIR)
+
+
+def render_template(name, status_code=200, **context):
+    return HTMLResponse(templates.get_template(name).render(**context), status_code=status_code)
+
+
+def render_exam_page(instructions):
+    return templates.get_template('exam.html').render(exam_instructions=instructions or '')
+
+
+async def _rate_limited(name, request):
+    """429 response when the request is over its bucket, like rate_limit.init_app"""
+    limiter = rate_limit.get_limiter()
+    if limiter is None or name not in rate_limit.LIMITED_ENDPOINTS:
+        return None
+    body = await _json_body(request) if name == 'validate_dni' else None
+    decision = await limiter.acheck(
+        rate_limit.client_ip(request.client.host if request.client else None,
+                             request.headers.get('X-Forwarded-For')),
+        rate_limit.dni_of(name, body),
+    )
+    if decision.allowed:
+        return None
+    metrics.rate_limited.inc(endpoint=name, scope=decision.scope)
+    return JSONResponse(rate_limit.rejection_body(decision), status_code=429,
+                        headers={'Retry-After': decision.retry_after_header()})
+
+
+_admission_gate = None
+
+
+async def _admitted(name, request, handler):
+    """Run ``handler`` inside the admission gate, like admission.init_app"""
+    global _admission_gate
+    if not Config.ADMISSION_ENABLED or name not in admission.ADMITTED_ENDPOINTS:
+        return await handler(request)
+    if _admission_gate is None:
+        # Se crea dentro del event loop del worker
+        _admission_gate = admission.gate_from_config(admission.AsyncAdmissionGate)
+    reason = await _admission_gate.enter(name)
+    if reason is not None:
+        body, headers = admission.rejected(name, reason)
+        return JSONResponse(body, status_code=503, headers=headers)
+    try:
+        return await handler(request)
+    finally:
+        _admission_gate.leave()
+
+
+def view(handler):
+    """Bind the log route, rate limit, admit and record request metrics, like the Flask hooks"""
+    name = handler.__name__
+
+    @functools.wraps(handler)
+    async def wrapper(request):
+        token = bind_route(name)
+        try:
+            with metrics.track_request(name, request.method) as result:
+                response = (await _rate_limited(name, request)
+                            or await _admitted(name, request, handler))
+                result['status'] = response.status_code
+                return response
+        finally:
+            unbind_route(token)
+    return wrapper
+
+
+async def _json_body(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+@view
+async def index(request):
+    logger.info("Accessing index page")
+    return render_template('index.html')
+
+
+@view
+async def validate_dni(request):
+    dni = ((await _json_body(request)) or {}).get('dni')
+
+    logger.info("Validating DNI: %s", dni)
+
+    # Validate DNI input
+    if not re.match(r'^\d+$', str(dni)):
+        logger.warning("Invalid DNI format: %s", dni)
+        return JSONResponse({
+            'error': 'DNI inválido. Solo se permiten números.'
+        }, status_code=400)
+
+    result = await AsyncExamManager().check_exam_eligibility(int(dni))
+
+    if result['eligible']:
+        logger.info("DNI %s is eligible for exam", dni)
+        return JSONResponse({
+            'status': 'success',
+            'student_info': {
+                'dni': result['student_data'].dni,
+                'nombre': result['student_data'].apenom,
+                'email': result['student_data'].email,
+                'tecnicatura': result['student_data'].tectun,
+                'exam_time_limit': result['exam_time_limit'],
+                'exam_id': result['student_data'].turno.idexa,
+                'inscriptos': {
+                    'id': result['student_data'].inscripcion_id
+                }
+            }
+        })
+    logger.warning("DNI %s not eligible: %s", dni, result['message'])
+    return JSONResponse({
+        'status': 'error',
+        'message': result['message']
+    }, status_code=400)
+
+
+@view
+async def exam(request):
+    # Misma resolución, control de turno abierto y caché que src/routes.py
+    exam_id = parse_exam_id(request.query_params.get('exam_id'))
+    exam_manager = AsyncExamManager()
+    if exam_id is None:
+        exam_id = await exam_manager.open_exam_id()
+    elif not await exam_manager.is_exam_open(exam_id):
+        return page_not_found(request)
+    page = cached_page(exam_id)
+    if page is None:
+        logger.info("Rendering exam page for exam %s", exam_id)
+        exam_instructions = await exam_manager.get_exam_instructions(exam_id) if exam_id else None
+        page = remember_page(exam_id, render_exam_page(exam_instructions), exam_instructions)
+
+    headers = page_headers(page)
+    if not_modified(request.headers.get('If-None-Match'), page.etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(page.body, headers=headers)
+
+
+@view
+async def start_exam(request):
+    logger.info("Starting exam")
+    try:
+        student_data = ((await _json_body(request)) or {}).get('student_data')
+        if not student_data:
+            logger.error("No student data provided")
+            return JSONResponse({
+                'status': 'error',
+                'message': 'Datos del estudiante no proporcionados'
+            }, status_code=400)
+
+        inscriptos_id = student_data.get('inscriptos', {}).get('id')
+        if not inscriptos_id:
+            logger.error("No inscriptos ID found")
+            return JSONResponse({
+                'status': 'error',
+                'message': 'ID de inscripción no encontrado'
+            }, status_code=400)
+
+        exam_manager = AsyncExamManager()
+        access_record = await exam_manager.start_exam(inscriptos_id)
+        if access_record:
+            return JSONResponse({
+                'status': 'success',
+                'access_id': access_record.id,
+                'exam_token': await exam_manager.issue_exam_token(access_record)
+            })
+        return JSONResponse({
+            'status': 'error',
+            'message': 'No se pudo iniciar el examen'
+        }, status_code=500)
+
+    except Exception as e:
+        logger.error("Error starting exam: %s", e, exc_info=True)
+        return JSONResponse({
+            'status': 'error',
+            'message': f'Error interno: {str(e)}'
+        }, status_code=500)
+
+
+@view
+async def submit_exam(request):
+    logger.info("Submit exam request received")
+    try:
+        data = await _json_body(request)
+        if not data:
+            logger.error("No data received in submit_exam")
+            return JSONResponse({
+                'status': 'error',
+                'message': 'No se recibieron datos de envío'
+            }, status_code=400)
+
+        github_link = data.get('github_link')
+        access_id = data.get('access_id')
+
+        if not github_link:
+            logger.error("Missing GitHub link")
+            return JSONResponse({
+                'status': 'error',
+                'message': 'Falta el enlace de GitHub'
+            }, status_code=400)
+
+        if not access_id:
+            logger.error("Missing access_id")
+            return JSONResponse({
+                'status': 'error',
+                'message': 'Falta el ID de acceso'
+            }, status_code=400)
+
+        if await AsyncExamManager().submit_exam(access_id, github_link):
+            return JSONResponse({
+                'status': 'success',
+                'message': 'Examen enviado exitosamente'
+            })
+        return JSONResponse({
+            'status': 'error',
+            'message': 'No se pudo enviar el examen'
+        }, status_code=500)
+
+    except Exception as e:
+        logger.error("Unexpected error in submit_exam: %s", e, exc_info=True)
+        return JSONResponse({
+            'status': 'error',
+            'message': f'Error interno: {str(e)}'
+        }, status_code=500)
+
+
+@view
+async def check_exam_status(request):
+    """Verificar si el examen puede continuar"""
+    data = (await _json_body(request)) or {}
+    access_id = data.get('access_id')
+
+    if not access_id:
+        return JSONResponse({
+            'can_continue': False,
+            'message': 'ID de acceso no proporcionado'
+        }, status_code=400)
+
+    try:
+        status = await AsyncExamManager().check_exam_status(
+            access_id,
+            token=data.get('exam_token'),
+            confirm=bool(data.get('confirm'))
+        )
+    except Exception as e:
+        logger.error("Error en check_exam_status: %s", e, exc_info=True)
+        return JSONResponse({
+            'can_continue': False,
+            'message': 'Error al verificar el estado del examen'
+        }, status_code=500)
+
+    return JSONResponse(status, status_code=200 if status['can_continue'] else 400)
+
+
+def _exam_ended(name, message):
+    return exam_events.format_sse(name, {'can_continue': False, 'message': message})
+
+
+async def _exam_stream(subscriber, status):
+    """
+    The authoritative deadline once, then heartbeat comments until the
+    exam is submitted, extended (new deadline) or its deadline passes.
+    """
+    try:
+        yield f"retry: {Config.SSE_HEARTBEAT_SECONDS * 1000}\n\n"
+        if not status['can_continue']:
+            yield exam_events.format_sse('ended', status)
+            return
+
+        deadline = status['deadline']
+        yield exam_events.format_sse('deadline', {'deadline': deadline})
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                yield _exam_ended('expired', 'Tiempo máximo de examen excedido')
+                return
+            event = await subscriber.next_event(min(Config.SSE_HEARTBEAT_SECONDS, remaining))
+            if event is None:
+                if deadline > time.time():
+                    yield ": heartbeat\n\n"
+            elif event.name == 'extended':
+                deadline = event.data['deadline']
+                yield exam_events.format_sse('extended', {'deadline': deadline})
+            elif event.name == 'submitted':
+                yield _exam_ended('submitted', 'El examen ya ha sido enviado')
+                return
+    finally:
+        exam_events.registry.unsubscribe(subscriber)
+
+
+class _ExamStreamResponse(StreamingResponse):
+    """
+    Releases the subscriber however the response ends: a client that
+    disconnects before the body starts never runs _exam_stream's finally.
+    """
+
+    def __init__(self, subscriber, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.subscriber = subscriber
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            exam_events.registry.unsubscribe(self.subscriber)
+
+
+@view
+async def exam_stream(request):
+    """GET /exam_events?access_id=..&token=.. (EventSource no envía headers)"""
+    try:
+        access_id = int(request.query_params.get('access_id', ''))
+    except ValueError:
+        return JSONResponse({'message': 'ID de acceso inválido'}, status_code=400)
+
+    token = request.query_params.get('token')
+    try:
+        claims = read_token(token) if token else None
+    except InvalidTokenError:
+        claims = None
+    if claims is None or claims.access_id != access_id:
+        return JSONResponse({'message': 'Token de examen inválido'}, status_code=401)
+
+    # Suscribirse antes de leer el estado: un evento que llegue en el medio
+    # queda en la cola en lugar de perderse
+    try:
+        subscriber = exam_events.registry.subscribe(access_id)
+    except exam_events.RegistryFull:
+        return JSONResponse({'message': 'Demasiadas conexiones, reintente más tarde'},
+                            status_code=503, headers={'Retry-After': '30'})
+    try:
+        status = await AsyncExamManager().check_exam_status(access_id, token=token, confirm=True)
+    except Exception:
+        exam_events.registry.unsubscribe(subscriber)
+        raise
+
+    return _ExamStreamResponse(
+        subscriber,
+        _exam_stream(subscriber, status),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+def _admin_authorized(request):
+    expected = Config.ADMIN_API_TOKEN
+    return bool(expected) and request.headers.get('Authorization') == f"Bearer {expected}"
+
+
+@view
+async def extend_exam(request):
+    if not _admin_authorized(request):
+        return JSONResponse({'status': 'error', 'message': 'No autorizado'}, status_code=401)
+
+    data = (await _json_body(request)) or {}
+    access_id = data.get('access_id')
+    minutes = data.get('minutes')
+    if not access_id or not isinstance(minutes, int) or minutes <= 0:
+        return JSONResponse({
+            'status': 'error',
+            'message': 'Se requieren access_id y minutes (entero positivo)'
+        }, status_code=400)
+
+    deadline = await AsyncExamManager().extend_exam(access_id, minutes)
+    if deadline is None:
+        return JSONResponse({
+            'status': 'error',
+            'message': 'Examen inexistente o ya enviado'
+        }, status_code=404)
+    return JSONResponse({'status': 'success', 'deadline': int(deadline.timestamp())})
+
+
+@view
+async def export_submissions(request):
+    if not _admin_authorized(request):
+        return JSONResponse({'status': 'error', 'message': 'No autorizado'}, status_code=401)
+
+    params = request.query_params
+    fmt = params.get('format', 'csv')
+    if fmt not in export.CONTENT_TYPES:
+        return JSONResponse({'status': 'error', 'message': 'format debe ser csv o jsonl'},
+                            status_code=400)
+    try:
+        filters = export.ExportFilters.parse(params.get('turno'), params.get('since'), params.get('until'))
+    except ValueError as e:
+        return JSONResponse({'status': 'error', 'message': str(e)}, status_code=400)
+
+    logger.info("Exportando entregas: turno=%s desde=%s hasta=%s", *filters)
+    return StreamingResponse(
+        export.astream_submissions(AsyncDatabaseConnection(), filters, fmt),
+        media_type=export.CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filters.filename(fmt)}"'},
+    )
+
+
+def _collect_exam_stats():
+    for stat, value in exam_events.registry.stats().items():
+        metrics.exam_event_streams.set(value, stat=stat)
+    for stat, value in exam_page_cache.stats().items():
+        metrics.exam_page_cache_stats.set(value, stat=stat)
+
+
+metrics.registry.add_collector(_collect_exam_stats)
+
+
+async def metrics_endpoint(request):
+    if not metrics.authorized(request.headers.get('Authorization')):
+        return PlainTextResponse('Unauthorized', status_code=401)
+    return PlainTextResponse(metrics.registry.render(),
+                             media_type='text/plain; version=0.0.4')
+
+
+@view
+async def catch_all(request):
+    path = request.path_params['path']
+    logger.info("Catching route: %s", path)
+    if path in PAGE_TEMPLATES:
+        return render_template(f'{path}.html')
+    return render_template('index.html')
+
+
+async def hashed_asset(request):
+    filename = request.path_params['filename']
+    negotiated = assets.get_manifest().negotiate(filename, request.headers.get('Accept-Encoding'))
+    if negotiated is None:
+        return PlainTextResponse('Not Found', status_code=404)
+    path, encoding = negotiated
+    return FileResponse(os.path.join(assets.DIST_DIR, path),
+                        media_type=assets.asset_mimetype(filename),
+                        headers=assets.asset_headers(encoding))
+
+
+def page_not_found(request):
+    logger.error("404 error: %s", request.url)
+    return render_template('error.html', status_code=404,
+                           error_title='Página No Encontrada',
+                           error_message='La página solicitada no existe')
+
+
+async def internal_server_error(request, exc):
+    logger.error("500 error: %s", exc)
+    return render_template('error.html', status_code=500,
+                           error_title='Error Interno del Servidor',
+                           error_message='Ocurrió un error inesperado')
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    worker = start_worker_thread() if Config.EMAIL_OUTBOX_WORKER_THREAD else None
+    listener = None
+    url = _async_connection_string()
+    if make_url(url).get_backend_name() == 'postgresql':
+        listener = exam_events.ExamEventListener.from_url(url, exam_events.registry)
+        listener.start()
+    prewarmer = None
+    if Config.PREWARM_ENABLED:
+        # Datos con el engine sync desde el hilo; el pool a calentar es el de asyncpg
+        loop = asyncio.get_running_loop()
+        prewarmer = prewarm.start_prewarm_thread(
+            render_page=render_exam_page,
+            pool_warmer=lambda n: asyncio.run_coroutine_threadsafe(warm_async_pool(n), loop).result(),
+        )
+    yield
+    if prewarmer is not None:
+        prewarmer.stop()
+    if listener is not None:
+        await listener.stop()
+    if worker is not None:
+        worker.stop()
+    await dispose_async_engine()
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/validate_dni', validate_dni, methods=['POST']),
+        Route('/exam', exam),
+        Route('/start_exam', start_exam, methods=['POST']),
+        Route('/submit_exam', submit_exam, methods=['POST']),
+        Route('/check_exam_status', check_exam_status, methods=['POST']),
+        Route('/exam_events', exam_stream),
+        Route('/admin/extend_exam', extend_exam, methods=['POST']),
+        Route('/admin/submissions', export_submissions),
+        Route('/metrics', metrics_endpoint),
+        Route('/static/dist/{filename:path}', hashed_asset),
+        Mount('/static', StaticFiles(directory=os.path.join(PROJECT_ROOT, 'static')), name='static'),
+        Route('/{path:path}', catch_all),
+    ],
+    exception_handlers={500: internal_server_error},
+    lifespan=lifespan,
+)
@@ -0,0 +1,244 @@
+# src/assets.py
+"""
+Fingerprinted static assets.
+
+``python -m src.assets`` minifies every file under static/, writes it to
+static/dist/ as ``<name>.<hash>.<ext>`` with .gz (and .br, when the
+optional ``brotli`` package is installed) siblings, and records the
+result in static/dist/manifest.json:
+
+    {"css/styles.css": {"file": "css/styles.3f9a1c2b7d.css",
+                        "encodings": ["br", "gzip"]}}
+
+Templates call ``asset_url('css/styles.css')``. Without a manifest (a
+checkout that was never built) it falls back to the plain /static/ URL.
+Hashed files never change, so both apps serve them from
+/static/dist/ with ``Cache-Control: public, max-age=31536000, immutable``.
+They pick the precompressed variant from Accept-Encoding.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import sys
+
+from .logging_config import LOGGER_NAME
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+STATIC_DIR = os.path.join(PROJECT_ROOT, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+DIST_URL = '/static/dist/'
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Orden de preferencia al negociar Accept-Encoding
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+COMPRESSIBLE = {'.css', '.js', '.svg', '.html', '.json', '.txt'}
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def minify_css(source):
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.S)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    # Sólo después de ':' ("a :hover" no es lo mismo que "a:hover")
+    return re.sub(r':\s+', ':', source).replace(';}', '}').strip()
+
+
+def _template_open_after(line, in_template):
+    """Whether a `template literal` is still open at the end of ``line``"""
+    quote = '`' if in_template else None
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == '\\':
+            i += 2
+            continue
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in '\'"`':
+            quote = char
+        elif line.startswith('//', i):
+            break
+        i += 1
+    return quote == '`'
+
+
+def minify_js(source):
+    """
+    Conservative: drops indentation, blank lines and whole-line //
+    comments but keeps line breaks, so automatic semicolon insertion and
+    string contents are untouched. Lines inside a multi-line template
+    literal are copied verbatim (the ``${}`` expressions in them are not
+    parsed; a backtick inside one would confuse the tracking).
+    """
+    lines = []
+    in_template = False
+    for line in source.splitlines():
+        if in_template:
+            lines.append(line)
+            in_template = _template_open_after(line, True)
+            continue
+        in_template = _template_open_after(line, False)
+        # Si el literal sigue abierto, los espacios del final son contenido
+        line = line.lstrip() if in_template else line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def _compress(data):
+    """{encoding: bytes} for the encodings that make ``data`` smaller"""
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    return {name: body for name, body in variants.items() if len(body) < len(data)}
+
+
+def build(static_dir=STATIC_DIR, dist_dir=DIST_DIR):
+    """Rebuild ``dist_dir`` from ``static_dir``; returns the manifest"""
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist_dir)
+        for filename in sorted(files):
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            stem, ext = os.path.splitext(name)
+            with open(source, 'rb') as f:
+                data = f.read()
+            if ext in MINIFIERS:
+                data = MINIFIERS[ext](data.decode('utf-8')).encode('utf-8')
+
+            hashed = f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}"
+            target = os.path.join(dist_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+
+            variants = _compress(data) if ext in COMPRESSIBLE else {}
+            for encoding, suffix in ENCODINGS:
+                if encoding in variants:
+                    with open(target + suffix, 'wb') as f:
+                        f.write(variants[encoding])
+            manifest[name] = {
+                'file': hashed,
+                'encodings': [encoding for encoding, _ in ENCODINGS if encoding in variants],
+            }
+
+    os.makedirs(dist_dir, exist_ok=True)
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+class Manifest:
+    """manifest.json loaded once: logical name -> hashed file, and back"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.by_file = {entry['file']: entry for entry in entries.values()}
+
+    @classmethod
+    def load(cls, dist_dir=DIST_DIR):
+        try:
+            with open(os.path.join(dist_dir, MANIFEST_NAME)) as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            logger.warning("Sin %s en %s: assets sin hash (python -m src.assets)",
+                           MANIFEST_NAME, dist_dir)
+            return cls({})
+
+    def url(self, name):
+        entry = self.entries.get(name)
+        return DIST_URL + entry['file'] if entry else f'/static/{name}'
+
+    def negotiate(self, hashed, accept_encoding):
+        """
+        (file to send, Content-Encoding or None) for a hashed file, or
+        None when it is not in the manifest.
+        """
+        entry = self.by_file.get(hashed)
+        if entry is None:
+            return None
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding, suffix in ENCODINGS:
+            if encoding in entry['encodings'] and encoding in accepted:
+                return hashed + suffix, encoding
+        return hashed, None
+
+
+def _accepted_encodings(header):
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if name and params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+_manifest = None
+
+
+def get_manifest():
+    global _manifest
+    if _manifest is None:
+        _manifest = Manifest.load()
+    return _manifest
+
+
+def asset_url(name):
+    """URL of a static file for templates: hashed when built"""
+    return get_manifest().url(name)
+
+
+def asset_headers(encoding):
+    headers = {
+        'Cache-Control': IMMUTABLE_CACHE_CONTROL,
+        'Vary': 'Accept-Encoding',
+    }
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return headers
+
+
+def asset_mimetype(filename):
+    return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def page_templates(template_dir):
+    """Names (without .html) of the templates catch_all may render, read once"""
+    return frozenset(
+        name[:-len('.html')] for name in os.listdir(template_dir) if name.endswith('.html')
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera static/dist con hash, minificado y comprimido')
+    parser.add_argument('--static-dir', default=STATIC_DIR)
+    parser.add_argument('--dist-dir', default=DIST_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = build(args.static_dir, args.dist_dir)
+    for name, entry in sorted(manifest.items()):
+        print(f"{name} -> {entry['file']} {','.join(entry['encodings'])}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,71 @@
+# src/async_database.py
+import contextlib
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from .config import Config
+from .database import _connection_string
+from .metrics import instrument_engine
+
+# Un engine async por proceso (el pool de asyncpg queda atado a su event loop)
+_engine = None
+_session_factory = None
+
+
+def _async_connection_string():
+    if Config.ASYNC_DATABASE_URL:
+        return Config.ASYNC_DATABASE_URL
+    url = make_url(_connection_string())
+    if url.get_backend_name() == 'postgresql':
+        url = url.set(drivername='postgresql+asyncpg')
+    return url
+
+
+def get_async_engine():
+    """Return the process-wide async engine, creating it on first use"""
+    global _engine, _session_factory
+    if _engine is None:
+        engine = create_async_engine(
+            _async_connection_string(),
+            pool_size=Config.DB_POOL_SIZE,
+            max_overflow=Config.DB_MAX_OVERFLOW,
+            pool_timeout=Config.DB_POOL_TIMEOUT,
+            pool_recycle=Config.DB_POOL_RECYCLE,
+            pool_pre_ping=Config.DB_POOL_PRE_PING,
+        )
+        instrument_engine(engine.sync_engine)
+        _session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        _engine = engine
+    return _engine
+
+
+async def dispose_async_engine():
+    """Close every pooled connection and forget the shared async engine"""
+    global _engine, _session_factory
+    engine, _engine, _session_factory = _engine, None, None
+    if engine is not None:
+        await engine.dispose()
+
+
+async def warm_async_pool(connections):
+    """prewarm.warm_pool for the async engine (runs on its event loop)"""
+    engine = get_async_engine()
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(connections):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text('SELECT 1'))
+    return connections
+
+
+class AsyncDatabaseConnection:
+    """DatabaseConnection for the ASGI app: sessions are AsyncSession"""
+
+    def __init__(self):
+        self.engine = get_async_engine()
+        self.Session = _session_factory
+
+    def get_connection(self):
+        return self.Session()
+
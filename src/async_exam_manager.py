@@ -0,0 +1,200 @@
+# src/async_exam_manager.py
+import datetime
+
+from . import group_commit
+from .async_database import AsyncDatabaseConnection
+from .cache import roster_cache
+from .email_outbox import enqueue_email
+from .email_sender import build_submission_email
+from .exam_events import notify_statement
+from .exam_manager import ExamManager, status_confirmations
+from .logging_config import setup_logging
+from .queries import (
+    access_exists_statement,
+    eligibility_statement,
+    exam_instructions_statement,
+    exam_status_statement,
+    extend_exam_statement,
+    inscription_email_statement,
+    inscription_turno_key_statement,
+    start_exam_statement,
+    submit_exam_statement,
+)
+from .records import AccessRecord
+from .turno_index import turno_index
+
+logger = setup_logging()
+
+
+class AsyncExamManager:
+    """
+    ExamManager for the ASGI app (src/asgi.py). Same statements
+    (src/queries.py), caches and answers; only the I/O is awaited, so a
+    request waiting on Postgres does not hold a worker thread.
+    """
+
+    def __init__(self):
+        self.db = AsyncDatabaseConnection()
+
+    async def validate_dni(self, dni, now=None):
+        """Async ExamManager.validate_dni"""
+        now = now or datetime.datetime.now()
+        await turno_index.ensure_fresh_async(self.db)
+        entries = roster_cache.get(dni)
+
+        if entries is None:
+            async with self.db.get_connection() as session:
+                rows = (await session.execute(eligibility_statement(dni))).all()
+            return ExamManager._record_from_rows(dni, rows, now)
+
+        record = ExamManager._pick_record(entries, now)
+        if record is None:
+            return None
+
+        async with self.db.get_connection() as session:
+            access_exists = (await session.execute(
+                access_exists_statement(record.inscripcion_id)
+            )).scalar()
+        return record._replace(access_exists=bool(access_exists))
+
+    async def check_exam_eligibility(self, dni):
+        """Check if student can take the exam"""
+        current_time = datetime.datetime.now()
+        student_data = await self.validate_dni(dni, now=current_time)
+        return ExamManager._eligibility_result(student_data, current_time)
+
+    async def start_exam(self, inscriptos_id):
+        """Async ExamManager.start_exam (same upsert)"""
+        inscriptos_id = int(inscriptos_id)
+        async with self.db.get_connection() as session:
+            try:
+                row = (await session.execute(
+                    start_exam_statement(
+                        inscriptos_id,
+                        datetime.datetime.now(),
+                        dialect_name=session.bind.dialect.name
+                    )
+                )).one()
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error("Error registrando acceso: %s", e, exc_info=True)
+                raise
+
+        logger.info("Acceso registrado para inscriptos_id: %s, ID: %s", inscriptos_id, row.id)
+        return AccessRecord(*row)
+
+    async def issue_exam_token(self, access_record):
+        async with self.db.get_connection() as session:
+            key = (await session.execute(
+                inscription_turno_key_statement(access_record.idins)
+            )).first()
+        await turno_index.ensure_fresh_async(self.db)
+        return ExamManager._token_for(access_record, key)
+
+    async def check_exam_status(self, access_id, token=None, confirm=False):
+        """Async ExamManager.check_exam_status"""
+        access_id = int(access_id)
+        status = ExamManager._token_status(access_id, token, confirm)
+        if status is not None:
+            return status
+
+        async with self.db.get_connection() as session:
+            row = (await session.execute(exam_status_statement(access_id))).first()
+        await turno_index.ensure_fresh_async(self.db)
+        return ExamManager._remember_status(access_id, ExamManager._status_from_row(access_id, row))
+
+    async def submit_exam(self, access_id, github_link):
+        """Async ExamManager.submit_exam: one UPDATE plus the outbox insert"""
+        try:
+            access_id = int(access_id)
+        except (TypeError, ValueError):
+            logger.error("Invalid access_id: %s", access_id)
+            return False
+        if group_commit.enabled(self.db.engine):
+            writer = group_commit.get_async_submission_writer(self.db)
+            if not await writer.submit(access_id, github_link):
+                return False
+            logger.info("Exam submitted successfully for access_id: %s", access_id)
+            return True
+
+        now = datetime.datetime.now()
+        async with self.db.get_connection() as session:
+            try:
+                idins = (await session.execute(
+                    submit_exam_statement(access_id, now, github_link)
+                )).scalar()
+                if idins is None:
+                    logger.error("No access record found for access_id: %s", access_id)
+                    return False
+
+                email = (await session.execute(inscription_email_statement(idins))).scalar()
+                if email:
+                    enqueue_email(session, **build_submission_email(email, now, github_link))
+                if session.bind.dialect.name == 'postgresql':
+                    await session.execute(notify_statement(access_id, 'submitted'))
+
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                logger.error("Error in submit_exam: %s", e, exc_info=True)
+                return False
+
+        status_confirmations.invalidate(access_id)
+        logger.info("Exam submitted successfully for access_id: %s", access_id)
+        return True
+
+    async def extend_exam(self, access_id, minutes):
+        """Async ExamManager.extend_exam"""
+        await turno_index.ensure_fresh_async(self.db)
+        async with self.db.get_connection() as session:
+            try:
+                row = (await session.execute(
+                    extend_exam_statement(int(access_id), int(minutes))
+                )).first()
+                if row is None:
+                    await session.rollback()
+                    return None
+                key = (await session.execute(
+                    inscription_turno_key_statement(row.idins)
+                )).first()
+                turno = turno_index.open_at(key.idtectun, key.regular, row.acceso) if key else None
+                if turno is None:
+                    await session.rollback()
+                    return None
+
+                deadline = ExamManager._deadline(row.acceso, turno, row.extra_minutes)
+                if session.bind.dialect.name == 'postgresql':
+                    await session.execute(notify_statement(
+                        row.id, 'extended', deadline=int(deadline.timestamp())
+                    ))
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+        status_confirmations.invalidate(row.id)
+        logger.info("Examen %s prorrogado %s minutos, vence %s", row.id, minutes, deadline)
+        return deadline
+
+    async def open_exam_id(self, now=None):
+        """Async ExamManager.open_exam_id"""
+        await turno_index.ensure_fresh_async(self.db)
+        return turno_index.exam_open_at(now or datetime.datetime.now())
+
+    async def is_exam_open(self, exam_id, now=None):
+        """Async ExamManager.is_exam_open"""
+        await turno_index.ensure_fresh_async(self.db)
+        return turno_index.exam_is_open(exam_id, now or datetime.datetime.now())
+
+    async def get_exam_instructions(self, exam_id):
+        """Retrieve exam README instructions"""
+        try:
+            async with self.db.get_connection() as session:
+                exalink = (await session.execute(exam_instructions_statement(exam_id))).scalar()
+        except Exception as e:
+            logger.error("Error al obtener instrucciones de examen: %s", e, exc_info=True)
+            return None
+        if exalink is None:
+            logger.error("No se encontraron instrucciones para Exam ID: %s", exam_id)
+        return exalink
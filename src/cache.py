@@ -0,0 +1,167 @@
+# src/cache.py
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .config import Config
+
+
+class StampFile:
+    """
+    A file whose mtime signals "data changed" across processes.
+    ``changed()`` stats the file at most every ``check_interval`` seconds.
+    """
+
+    def __init__(self, path, check_interval=5):
+        self.path = path
+        self.check_interval = check_interval
+        self._mtime = self._read()
+        self._checked_at = time.monotonic()
+
+    def touch(self):
+        with open(self.path, 'a'):
+            os.utime(self.path, None)
+        self._mtime = self._read()
+
+    def changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        mtime = self._read()
+        if mtime != self._mtime:
+            self._mtime = mtime
+            return True
+        return False
+
+    def _read(self):
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a per-entry time to live and a maximum
+    number of entries.
+
+    When a StampFile is given, ``clear(broadcast=True)`` touches it and
+    every process sharing it drops its entries once it notices, so other
+    processes can invalidate this one.
+    """
+
+    def __init__(self, max_entries, ttl, stamp=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stamp = stamp
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        if self.stamp is not None and self.stamp.changed():
+            self.clear()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store ``value``; ``ttl`` overrides the cache's time to live for this entry"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def clear(self, broadcast=False):
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+        if broadcast and self.stamp is not None:
+            self.stamp.touch()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Tocado por los scripts de importación después de cargar datos; cada
+# consumidor usa su propio StampFile sobre esta ruta
+DATA_STAMP_PATH = Config.ROSTER_CACHE_STAMP or os.path.join(
+    tempfile.gettempdir(), 'examenes_roster.stamp'
+)
+
+# Alumno -> Inscriptos -> Tecnicatura por DNI. El chequeo de Acceso no
+# se cachea: siempre se consulta en la base.
+roster_cache = TTLCache(
+    max_entries=Config.ROSTER_CACHE_MAX_ENTRIES,
+    ttl=Config.ROSTER_CACHE_TTL,
+    stamp=StampFile(DATA_STAMP_PATH, Config.ROSTER_CACHE_STAMP_CHECK_SECONDS),
+)
+
+
+# exam id -> RenderedPage de /exam (src/exam_page.py). Cambios en
+# examen/turnos llegan por el mismo stamp que el roster.
+exam_page_cache = TTLCache(
+    max_entries=Config.EXAM_PAGE_CACHE_MAX_ENTRIES,
+    ttl=Config.EXAM_PAGE_CACHE_TTL,
+    stamp=StampFile(DATA_STAMP_PATH, Config.ROSTER_CACHE_STAMP_CHECK_SECONDS),
+)
+
+
+# access_id -> última confirmación contra la base en este proceso; se
+# invalida al enviar o prorrogar el examen
+status_confirmations = TTLCache(
+    max_entries=Config.ROSTER_CACHE_MAX_ENTRIES,
+    ttl=Config.EXAM_STATUS_CONFIRM_SECONDS,
+)
+
+
+def invalidate_roster_cache(dni=None):
+    """
+    Drop cached roster entries after loading data.
+    With a DNI only that entry is dropped in this process; without one the
+    whole cache is cleared here and in every process sharing the stamp
+    file (which also makes their turno window index and exam page cache
+    reload).
+    """
+    if dni is not None:
+        roster_cache.invalidate(dni)
+    else:
+        roster_cache.clear(broadcast=True)
+        exam_page_cache.clear()
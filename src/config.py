@@ -12,16 +12,144 @@ class Config:
     DB_NAME = os.getenv('DB_NAME')
     DB_USER = os.getenv('DB_USER')
     DB_PASSWORD = os.getenv('DB_PASSWORD')
+    # URL completa de SQLAlchemy; si está definida reemplaza a DB_*
+    DATABASE_URL = os.getenv('DATABASE_URL')
+    # Para la app ASGI (src/asgi.py); por defecto DATABASE_URL/DB_* con asyncpg
+    ASYNC_DATABASE_URL = os.getenv('ASYNC_DATABASE_URL')
     SENDGRID_API_KEY = os.getenv('SENDGRID_API_KEY')
-    # Generate secret key, prioritizing environment variable
+
+    # Envío de emails: 'sendgrid', 'smtp' o 'memory'
+    EMAIL_TRANSPORT = os.getenv('EMAIL_TRANSPORT', 'sendgrid')
+    SMTP_HOST = os.getenv('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 1025))
+    SMTP_USER = os.getenv('SMTP_USER')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'false').lower() == 'true'
+
+    # Outbox de emails y su worker
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 50))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+    EMAIL_OUTBOX_BACKOFF_SECONDS = int(os.getenv('EMAIL_OUTBOX_BACKOFF_SECONDS', 30))
+    EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv('EMAIL_OUTBOX_POLL_SECONDS', 2))
+    EMAIL_OUTBOX_WORKER_THREAD = os.getenv('EMAIL_OUTBOX_WORKER_THREAD', 'false').lower() == 'true'
+
+    # Connection pool (one engine per process, shared by every ExamManager)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+
+    # Réplicas de lectura (DSNs separados por coma). Una réplica con más de
+    # REPLICA_MAX_LAG_SECONDS de atraso (medido cada REPLICA_LAG_CHECK_SECONDS)
+    # no recibe lecturas; lo escrito por este proceso se lee del primario
+    # durante REPLICA_STICKY_SECONDS
+    DATABASE_REPLICA_URLS = [
+        url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()
+    ]
+    REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_LAG_CHECK_SECONDS = float(os.getenv('REPLICA_LAG_CHECK_SECONDS', 2))
+    REPLICA_STICKY_SECONDS = float(os.getenv(
+        'REPLICA_STICKY_SECONDS', REPLICA_MAX_LAG_SECONDS + REPLICA_LAG_CHECK_SECONDS
+    ))
+
+    # Admission control (src/admission.py): requests a la base a la vez por
+    # worker (por defecto, lo que da el pool), cuántas esperan y cuánto;
+    # el resto recibe 503 con Retry-After
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', DB_POOL_SIZE + DB_MAX_OVERFLOW))
+    ADMISSION_MAX_WAITING = int(os.getenv('ADMISSION_MAX_WAITING', 20))
+    ADMISSION_WAIT_SECONDS = float(os.getenv('ADMISSION_WAIT_SECONDS', 2))
+    ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', 2))
+
+    # Roster cache (DNI -> alumno/inscripción/tecnicatura/turnos)
+    ROSTER_CACHE_TTL = int(os.getenv('ROSTER_CACHE_TTL', 300))
+    ROSTER_CACHE_MAX_ENTRIES = int(os.getenv('ROSTER_CACHE_MAX_ENTRIES', 10000))
+    ROSTER_CACHE_STAMP = os.getenv('ROSTER_CACHE_STAMP')
+    ROSTER_CACHE_STAMP_CHECK_SECONDS = int(os.getenv('ROSTER_CACHE_STAMP_CHECK_SECONDS', 5))
+
+    # Índice en memoria de ventanas de turnos
+    TURNO_INDEX_REFRESH_SECONDS = int(os.getenv('TURNO_INDEX_REFRESH_SECONDS', 60))
+
+    # Página /exam renderizada por examen (igual para todo el turno); el
+    # navegador revalida con If-None-Match cada EXAM_PAGE_MAX_AGE segundos
+    EXAM_PAGE_CACHE_TTL = int(os.getenv('EXAM_PAGE_CACHE_TTL', 300))
+    EXAM_PAGE_CACHE_MAX_ENTRIES = int(os.getenv('EXAM_PAGE_CACHE_MAX_ENTRIES', 64))
+    EXAM_PAGE_MAX_AGE = int(os.getenv('EXAM_PAGE_MAX_AGE', 0))
+
+    # Pre-warm (src/prewarm.py): PREWARM_LEAD_MINUTES antes de cada f_desde
+    # se cargan roster, página /exam y conexiones del pool en cada proceso
+    PREWARM_ENABLED = os.getenv('PREWARM_ENABLED', 'true').lower() == 'true'
+    PREWARM_LEAD_MINUTES = float(os.getenv('PREWARM_LEAD_MINUTES', 5))
+    PREWARM_POLL_SECONDS = float(os.getenv('PREWARM_POLL_SECONDS', 60))
+    PREWARM_POOL_CONNECTIONS = int(os.getenv('PREWARM_POOL_CONNECTIONS', DB_POOL_SIZE))
+
+    # Group commit de /submit_exam (src/group_commit.py, sólo Postgres): los
+    # envíos que llegan dentro de la ventana se escriben con un solo COMMIT
+    SUBMIT_GROUP_COMMIT = os.getenv('SUBMIT_GROUP_COMMIT', 'true').lower() == 'true'
+    SUBMIT_BATCH_WINDOW_MS = float(os.getenv('SUBMIT_BATCH_WINDOW_MS', 5))
+    SUBMIT_BATCH_MAX = int(os.getenv('SUBMIT_BATCH_MAX', 200))
+
+    # Filas por lote del cursor del servidor en la exportación de entregas
+    EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 1000))
+
+    # check_exam_status responde desde el token firmado y sólo confirma
+    # contra la base cada tantos segundos por acceso
+    EXAM_STATUS_CONFIRM_SECONDS = int(os.getenv('EXAM_STATUS_CONFIRM_SECONDS', 300))
+
+    # /metrics (formato Prometheus); si hay token se exige como Bearer
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+    # Bearer token de los endpoints /admin/*; sin token quedan deshabilitados
+    ADMIN_API_TOKEN = os.getenv('ADMIN_API_TOKEN')
+
+    # Rate limiting (src/rate_limit.py): requests por IP y minuto en la API
+    # JSON, intentos por DNI y minuto en /validate_dni
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_REQUESTS = int(os.getenv('RATE_LIMIT_REQUESTS', 100))
+    RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', 5))
+    # 'memory' (por proceso) o 'redis' (compartido entre workers e instancias)
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    # Proxies propios delante de la app (X-Forwarded-For); 0 = remote_addr
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv('RATE_LIMIT_TRUSTED_PROXIES', 0))
+
+    # Stream SSE de estado del examen (app ASGI), límites por proceso
+    SSE_MAX_SUBSCRIBERS = int(os.getenv('SSE_MAX_SUBSCRIBERS', 5000))
+    SSE_MAX_PER_ACCESS = int(os.getenv('SSE_MAX_PER_ACCESS', 3))
+    SSE_QUEUE_SIZE = int(os.getenv('SSE_QUEUE_SIZE', 8))
+    SSE_HEARTBEAT_SECONDS = int(os.getenv('SSE_HEARTBEAT_SECONDS', 20))
+
+    # Logging: 'json' o 'text'; LOG_FILE vacío desactiva el archivo.
+    # LOG_SAMPLE_RATES muestrea INFO/DEBUG por ruta, p.ej. "check_exam_status=0.05"
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+    LOG_FILE = os.getenv('LOG_FILE', os.path.join('logs', 'app.log'))
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() == 'true'
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+
+    # Secret key from the environment; see ensure_secret_key()
     SECRET_KEY = os.getenv('FLASK_SECRET_KEY')
-    
-    # If no environment variable, generate a new one
-    if not SECRET_KEY:
-        SECRET_KEY = secrets.token_hex(16)
-        # Optionally, write to .env file
-        with open('.env', 'a') as f:
-            f.write(f"\nFLASK_SECRET_KEY={SECRET_KEY}")
+
+    @classmethod
+    def ensure_secret_key(cls, persist=True):
+        """
+        Generate a SECRET_KEY when none is configured. With ``persist`` it is
+        appended to .env so later runs reuse it; without it (serverless,
+        read-only filesystem) it only lives in this process, and exam tokens
+        signed by other instances will not verify.
+        """
+        if cls.SECRET_KEY:
+            return cls.SECRET_KEY
+        cls.SECRET_KEY = secrets.token_hex(16)
+        if persist:
+            with open('.env', 'a') as f:
+                f.write(f"\nFLASK_SECRET_KEY={cls.SECRET_KEY}")
+        else:
+            logging.warning("FLASK_SECRET_KEY no configurada; se usa una clave efímera")
+        return cls.SECRET_KEY
+
     @classmethod
     def validate(cls):
         """
@@ -29,6 +157,8 @@ class Config:
         Raises an exception if any critical configuration is missing
         """
         required_keys = ['DB_HOST', 'DB_PORT', 'DB_NAME', 'DB_USER', 'DB_PASSWORD']
+        if cls.DATABASE_URL:
+            required_keys = []
         missing_keys = [key for key in required_keys if not getattr(cls, key)]
         
         if missing_keys:
@@ -1,21 +1,229 @@
 # src/database.py
+"""
+One SQLAlchemy engine per process for the primary, plus one per read
+replica in DATABASE_REPLICA_URLS.
+
+``DatabaseConnection.get_connection(read_only=True)`` hands out a session
+on a replica whose replication lag is within REPLICA_MAX_LAG_SECONDS,
+and on the primary when there is none. A read that must see a write of
+this process passes the ``sticky_key`` given to ``mark_written`` and
+stays on the primary for REPLICA_STICKY_SECONDS.
+"""
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from .cache import TTLCache
 from .config import Config
+from .logging_config import LOGGER_NAME
+from .metrics import db_read_sessions, db_replica_lag, instrument_engine
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Un solo engine (y un solo pool) por proceso, creado en el primer uso
+_engine = None
+_session_factory = None
+_replicas = None
+_engine_lock = threading.Lock()
+
+# Claves escritas hace poco por este proceso: sus lecturas van al primario
+recent_writes = TTLCache(
+    max_entries=Config.ROSTER_CACHE_MAX_ENTRIES,
+    ttl=Config.REPLICA_STICKY_SECONDS,
+)
+
+# 0 cuando la réplica aplicó todo lo recibido: un primario sin escrituras
+# no la hace parecer atrasada
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def _connection_string():
+    if Config.DATABASE_URL:
+        return Config.DATABASE_URL
+    return (
+        f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD}"
+        f"@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
+    )
+
+
+def _create_engine(url):
+    engine = create_engine(
+        url,
+        pool_size=Config.DB_POOL_SIZE,
+        max_overflow=Config.DB_MAX_OVERFLOW,
+        pool_timeout=Config.DB_POOL_TIMEOUT,
+        pool_recycle=Config.DB_POOL_RECYCLE,
+        pool_pre_ping=Config.DB_POOL_PRE_PING,
+    )
+    instrument_engine(engine)
+    return engine
+
+
+def get_engine():
+    """Return the process-wide engine, creating it on first use"""
+    global _engine, _session_factory
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = _create_engine(_connection_string())
+                _session_factory = sessionmaker(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def replica_lag(engine):
+    """Seconds the replica behind ``engine`` is behind its primary"""
+    if engine.dialect.name != 'postgresql':
+        return 0.0
+    with engine.connect() as connection:
+        return float(connection.execute(_REPLICA_LAG_SQL).scalar() or 0)
+
+
+class Replica:
+    def __init__(self, name, engine):
+        self.name = name
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+        self.lag = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+
+class ReplicaSet:
+    """
+    Round robin over the replicas fresh enough to read from. Each lag is
+    re-measured at most every ``check_interval`` seconds by the one
+    thread that finds it old; the others keep using the last value. An
+    unreachable replica counts as infinitely late until the next check.
+    """
+
+    def __init__(self, engines, max_lag, check_interval, measure_lag=replica_lag,
+                 clock=time.monotonic):
+        self.replicas = [Replica(name, engine) for name, engine in engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.measure_lag = measure_lag
+        self.clock = clock
+        self._turn = itertools.count()
+
+    def pick(self):
+        """A replica within max_lag, or None"""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._turn) % len(self.replicas)]
+            self._refresh(replica)
+            if replica.lag is not None and replica.lag <= self.max_lag:
+                return replica
+        return None
+
+    def _refresh(self, replica):
+        now = self.clock()
+        if replica.checked_at is not None and now - replica.checked_at < self.check_interval:
+            return
+        if not replica.lock.acquire(blocking=False):
+            return
+        try:
+            try:
+                replica.lag = self.measure_lag(replica.engine)
+            except Exception as e:
+                if replica.lag != math.inf:
+                    logger.warning("Réplica %s inaccesible, lecturas al primario: %s", replica.name, e)
+                replica.lag = math.inf
+            replica.checked_at = now
+            db_replica_lag.set(-1 if replica.lag == math.inf else replica.lag, replica=replica.name)
+        finally:
+            replica.lock.release()
+
+    def engines(self):
+        return [replica.engine for replica in self.replicas]
+
+
+def get_replicas():
+    """The ReplicaSet of this process, or None without DATABASE_REPLICA_URLS"""
+    global _replicas
+    if _replicas is None and Config.DATABASE_REPLICA_URLS:
+        with _engine_lock:
+            if _replicas is None:
+                _replicas = ReplicaSet(
+                    [(make_url(url).host or str(i), _create_engine(url))
+                     for i, url in enumerate(Config.DATABASE_REPLICA_URLS)],
+                    max_lag=Config.REPLICA_MAX_LAG_SECONDS,
+                    check_interval=Config.REPLICA_LAG_CHECK_SECONDS,
+                )
+    return _replicas
+
+
+def replica_engines():
+    replicas = get_replicas()
+    return replicas.engines() if replicas is not None else []
+
+
+def mark_written(key):
+    """Send reads with ``sticky_key=key`` to the primary for REPLICA_STICKY_SECONDS"""
+    recent_writes.set(key, True)
+
+
+def dispose_engine():
+    """Close every pooled connection and forget the shared engines"""
+    global _engine, _session_factory, _replicas
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        if _replicas is not None:
+            for engine in _replicas.engines():
+                engine.dispose()
+        _engine = None
+        _session_factory = None
+        _replicas = None
+
+
+def _dispose_after_fork():
+    global _engine_lock
+    # El hijo hereda los sockets del padre: se descartan sin cerrarlos
+    # para no romper las conexiones que el padre sigue usando.
+    _engine_lock = threading.Lock()
+    if _engine is not None:
+        _engine.dispose(close=False)
+    if _replicas is not None:
+        for engine in _replicas.engines():
+            engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
 
 class DatabaseConnection:
     def __init__(self):
-        connection_string = (
-            f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD}"
-            f"@{Config.DB_HOST}:{Config.DB_PORT}/{Config.DB_NAME}"
-        )
-        self.engine = create_engine(connection_string)
-        self.Session = sessionmaker(bind=self.engine)
-
-    def get_connection(self):
+        self.engine = get_engine()
+        self.Session = _session_factory
+        self.replicas = get_replicas()
+
+    def get_connection(self, read_only=False, sticky_key=None):
+        """
+        A session on the primary; with ``read_only`` on a fresh replica
+        when there is one and ``sticky_key`` was not written recently.
+        """
+        if read_only:
+            replica = None
+            if self.replicas is not None and not (
+                sticky_key is not None and recent_writes.get(sticky_key)
+            ):
+                replica = self.replicas.pick()
+            db_read_sessions.inc(target='replica' if replica else 'primary')
+            if replica is not None:
+                return replica.Session()
         return self.Session()
 
     def execute_query(self, query, params=None):
         with self.engine.connect() as connection:
             result = connection.execute(text(query), params or {})
-            return result
\ No newline at end of file
+            return result
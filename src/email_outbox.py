@@ -0,0 +1,140 @@
+# src/email_outbox.py
+import datetime
+import threading
+import time
+
+from sqlalchemy import select
+
+from .config import Config
+from .database import DatabaseConnection
+from .email_sender import get_transport
+from .models import EmailOutbox
+from .logging_config import setup_logging
+from .metrics import email_send_seconds
+
+logger = setup_logging()
+
+
+def enqueue_email(session, to_email, subject, html_content, now=None):
+    """
+    Add a pending email to ``session``. It is written by the caller's
+    commit, in the same transaction as whatever triggered it.
+    """
+    now = now or datetime.datetime.now()
+    message = EmailOutbox(
+        to_email=to_email,
+        subject=subject,
+        html_content=html_content,
+        status='pending',
+        attempts=0,
+        next_attempt_at=now,
+        created_at=now
+    )
+    session.add(message)
+    return message
+
+
+class OutboxWorker:
+    """
+    Drains email_outbox in batches through a pluggable transport.
+    Rows are claimed with FOR UPDATE SKIP LOCKED, so several workers can
+    run side by side. Failed sends are retried with exponential backoff
+    until ``max_attempts``, after which the row is marked 'failed'.
+    """
+
+    def __init__(self, db, transport, batch_size=None, max_attempts=None,
+                 backoff_seconds=None):
+        self.db = db
+        self.transport = transport
+        self.batch_size = batch_size or Config.EMAIL_OUTBOX_BATCH_SIZE
+        self.max_attempts = max_attempts or Config.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.backoff_seconds = backoff_seconds or Config.EMAIL_OUTBOX_BACKOFF_SECONDS
+        self._stop = threading.Event()
+
+    def drain_once(self, now=None):
+        """Send one batch; returns how many rows were processed"""
+        now = now or datetime.datetime.now()
+        session = self.db.get_connection()
+        try:
+            batch = session.execute(
+                select(EmailOutbox)
+                .where(
+                    EmailOutbox.status == 'pending',
+                    EmailOutbox.next_attempt_at <= now
+                )
+                .order_by(EmailOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+
+            for message in batch:
+                self._deliver(message, now)
+
+            session.commit()
+            return len(batch)
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def _deliver(self, message, now):
+        message.attempts += 1
+        transport = type(self.transport).__name__
+        start = time.perf_counter()
+        try:
+            self.transport.send(message.to_email, message.subject, message.html_content)
+        except Exception as e:
+            email_send_seconds.observe(time.perf_counter() - start,
+                                       transport=transport, outcome='error')
+            message.last_error = str(e)[:500]
+            if message.attempts >= self.max_attempts:
+                message.status = 'failed'
+                logger.error("Email %s descartado tras %s intentos: %s", message.id, message.attempts, e)
+            else:
+                delay = self.backoff_seconds * 2 ** (message.attempts - 1)
+                message.next_attempt_at = now + datetime.timedelta(seconds=delay)
+                logger.warning("Email %s falló (intento %s), reintento en %ss: %s",
+                               message.id, message.attempts, delay, e)
+        else:
+            email_send_seconds.observe(time.perf_counter() - start,
+                                       transport=transport, outcome='sent')
+            message.status = 'sent'
+            message.sent_at = datetime.datetime.now()
+            message.last_error = None
+
+    def run_forever(self, poll_seconds=None):
+        """Drain until stop(); sleeps only when a batch comes back empty"""
+        poll_seconds = poll_seconds or Config.EMAIL_OUTBOX_POLL_SECONDS
+        while not self._stop.is_set():
+            try:
+                processed = self.drain_once()
+            except Exception as e:
+                logger.error("Error drenando email_outbox: %s", e, exc_info=True)
+                processed = 0
+            if not processed:
+                self._stop.wait(poll_seconds)
+
+    def stop(self):
+        self._stop.set()
+
+
+def start_worker_thread(db=None, transport=None):
+    """Run an OutboxWorker in a daemon thread of this process"""
+    worker = OutboxWorker(db or DatabaseConnection(), transport or get_transport())
+    thread = threading.Thread(target=worker.run_forever, name='email-outbox', daemon=True)
+    thread.start()
+    return worker
+
+
+def main():
+    worker = OutboxWorker(DatabaseConnection(), get_transport())
+    logger.info("Worker de email_outbox iniciado (lote: %s)", worker.batch_size)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,25 +1,119 @@
 # src/email_sender.py
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
+import smtplib
+import threading
+from email.message import EmailMessage
+
 from .config import Config
 
-def send_exam_submission_email(to_email, submission_time, github_link):
-    """Send exam submission confirmation email"""
-    try:
-        message = Mail(
-            from_email='examenes@institutoalfa.com',
-            to_emails=to_email,
-            subject='Confirmación de Envío de Examen Final',
-            html_content=f'''
+FROM_EMAIL = 'examenes@institutoalfa.com'
+
+
+def build_submission_email(to_email, submission_time, github_link):
+    """Subject and HTML body of the exam submission confirmation"""
+    return {
+        'to_email': to_email,
+        'subject': 'Confirmación de Envío de Examen Final',
+        'html_content': f'''
             <strong>Detalles de Envío de Examen:</strong>
             <p>Hora de Envío: {submission_time}</p>
             <p>Link de Proyecto: <a href="{github_link}">{github_link}</a></p>
             '''
+    }
+
+
+class SendGridTransport:
+    """Sends through the SendGrid API, reusing one client"""
+
+    def __init__(self, api_key=None, from_email=FROM_EMAIL):
+        self.api_key = api_key or Config.SENDGRID_API_KEY
+        self.from_email = from_email
+        self._client = None
+
+    def send(self, to_email, subject, html_content):
+        from sendgrid.helpers.mail import Mail
+
+        if self._client is None:
+            from sendgrid import SendGridAPIClient
+            self._client = SendGridAPIClient(self.api_key)
+
+        message = Mail(
+            from_email=self.from_email,
+            to_emails=to_email,
+            subject=subject,
+            html_content=html_content
         )
-        
-        sg = SendGridAPIClient(Config.SENDGRID_API_KEY)
-        response = sg.send(message)
+        response = self._client.send(message)
+        if response.status_code >= 400:
+            raise RuntimeError(f"SendGrid respondió {response.status_code}")
         return response
+
+
+class SMTPTransport:
+    """Plain SMTP, e.g. a local fake SMTP sink during tests"""
+
+    def __init__(self, host='localhost', port=1025, username=None, password=None,
+                 use_tls=False, from_email=FROM_EMAIL):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.from_email = from_email
+
+    def send(self, to_email, subject, html_content):
+        message = EmailMessage()
+        message['From'] = self.from_email
+        message['To'] = to_email
+        message['Subject'] = subject
+        message.set_content(html_content, subtype='html')
+
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(message)
+
+
+class MemoryTransport:
+    """Keeps messages in a list; for tests and dry runs"""
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, to_email, subject, html_content):
+        with self._lock:
+            self.sent.append({
+                'to_email': to_email,
+                'subject': subject,
+                'html_content': html_content
+            })
+
+
+def get_transport(name=None):
+    """Build the transport selected by Config.EMAIL_TRANSPORT"""
+    name = (name or Config.EMAIL_TRANSPORT).lower()
+    if name == 'sendgrid':
+        return SendGridTransport()
+    if name == 'smtp':
+        return SMTPTransport(
+            host=Config.SMTP_HOST,
+            port=Config.SMTP_PORT,
+            username=Config.SMTP_USER,
+            password=Config.SMTP_PASSWORD,
+            use_tls=Config.SMTP_USE_TLS
+        )
+    if name == 'memory':
+        return MemoryTransport()
+    raise ValueError(f"Transporte de email desconocido: {name}")
+
+
+def send_exam_submission_email(to_email, submission_time, github_link, transport=None):
+    """Send exam submission confirmation email"""
+    try:
+        email = build_submission_email(to_email, submission_time, github_link)
+        return (transport or get_transport()).send(**email)
     except Exception as e:
         print(f"Error sending email: {e}")
-        return None
\ No newline at end of file
+        return None
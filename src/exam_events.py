@@ -0,0 +1,205 @@
+# src/exam_events.py
+"""
+Exam status events pushed to students over Server-Sent Events.
+
+Writers (submit_exam, extend_exam) add a pg_notify() to their own
+transaction, so the event is only published if the change commits and
+reaches every app process. Each ASGI process LISTENs on the channel
+(ExamEventListener) and fans events out to the local streams of that
+access through a bounded SubscriberRegistry:
+
+* at most SSE_MAX_SUBSCRIBERS open streams per process, and at most
+  SSE_MAX_PER_ACCESS per access (tabs of the same student);
+* each stream buffers at most SSE_QUEUE_SIZE events, dropping the oldest.
+
+So the memory of a connected student is one Subscriber and a queue of a
+few small tuples, and the total per process is capped.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import NamedTuple
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from .config import Config
+from .logging_config import LOGGER_NAME
+
+EVENTS_CHANNEL = 'exam_events'
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class ExamEvent(NamedTuple):
+    """``name`` is 'submitted', 'extended' or 'expired'; ``data`` is JSON-able"""
+    access_id: int
+    name: str
+    data: dict
+
+
+class RegistryFull(Exception):
+    """No room for another stream in this process (or for this access)"""
+
+
+def notify_statement(access_id, name, **data):
+    """SELECT pg_notify(...) publishing an ExamEvent when the transaction commits"""
+    payload = json.dumps({'access_id': access_id, 'name': name, 'data': data})
+    return select(func.pg_notify(EVENTS_CHANNEL, payload))
+
+
+def parse_notification(payload):
+    message = json.loads(payload)
+    return ExamEvent(int(message['access_id']), message['name'], message.get('data') or {})
+
+
+class Subscriber:
+    """One open stream: a bounded queue owned by its event loop"""
+
+    __slots__ = ('access_id', 'queue', 'loop')
+
+    def __init__(self, access_id, queue_size, loop):
+        self.access_id = access_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = loop
+
+    def deliver(self, event):
+        # Corre en el loop del stream; si el cliente no consume, se pierde
+        # el evento más viejo y no el último estado
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def next_event(self, timeout):
+        """The next event, or None after ``timeout`` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SubscriberRegistry:
+    """access_id -> open streams of this process, with hard limits"""
+
+    def __init__(self, max_subscribers, max_per_access, queue_size):
+        self.max_subscribers = max_subscribers
+        self.max_per_access = max_per_access
+        self.queue_size = queue_size
+        self.rejected = 0
+        self._by_access = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, access_id):
+        """Register a stream; raises RegistryFull when a limit is reached"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            current = self._by_access.get(access_id, ())
+            if self._count >= self.max_subscribers or len(current) >= self.max_per_access:
+                self.rejected += 1
+                raise RegistryFull(access_id)
+            subscriber = Subscriber(access_id, self.queue_size, loop)
+            self._by_access[access_id] = current + (subscriber,)
+            self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            current = self._by_access.get(subscriber.access_id, ())
+            remaining = tuple(s for s in current if s is not subscriber)
+            if len(remaining) == len(current):
+                return
+            self._count -= 1
+            if remaining:
+                self._by_access[subscriber.access_id] = remaining
+            else:
+                del self._by_access[subscriber.access_id]
+
+    def publish(self, event):
+        """Hand ``event`` to every local stream of its access; thread-safe"""
+        with self._lock:
+            subscribers = self._by_access.get(event.access_id, ())
+        for subscriber in subscribers:
+            subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+        return len(subscribers)
+
+    def __len__(self):
+        return self._count
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': self._count,
+                'accesses': len(self._by_access),
+                'rejected': self.rejected,
+            }
+
+
+registry = SubscriberRegistry(
+    max_subscribers=Config.SSE_MAX_SUBSCRIBERS,
+    max_per_access=Config.SSE_MAX_PER_ACCESS,
+    queue_size=Config.SSE_QUEUE_SIZE,
+)
+
+
+def format_sse(name, data):
+    """One text/event-stream message"""
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+class ExamEventListener:
+    """
+    LISTEN on EVENTS_CHANNEL with a dedicated asyncpg connection and
+    publish every notification to ``registry``. Reconnects on failure.
+    """
+
+    def __init__(self, dsn, registry, reconnect_seconds=5):
+        self.dsn = dsn
+        self.registry = registry
+        self.reconnect_seconds = reconnect_seconds
+        self._task = None
+
+    @classmethod
+    def from_url(cls, url, registry):
+        # asyncpg quiere un DSN libpq, sin el "+driver" de SQLAlchemy
+        dsn = make_url(url).set(drivername='postgresql').render_as_string(hide_password=False)
+        return cls(dsn, registry)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            self.registry.publish(parse_notification(payload))
+        except (ValueError, KeyError) as e:
+            logger.warning("Notificación de examen inválida: %s", e)
+
+    async def _run(self):
+        import asyncpg
+
+        while True:
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                try:
+                    await connection.add_listener(EVENTS_CHANNEL, self._on_notification)
+                    closed = asyncio.Event()
+                    connection.add_termination_listener(lambda c: closed.set())
+                    await closed.wait()
+                finally:
+                    await connection.close()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("LISTEN %s falló: %s", EVENTS_CHANNEL, e)
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,194 +1,391 @@
 # src/exam_manager.py
 import datetime
-from sqlalchemy import and_
-from .database import DatabaseConnection
-from .models import Alumno, Inscriptos, Tecnicatura, Turnos, Examen, Acceso
-from .email_sender import send_exam_submission_email
-from src.logging_config import setup_logging
-import logging
+from . import group_commit
+from .database import DatabaseConnection, mark_written
+from .cache import roster_cache, status_confirmations
+from .exam_token import InvalidTokenError, issue_token, read_token
+from .queries import (
+    eligibility_statement,
+    access_exists_statement,
+    exam_instructions_statement,
+    exam_status_statement,
+    extend_exam_statement,
+    inscription_email_statement,
+    inscription_turno_key_statement,
+    start_exam_statement,
+    submit_exam_statement,
+)
+from .exam_events import notify_statement
+from .records import AccessRecord, EligibilityRecord, RosterEntry
+from .turno_index import turno_index
+from .email_outbox import enqueue_email
+from .email_sender import build_submission_email
+from .logging_config import setup_logging
 
 # Setup logging
 logger = setup_logging()
 
+
 class ExamManager:
     def __init__(self):
         self.db = DatabaseConnection()
 
-    def validate_dni(self, dni):
-        """Validate and find student details based on DNI"""
-        session = self.db.get_connection()
+    def validate_dni(self, dni, now=None):
+        """
+        Resolve the student behind a DNI.
+        Returns an EligibilityRecord whose turno is the one open at ``now``
+        (looked up in turno_index), or None when the DNI has no inscription.
+        The roster part comes from roster_cache when possible; access_exists
+        is always read from the DB.
+        """
+        now = now or datetime.datetime.now()
+        turno_index.ensure_fresh(self.db)
+        entries = roster_cache.get(dni)
+
+        if entries is None:
+            # Un solo round trip trae el roster y el estado de Acceso
+            session = self.db.get_connection(read_only=True)
+            try:
+                rows = session.execute(eligibility_statement(dni)).all()
+            finally:
+                session.close()
+            return self._record_from_rows(dni, rows, now)
+
+        record = self._pick_record(entries, now)
+        if record is None:
+            return None
+
+        session = self.db.get_connection(read_only=True)
         try:
-            alumno = session.query(Alumno).filter_by(dni=dni).first()
-            if not alumno:
-                return None
+            access_exists = session.execute(
+                access_exists_statement(record.inscripcion_id)
+            ).scalar()
+        finally:
+            session.close()
+        return record._replace(access_exists=bool(access_exists))
 
-            # Find related inscriptos
-            inscriptos = session.query(Inscriptos).filter_by(iddni=alumno.id).first()
-            if not inscriptos:
-                return None
+    # Lógica sin I/O, compartida con AsyncExamManager (src/async_exam_manager.py)
 
-            # Find tecnicatura
-            tecnicatura = session.query(Tecnicatura).filter_by(id=inscriptos.idtectun).first()
+    @staticmethod
+    def _record_from_rows(dni, rows, now):
+        """Cache the roster of ``rows`` (eligibility_statement) and pick a record"""
+        entries = tuple(RosterEntry(*row[:-1]) for row in rows)
+        # Un DNI desconocido no se cachea: barrer DNIs no debe desalojar
+        # del LRU a los alumnos reales
+        if entries:
+            roster_cache.set(dni, entries)
+        access = {row.inscripcion_id: bool(row.access_exists) for row in rows}
+        record = ExamManager._pick_record(entries, now)
+        if record is None:
+            return None
+        return record._replace(access_exists=access[record.inscripcion_id])
 
-            # Find turnos
-            turnos = session.query(Turnos).filter(
-                and_(
-                    Turnos.idtec == inscriptos.idtectun,
-                    Turnos.regular == inscriptos.regular
-                )
-            ).first()
+    @staticmethod
+    def _pick_record(entries, now):
+        """Prefer the inscription whose turno is open at ``now``"""
+        for entry in entries:
+            turno = turno_index.open_at(entry.idtectun, entry.regular, now)
+            if turno is not None:
+                return EligibilityRecord(entry, turno, False)
+        if not entries:
+            return None
+        return EligibilityRecord(entries[0], None, False)
+
+    @staticmethod
+    def _eligibility_result(student_data, current_time):
+        if not student_data:
+            return {'eligible': False, 'message': 'No existe DNI inscripto para RENDIR EXAMENES FINALES EN CASA'}
 
+        # Check exam date range
+        if not student_data.window_open(current_time):
             return {
-                'alumno': alumno,
-                'inscriptos': inscriptos,
-                'tecnicatura': tecnicatura,
-                'turnos': turnos
+                'eligible': False, 
+                'message': 'Fuera del rango de fechas para tomar el examen'
+            }
+
+        # Check if already took the exam
+        if student_data.access_exists:
+            return {
+                'eligible': False, 
+                'message': 'Ya ha ocupado su cupón de EXAMEN'
             }
-        finally:
-            session.close()
+
+        return {
+            'eligible': True,
+            'student_data': student_data,
+            'exam_time_limit': student_data.tiempo
+        }
+
+    @staticmethod
+    def _deadline(acceso, turno, extra_minutes):
+        """Start time + turno.tiempo + administrative extension"""
+        return acceso + datetime.timedelta(minutes=turno.tiempo + (extra_minutes or 0))
+
+    @staticmethod
+    def _token_for(access_record, key):
+        """Exam token for ``access_record`` given its inscription turno key"""
+        if key is None:
+            return None
+        turno = turno_index.open_at(key.idtectun, key.regular, access_record.acceso)
+        if turno is None or not turno.tiempo:
+            return None
+        deadline = ExamManager._deadline(
+            access_record.acceso, turno, access_record.extra_minutes
+        )
+        return issue_token(access_record.id, access_record.acceso, deadline)
+
+    @staticmethod
+    def _token_status(access_id, token, confirm):
+        """
+        The status a valid token answers on its own, or None when the
+        database has to be read.
+        """
+        claims = None
+        if token:
+            try:
+                claims = read_token(token)
+            except InvalidTokenError:
+                logger.warning("Invalid exam token for access_id: %s", access_id)
+            if claims is not None and claims.access_id != access_id:
+                claims = None
+
+        # Un token vencido se confirma contra la base: puede haber prórroga
+        if claims is None or claims.expired():
+            return None
+        if not confirm and status_confirmations.get(access_id):
+            return {
+                'can_continue': True,
+                'deadline': int(claims.deadline.timestamp())
+            }
+        return None
+
+    @staticmethod
+    def _remember_status(access_id, status):
+        if status['can_continue']:
+            status_confirmations.set(access_id, True)
+        else:
+            status_confirmations.invalidate(access_id)
+        return status
+
+    @staticmethod
+    def _status_from_row(access_id, row):
+        """check_exam_status answer for an exam_status_statement row"""
+        if row is None:
+            return {
+                'can_continue': False,
+                'message': 'Registro de acceso no encontrado'
+            }
+
+        # Verificar si ya se envió el examen
+        if row.hora:
+            return {
+                'can_continue': False,
+                'message': 'El examen ya ha sido enviado'
+            }
+
+        if row.inscripcion_id is None:
+            logger.error("No se encontró inscripción para access_id: %s", access_id)
+            return {
+                'can_continue': False,
+                'message': 'Información de inscripción no encontrada'
+            }
+
+        turno = turno_index.open_at(row.idtectun, row.regular, row.acceso)
+        if turno is None:
+            logger.error("No se encontró turno para idtectun: %s", row.idtectun)
+            return {
+                'can_continue': False,
+                'message': 'Información de turno no encontrada'
+            }
+
+        deadline = ExamManager._deadline(row.acceso, turno, row.extra_minutes)
+        if datetime.datetime.now() > deadline:
+            return {
+                'can_continue': False,
+                'message': 'Tiempo máximo de examen excedido'
+            }
+
+        return {
+            'can_continue': True,
+            'deadline': int(deadline.timestamp())
+        }
 
     def check_exam_eligibility(self, dni):
         """Check if student can take the exam"""
-        session = self.db.get_connection()
-        try:
-            student_data = self.validate_dni(dni)
-            if not student_data:
-                return {'eligible': False, 'message': 'No existe DNI inscripto para RENDIR EXAMENES FINALES EN CASA'}
-
-            current_time = datetime.datetime.now()
-            turnos = student_data['turnos']
-
-            # Check exam date range
-            if turnos.f_desde <= current_time <= turnos.f_hasta:
-                # Check if already took the exam
-                existing_access = session.query(Acceso).filter_by(
-                    idins=student_data['inscriptos'].id
-                ).first()
-
-                if existing_access:
-                    return {
-                        'eligible': False, 
-                        'message': 'Ya ha ocupado su cupón de EXAMEN'
-                    }
-
-                return {
-                    'eligible': True,
-                    'student_data': student_data,
-                    'exam_time_limit': turnos.tiempo
-                }
-            else:
-                return {
-                    'eligible': False, 
-                    'message': 'Fuera del rango de fechas para tomar el examen'
-                }
-        finally:
-            session.close()
+        current_time = datetime.datetime.now()
+        return self._eligibility_result(self.validate_dni(dni, now=current_time), current_time)
 
     def start_exam(self, inscriptos_id):
-        """Record exam access"""
+        """
+        Record exam access with a single atomic upsert.
+        Concurrent or repeated calls for the same inscription all get the
+        same row back (id, idins and the original start time).
+        """
         session = self.db.get_connection()
         try:
             # Convertir a int si es necesario
             inscriptos_id = int(inscriptos_id)
             
-            # Verificar si ya existe un registro de acceso
-            existing_access = session.query(Acceso).filter_by(idins=inscriptos_id).first()
-            
-            if existing_access:
-                logger.warning(f"Acceso ya registrado para inscriptos_id: {inscriptos_id}")
-                # Crear una copia de los datos antes de cerrar la sesión
-                access_data = {
-                    'id': existing_access.id,
-                    'idins': existing_access.idins,
-                    'timestamp': existing_access.timestamp
-                }
-                session.close()
-                
-                # Recrear un objeto similar al original
-                new_access = Acceso()
-                new_access.id = access_data['id']
-                new_access.idins = access_data['idins']
-                new_access.timestamp = access_data['timestamp']
-                return new_access
-            
-            # Crear nuevo registro de acceso
-            new_access = Acceso(
-                idins=inscriptos_id,
-                acceso=datetime.datetime.now()
-            )
-            
-            session.add(new_access)
+            row = session.execute(
+                start_exam_statement(
+                    inscriptos_id,
+                    datetime.datetime.now(),
+                    dialect_name=session.get_bind().dialect.name
+                )
+            ).one()
             session.commit()
+            mark_written(('acceso', row.id))
             
-            # Obtener el ID antes de cerrar la sesión
-            access_id = new_access.id
-            
-            logger.info(f"Nuevo acceso registrado para inscriptos_id: {inscriptos_id}, ID: {access_id}")
-            
-            # Crear un objeto desconectado para devolver
-            disconnected_access = Acceso()
-            disconnected_access.id = access_id
-            disconnected_access.idins = inscriptos_id
-            disconnected_access.acceso = new_access.acceso
+            logger.info("Acceso registrado para inscriptos_id: %s, ID: %s", inscriptos_id, row.id)
             
-            # Cerrar la sesión
-            session.close()
-            
-            return disconnected_access
+            # Una tupla inmutable, sin identity map ni sesión detrás
+            return AccessRecord(*row)
         
         except Exception as e:
             session.rollback()
-            logger.error(f"Error registrando acceso: {str(e)}", exc_info=True)
-            session.close()
+            logger.error("Error registrando acceso: %s", e, exc_info=True)
             raise
-                    
+        finally:
+            session.close()
+
+    def issue_exam_token(self, access_record):
+        """
+        Signed token with the access id, start time and deadline
+        (start + turno.tiempo). None when no turno covers the start time.
+        """
+        session = self.db.get_connection(read_only=True)
+        try:
+            key = session.execute(
+                inscription_turno_key_statement(access_record.idins)
+            ).first()
+        finally:
+            session.close()
+
+        turno_index.ensure_fresh(self.db)
+        return self._token_for(access_record, key)
+
+    def check_exam_status(self, access_id, token=None, confirm=False):
+        """
+        Whether the exam behind ``access_id`` can continue.
+        A valid token answers expiry on its own; the database is only read
+        without a token, when ``confirm`` is set, or once every
+        EXAM_STATUS_CONFIRM_SECONDS per access in this process.
+        """
+        access_id = int(access_id)
+        status = self._token_status(access_id, token, confirm)
+        if status is not None:
+            return status
+        return self._remember_status(access_id, self._exam_status_from_db(access_id, confirm))
+
+    def _exam_status_from_db(self, access_id, confirm=False):
+        # Una confirmación explícita se lee del primario; si no, de una réplica
+        # salvo que este proceso haya escrito el acceso hace poco
+        session = self.db.get_connection(read_only=not confirm, sticky_key=('acceso', access_id))
+        try:
+            row = session.execute(exam_status_statement(access_id)).first()
+        finally:
+            session.close()
+        if row is None and not confirm:
+            # Recién creado en otro worker: la réplica todavía no lo tiene
+            session = self.db.get_connection()
+            try:
+                row = session.execute(exam_status_statement(access_id)).first()
+            finally:
+                session.close()
+        turno_index.ensure_fresh(self.db)
+        return self._status_from_row(access_id, row)
+
     def submit_exam(self, access_id, github_link):
         """Submit exam and update access record"""
-        session = self.db.get_connection()
         try:
-            # Convertir access_id a int si es necesario
             access_id = int(access_id)
+        except (TypeError, ValueError):
+            logger.error("Invalid access_id: %s", access_id)
+            return False
+
+        if group_commit.enabled(self.db.engine):
+            # Un solo COMMIT para todos los envíos de la ventana (src/group_commit.py)
+            if not group_commit.get_submission_writer(self.db).submit(access_id, github_link):
+                return False
+            logger.info("Exam submitted successfully for access_id: %s", access_id)
+            return True
+
+        session = self.db.get_connection()
+        try:
+            now = datetime.datetime.now()
             
-            # Buscar registro de acceso
-            access_record = session.query(Acceso).filter_by(id=access_id).first()
+            # Actualizar registro con hora actual y enlace de GitHub
+            idins = session.execute(submit_exam_statement(access_id, now, github_link)).scalar()
             
             # Validar que el registro exista
-            if not access_record:
-                logger.error(f"No access record found for access_id: {access_id}")
-                session.close()
+            if idins is None:
+                logger.error("No access record found for access_id: %s", access_id)
+                session.rollback()
                 return False
             
-            # Actualizar registro con hora actual y enlace de GitHub
-            access_record.hora = datetime.datetime.now()
-            access_record.link = github_link
+            # Obtener información del estudiante
+            email = session.execute(inscription_email_statement(idins)).scalar()
+            
+            # El correo de confirmación queda en el outbox, en la misma
+            # transacción; lo envía el worker de src/email_outbox.py
+            if email:
+                enqueue_email(session, **build_submission_email(email, now, github_link))
+
+            # Aviso a los streams SSE abiertos, al confirmar la transacción
+            if session.get_bind().dialect.name == 'postgresql':
+                session.execute(notify_statement(access_id, 'submitted'))
             
             # Confirmar cambios
             session.commit()
+            mark_written(('acceso', access_id))
+            status_confirmations.invalidate(access_id)
             
-            # Obtener información del estudiante
-            inscriptos = session.query(Inscriptos).filter_by(id=access_record.idins).first()
-            
-            # Enviar correo de confirmación
-            if inscriptos and inscriptos.email:
-                try:
-                    send_exam_submission_email(
-                        inscriptos.email, 
-                        access_record.hora, 
-                        github_link
-                    )
-                except Exception as email_error:
-                    logger.error(f"Error sending confirmation email: {str(email_error)}")
-            
-            logger.info(f"Exam submitted successfully for access_id: {access_id}")
+            logger.info("Exam submitted successfully for access_id: %s", access_id)
             return True
         
         except Exception as e:
             session.rollback()
-            logger.error(f"Error in submit_exam: {str(e)}", exc_info=True)
+            logger.error("Error in submit_exam: %s", e, exc_info=True)
             return False
         finally:
             session.close()
                         
+    def extend_exam(self, access_id, minutes):
+        """
+        Administrative extension of a running exam by ``minutes``.
+        Returns the new deadline, or None when the access does not exist,
+        was already submitted or has no turno.
+        """
+        session = self.db.get_connection()
+        try:
+            row = session.execute(extend_exam_statement(int(access_id), int(minutes))).first()
+            if row is None:
+                session.rollback()
+                return None
+            key = session.execute(inscription_turno_key_statement(row.idins)).first()
+            turno_index.ensure_fresh(self.db)
+            turno = turno_index.open_at(key.idtectun, key.regular, row.acceso) if key else None
+            if turno is None:
+                session.rollback()
+                return None
+
+            deadline = self._deadline(row.acceso, turno, row.extra_minutes)
+            if session.get_bind().dialect.name == 'postgresql':
+                session.execute(notify_statement(
+                    row.id, 'extended', deadline=int(deadline.timestamp())
+                ))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        mark_written(('acceso', row.id))
+        status_confirmations.invalidate(row.id)
+        logger.info("Examen %s prorrogado %s minutos, vence %s", row.id, minutes, deadline)
+        return deadline
+
     # def get_exam_instructions(self, exam_id):
     #    """Retrieve exam README instructions"""
     #    session = self.db.get_connection()
@@ -199,32 +396,37 @@ class ExamManager:
     #        session.close()
             
 
+    def open_exam_id(self, now=None):
+        """Exam of the turnos open now, when unambiguous (for /exam without ?exam_id=)"""
+        turno_index.ensure_fresh(self.db)
+        return turno_index.exam_open_at(now or datetime.datetime.now())
+
+    def is_exam_open(self, exam_id, now=None):
+        """Whether some turno of the exam is open now (/exam?exam_id=)"""
+        turno_index.ensure_fresh(self.db)
+        return turno_index.exam_is_open(exam_id, now or datetime.datetime.now())
+
     def get_exam_instructions(self, exam_id):
         """Retrieve exam README instructions"""
-        session = self.db.get_connection()
+        session = self.db.get_connection(read_only=True)
         try:
             # Log de depuración para ver el valor de exam_id
-            logger.info(f"Buscando instrucciones de examen para ID: {exam_id}")
+            logger.debug("Buscando instrucciones de examen para ID: %s", exam_id)
             
             # Buscar el exalink a través de la relación con Turnos
-            exam = (
-                session.query(Examen)
-                .join(Turnos, Turnos.idexa == Examen.id)
-                .filter(Turnos.idexa == exam_id)
-                .first()
-            )
+            exalink = session.execute(exam_instructions_statement(exam_id)).scalar()
             
-            if not exam:
-                logger.error(f"No se encontraron instrucciones para Exam ID: {exam_id}")
+            if not exalink:
+                logger.error("No se encontraron instrucciones para Exam ID: %s", exam_id)
                 return None
             
             # Log de depuración para ver el exalink recuperado
-            logger.info(f"Exalink encontrado: {exam.exalink}")
+            logger.debug("Exalink encontrado: %s", exalink)
             
             # Devolver el exalink
-            return exam.exalink
+            return exalink
         except Exception as e:
-            logger.error(f"Error al obtener instrucciones de examen: {str(e)}", exc_info=True)
+            logger.error("Error al obtener instrucciones de examen: %s", e, exc_info=True)
             return None
         finally:
             session.close()
\ No newline at end of file
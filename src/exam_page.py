@@ -0,0 +1,60 @@
+# src/exam_page.py
+"""
+The /exam page is the same for every student of an exam, so it is
+rendered once per exam id and kept in ``exam_page_cache`` with a strong
+ETag. A browser revalidating with If-None-Match gets a 304 straight from
+the cache, without a query or a template render.
+"""
+import hashlib
+from typing import NamedTuple
+
+from .cache import exam_page_cache
+from .config import Config
+
+
+class RenderedPage(NamedTuple):
+    body: str
+    etag: str
+
+
+def rendered_page(body):
+    digest = hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+    return RenderedPage(body, f'"{digest}"')
+
+
+def parse_exam_id(value):
+    """The ?exam_id= query parameter as a positive int, or None"""
+    try:
+        exam_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return exam_id if exam_id > 0 else None
+
+
+def cached_page(exam_id):
+    return exam_page_cache.get(exam_id) if exam_id is not None else None
+
+
+def remember_page(exam_id, body, instructions):
+    """Wrap ``body``; cache it only when the exam was found"""
+    page = rendered_page(body)
+    if exam_id is not None and instructions is not None:
+        exam_page_cache.set(exam_id, page)
+    return page
+
+
+def not_modified(if_none_match, etag):
+    """If-None-Match (weak comparison, RFC 9110 13.1.2) against ``etag``"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(','))
+    return etag in (tag[2:] if tag.startswith('W/') else tag for tag in candidates)
+
+
+def page_headers(page):
+    return {
+        'ETag': page.etag,
+        'Cache-Control': f'public, max-age={Config.EXAM_PAGE_MAX_AGE}, must-revalidate',
+    }
@@ -0,0 +1,69 @@
+# src/exam_token.py
+import base64
+import datetime
+import hashlib
+import hmac
+import json
+from typing import NamedTuple
+
+from .config import Config
+
+
+class InvalidTokenError(ValueError):
+    """Raised when an exam token is malformed or its signature does not match"""
+
+
+class ExamToken(NamedTuple):
+    access_id: int
+    started_at: datetime.datetime
+    deadline: datetime.datetime
+
+    def expired(self, now=None):
+        return (now or datetime.datetime.now()) > self.deadline
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    padding = '=' * (-len(text) % 4)
+    return base64.urlsafe_b64decode(text + padding)
+
+
+def _signature(payload, secret):
+    key = (secret or Config.SECRET_KEY or '').encode('utf-8')
+    return hmac.new(key, payload.encode('ascii'), hashlib.sha256).digest()
+
+
+def issue_token(access_id, started_at, deadline, secret=None):
+    """
+    Sign ``access_id``, start time and deadline with HMAC-SHA256.
+    The token is ``<payload>.<signature>``, both base64url encoded.
+    """
+    claims = {
+        'a': int(access_id),
+        's': int(started_at.timestamp()),
+        'd': int(deadline.timestamp()),
+    }
+    payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+    return f"{payload}.{_b64encode(_signature(payload, secret))}"
+
+
+def read_token(token, secret=None):
+    """Verify a token and return its ExamToken; raises InvalidTokenError"""
+    try:
+        payload, signature = str(token).split('.', 1)
+        expected = _signature(payload, secret)
+        if not hmac.compare_digest(_b64decode(signature), expected):
+            raise InvalidTokenError('Firma de token inválida')
+        claims = json.loads(_b64decode(payload))
+        return ExamToken(
+            access_id=int(claims['a']),
+            started_at=datetime.datetime.fromtimestamp(claims['s']),
+            deadline=datetime.datetime.fromtimestamp(claims['d']),
+        )
+    except InvalidTokenError:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidTokenError(f'Token mal formado: {e}') from e
@@ -0,0 +1,245 @@
+# src/group_commit.py
+"""
+Group commit for /submit_exam.
+
+At the deadline almost every student submits within a few seconds. One
+SELECT + UPDATE + SELECT + INSERT + COMMIT per request then queues on
+the connection pool and on Postgres' WAL flushes. Instead, submissions
+that arrive within SUBMIT_BATCH_WINDOW_MS of each other (up to
+SUBMIT_BATCH_MAX) are written by a single statement
+(queries.submit_batch_statement) and a single COMMIT. Each caller is
+answered only after the commit of its batch returned, so an
+acknowledged submission is as durable as before. The window is only
+waited during a burst (another submission already queued, or the last
+batch had more than one), so an isolated submission is not delayed.
+
+SubmissionWriter serves the threaded Flask workers (one writer thread
+per process); AsyncSubmissionWriter the ASGI app (one task per event
+loop). Both are Postgres-only; ExamManager keeps the per-request path
+for other databases and when SUBMIT_GROUP_COMMIT is off.
+"""
+import asyncio
+import datetime
+import logging
+import os
+import queue
+import threading
+import time
+
+from .cache import status_confirmations
+from .config import Config
+from .database import mark_written
+from .email_sender import build_submission_email
+from .exam_events import EVENTS_CHANNEL
+from .logging_config import LOGGER_NAME
+from .metrics import submit_batch_size
+from .queries import submit_batch_statement
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class _Pending:
+    __slots__ = ('access_id', 'link', 'done', 'ok')
+
+    def __init__(self, access_id, link, done):
+        self.access_id = access_id
+        self.link = link
+        self.done = done
+        self.ok = False
+
+
+def _batch_statement(batch, now):
+    """The statement for ``batch``; a repeated access keeps its last link"""
+    links = {}
+    for pending in batch:
+        links[pending.access_id] = pending.link
+    email = build_submission_email(None, now, '')
+    rows = [
+        (access_id, link, build_submission_email(None, now, link)['html_content'])
+        for access_id, link in links.items()
+    ]
+    return submit_batch_statement(rows, now, email['subject'], channel=EVENTS_CHANNEL)
+
+
+def _acknowledge(batch, submitted):
+    for pending in batch:
+        pending.ok = pending.access_id in submitted
+        if pending.ok:
+            mark_written(('acceso', pending.access_id))
+            # Los tokens de este acceso ya no alcanzan para seguir
+            status_confirmations.invalidate(pending.access_id)
+        else:
+            logger.error("No access record found for access_id: %s", pending.access_id)
+
+
+class SubmissionWriter:
+    """Coalesces submit() calls from many threads into batched commits"""
+
+    def __init__(self, db, window_ms=None, max_batch=None):
+        self.db = db
+        self.window = (Config.SUBMIT_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or Config.SUBMIT_BATCH_MAX
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last_batch = 0
+
+    def submit(self, access_id, link):
+        """True once the submission is committed, False if the access does not exist"""
+        pending = _Pending(access_id, link, threading.Event())
+        self._start()
+        self._queue.put(pending)
+        pending.done.wait()
+        return pending.ok
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='submit-writer',
+                                                    daemon=True)
+                    self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        window = self.window if self._last_batch > 1 or not self._queue.empty() else 0
+        deadline = time.monotonic() + window
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        self._last_batch = len(batch)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self.write(batch)
+            except Exception as e:
+                logger.error("Error en el lote de %s envíos: %s", len(batch), e, exc_info=True)
+            finally:
+                for pending in batch:
+                    pending.done.set()
+
+    def write(self, batch):
+        now = datetime.datetime.now()
+        session = self.db.get_connection()
+        try:
+            submitted = set(session.execute(_batch_statement(batch, now)).scalars())
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        submit_batch_size.observe(len(batch))
+        _acknowledge(batch, submitted)
+
+
+class AsyncSubmissionWriter:
+    """SubmissionWriter for coroutines; bound to the event loop that uses it"""
+
+    def __init__(self, db, window_ms=None, max_batch=None):
+        self.db = db
+        self.window = (Config.SUBMIT_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or Config.SUBMIT_BATCH_MAX
+        self._queue = asyncio.Queue()
+        self._task = None
+        self._last_batch = 0
+        self.loop = None
+
+    async def submit(self, access_id, link):
+        self.loop = asyncio.get_running_loop()
+        pending = _Pending(access_id, link, self.loop.create_future())
+        if self._task is None:
+            self._task = self.loop.create_task(self._run())
+        self._queue.put_nowait(pending)
+        await asyncio.shield(pending.done)
+        return pending.ok
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        window = self.window if self._last_batch > 1 or not self._queue.empty() else 0
+        deadline = time.monotonic() + window
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining) if remaining > 0
+                             else self._queue.get_nowait())
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+        self._last_batch = len(batch)
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self.write(batch)
+            except Exception as e:
+                logger.error("Error en el lote de %s envíos: %s", len(batch), e, exc_info=True)
+            finally:
+                for pending in batch:
+                    if not pending.done.done():
+                        pending.done.set_result(None)
+
+    async def write(self, batch):
+        now = datetime.datetime.now()
+        async with self.db.get_connection() as session:
+            try:
+                result = await session.execute(_batch_statement(batch, now))
+                submitted = set(result.scalars())
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+        submit_batch_size.observe(len(batch))
+        _acknowledge(batch, submitted)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_submission_writer(db):
+    """The SubmissionWriter of this process for the engine of ``db``"""
+    global _writer
+    # Un engine nuevo (dispose_engine) trae su propio writer
+    if _writer is None or _writer.db.engine is not db.engine:
+        with _writer_lock:
+            if _writer is None or _writer.db.engine is not db.engine:
+                _writer = SubmissionWriter(db)
+    return _writer
+
+
+def _forget_writer_after_fork():
+    global _writer, _writer_lock
+    # El hilo del writer no sobrevive al fork: el hijo crea el suyo
+    _writer = None
+    _writer_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_writer_after_fork)
+
+
+_async_writer = None
+
+
+def get_async_submission_writer(db):
+    """The AsyncSubmissionWriter of this event loop"""
+    global _async_writer
+    loop = asyncio.get_running_loop()
+    if (_async_writer is None or _async_writer.loop not in (None, loop)
+            or _async_writer.db.engine is not db.engine):
+        _async_writer = AsyncSubmissionWriter(db)
+    return _async_writer
+
+
+def enabled(engine):
+    """Whether submissions through ``engine`` go through a writer"""
+    return Config.SUBMIT_GROUP_COMMIT and engine.dialect.name == 'postgresql'
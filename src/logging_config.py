@@ -1,37 +1,233 @@
 # src/logging_config.py
+"""
+Logging for the app and its workers.
+
+Request threads only put the LogRecord on a bounded in-memory queue; a
+QueueListener thread formats it (one JSON object per line by default) and
+writes it to the console and the rotating file. With LOG_ASYNC=false the
+handlers are attached directly instead (serverless, where a background
+thread freezes between invocations). setup_logging() is idempotent, so
+every module can call it at import.
+
+High-frequency routes can be sampled with LOG_SAMPLE_RATES, e.g.
+``check_exam_status=0.05,index=0.1``: only that fraction of their
+DEBUG/INFO lines is kept. Warnings and errors are never dropped.
+"""
+import atexit
+import contextvars
+import datetime
+import itertools
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from .config import Config
+
+LOGGER_NAME = 'examenes_finales'
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Atributos propios de LogRecord; el resto vino por ``extra=``
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'route', 'sample_rate',
+}
+
+# Ruta (endpoint de Flask) que está atendiendo este hilo/contexto
+_route = contextvars.ContextVar('log_route', default=None)
+
+_lock = threading.Lock()
+_handlers = []
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``extra=`` fields are included as keys"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        route = getattr(record, 'route', None)
+        if route:
+            entry['route'] = route
+        sample_rate = getattr(record, 'sample_rate', None)
+        if sample_rate is not None:
+            entry['sample_rate'] = sample_rate
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_sample_rates(spec):
+    """'a=0.1,b=0.5' -> {'a': 0.1, 'b': 0.5}"""
+    rates = {}
+    for item in (spec or '').split(','):
+        if not item.strip():
+            continue
+        route, _, rate = item.partition('=')
+        rates[route.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class RouteSampler(logging.Filter):
+    """
+    Tags each record with the current route and keeps 1 of every
+    ``1/rate`` DEBUG/INFO records of the sampled routes. Counting instead
+    of drawing random numbers keeps the decision cheap and deterministic.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = dict(rates)
+        self._counters = {route: itertools.count() for route in self.rates}
+
+    def filter(self, record):
+        route = _route.get()
+        record.route = route
+        rate = self.rates.get(route)
+        if rate is None or rate >= 1.0 or record.levelno >= logging.WARNING:
+            return True
+        if rate <= 0.0:
+            return False
+        if next(self._counters[route]) % round(1 / rate):
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Never blocks the caller: records are queued as they are and formatted
+    by the listener thread. When the queue is full the record is dropped
+    and counted rather than waiting for the disk.
+    """
+
+    dropped = 0
+
+    def prepare(self, record):
+        # El formateo (mensaje, traceback) queda para el listener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            type(self).dropped += 1
+
+
+def _build_handlers():
+    if Config.LOG_FORMAT == 'json':
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(TEXT_FORMAT)
+
+    handlers = [logging.StreamHandler()]
+    if Config.LOG_FILE:
+        log_dir = os.path.dirname(Config.LOG_FILE)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        handlers.append(RotatingFileHandler(
+            Config.LOG_FILE,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
 
 def setup_logging():
-    # Ensure logs directory exists
-    log_dir = 'logs'
-    os.makedirs(log_dir, exist_ok=True)
-
-    # Configure logging
-    log_file = os.path.join(log_dir, 'app.log')
-    
-    # Create a custom logger
-    logger = logging.getLogger('examenes_finales')
-    logger.setLevel(logging.INFO)
-
-    # Create handlers
-    file_handler = RotatingFileHandler(
-        log_file, 
-        maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
-    )
-    console_handler = logging.StreamHandler()
-
-    # Create formatters and add it to handlers
-    log_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    file_handler.setFormatter(log_format)
-    console_handler.setFormatter(log_format)
-
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-
-    return logger
\ No newline at end of file
+    """Configure the app logger once per process and return it"""
+    global _handlers, _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        if _handlers:
+            return logger
+
+        handlers = _build_handlers()
+        if Config.LOG_ASYNC:
+            log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+            _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            _listener.start()
+            handlers = [_NonBlockingQueueHandler(log_queue)]
+
+        logger.addFilter(RouteSampler(parse_sample_rates(Config.LOG_SAMPLE_RATES)))
+        for handler in handlers:
+            logger.addHandler(handler)
+        logger.setLevel(Config.LOG_LEVEL)
+        logger.propagate = False
+        _handlers = handlers
+    return logger
+
+
+def stop_logging():
+    """Flush what is queued, stop the listener thread and close the handlers"""
+    global _handlers, _listener
+    with _lock:
+        logger = logging.getLogger(LOGGER_NAME)
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        for handler in _handlers:
+            logger.removeHandler(handler)
+            handler.close()
+        for sampler in [f for f in logger.filters if isinstance(f, RouteSampler)]:
+            logger.removeFilter(sampler)
+        _handlers = []
+        _listener = None
+
+
+def _restart_after_fork():
+    # El hilo del listener no sobrevive al fork (gunicorn --preload) y la
+    # cola pudo quedar con su lock tomado: cola e hilo nuevos en el hijo
+    global _lock
+    _lock = threading.Lock()
+    if _listener is None:
+        return
+    log_queue = queue.Queue(maxsize=Config.LOG_QUEUE_SIZE)
+    _handlers[0].queue = log_queue
+    _listener.queue = log_queue
+    _listener._thread = None
+    _listener.start()
+
+
+atexit.register(stop_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def bind_route(route):
+    """Tag log records of the current context with ``route``; returns a reset token"""
+    return _route.set(route)
+
+
+def unbind_route(token):
+    _route.reset(token)
+
+
+def init_app(app):
+    """Tag every log line of a request with its Flask endpoint"""
+    from flask import g, request
+
+    @app.before_request
+    def _bind_log_route():
+        g.log_route_token = bind_route(request.endpoint)
+
+    @app.teardown_request
+    def _unbind_log_route(exc):
+        token = g.pop('log_route_token', None)
+        if token is not None:
+            unbind_route(token)
@@ -0,0 +1,325 @@
+# src/metrics.py
+import bisect
+import contextlib
+import contextvars
+import functools
+import re
+import threading
+import time
+
+from .config import Config
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._values.items())
+        names = self.label_names + ('le',)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (bound,))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(names, key + ('+Inf',))} {count}")
+            labels = _format_labels(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector):
+        """``collector()`` runs before each scrape, e.g. to refresh gauges"""
+        self._collectors.append(collector)
+
+    def render(self):
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status',
+    labels=('endpoint', 'method', 'status')))
+rate_limited = registry.register(Counter(
+    'http_rate_limited_total', 'Requests rejected with 429 by endpoint and bucket (ip/dni)',
+    labels=('endpoint', 'scope')))
+admission_queue_depth = registry.register(Gauge(
+    'admission_queue_depth', 'Requests waiting for an admission slot right now'))
+admission_queued = registry.register(Counter(
+    'admission_queued_total', 'Requests that had to wait for an admission slot',
+    labels=('endpoint',)))
+admission_rejected = registry.register(Counter(
+    'admission_rejected_total', 'Requests shed with 503 by endpoint and reason (queue_full/timeout)',
+    labels=('endpoint', 'reason')))
+http_latency = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by endpoint',
+    labels=('endpoint', 'method')))
+http_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'Requests being served right now',
+    labels=('endpoint',)))
+request_sql_statements = registry.register(Histogram(
+    'http_request_sql_statements', 'SQL statements executed per request',
+    labels=('endpoint',), buckets=COUNT_BUCKETS))
+request_db_seconds = registry.register(Histogram(
+    'http_request_db_seconds', 'Time spent in the database per request',
+    labels=('endpoint',)))
+db_query_seconds = registry.register(Histogram(
+    'db_query_duration_seconds', 'SQL statement latency by statement kind and table',
+    labels=('query',)))
+db_read_sessions = registry.register(Counter(
+    'db_read_sessions_total', 'Read-only sessions by target (primary/replica)',
+    labels=('target',)))
+db_replica_lag = registry.register(Gauge(
+    'db_replica_lag_seconds', 'Last measured replication lag by replica (-1 unreachable)',
+    labels=('replica',)))
+submit_batch_size = registry.register(Histogram(
+    'submit_batch_size', 'Submissions written per group commit',
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500)))
+email_send_seconds = registry.register(Histogram(
+    'email_send_duration_seconds', 'Time spent handing one email to the transport',
+    labels=('transport', 'outcome')))
+roster_cache_stats = registry.register(Gauge(
+    'roster_cache', 'Roster cache size and lifetime hit/miss/eviction counts',
+    labels=('stat',)))
+exam_page_cache_stats = registry.register(Gauge(
+    'exam_page_cache', 'Rendered /exam page cache size and lifetime hit/miss counts',
+    labels=('stat',)))
+exam_event_streams = registry.register(Gauge(
+    'exam_event_streams', 'Open SSE exam streams of this process and rejected subscriptions',
+    labels=('stat',)))
+
+# [sentencias, segundos] de la request en curso
+_request_db = contextvars.ContextVar('request_db', default=None)
+
+_FINGERPRINT = re.compile(r'^\s*(\w+)')
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=512)
+def query_fingerprint(statement):
+    """'select alumno', 'insert acceso', ... for a SQL string"""
+    kind = _FINGERPRINT.match(statement)
+    table = _TABLE.search(statement)
+    return ' '.join(filter(None, (
+        kind.group(1).lower() if kind else 'other',
+        table.group(1).lower() if table else None,
+    )))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    db_query_seconds.observe(elapsed, query=query_fingerprint(statement))
+    current = _request_db.get()
+    if current is not None:
+        current[0] += 1
+        current[1] += elapsed
+
+
+def _handle_error(exception_context):
+    # Un statement que falla no llega a after_cursor_execute: sin esto la
+    # pila crece en la conexión del pool y los tiempos se desparejan
+    conn = exception_context.connection
+    if (conn is not None and exception_context.execution_context is not None
+            and conn.info.get('query_start')):
+        conn.info['query_start'].pop()
+
+
+_instrumented = set()
+_instrument_lock = threading.Lock()
+
+
+def instrument_engine(engine=None):
+    """
+    Time every SQL statement of ``engine``; with no argument, of every
+    Engine. database.get_engine() instruments the engine it creates.
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    engine = Engine if engine is None else engine
+    with _instrument_lock:
+        if id(engine) in _instrumented:
+            return
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+        _instrumented.add(id(engine))
+
+
+@contextlib.contextmanager
+def track_request(endpoint, method):
+    """
+    Request metrics for apps without Flask hooks (src/asgi.py). Set
+    ``status`` on the yielded dict; it stays 500 if the body raises.
+    """
+    result = {'status': 500}
+    http_in_flight.inc(endpoint=endpoint)
+    token = _request_db.set([0, 0.0])
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        http_latency.observe(time.perf_counter() - start, endpoint=endpoint, method=method)
+        http_requests.inc(endpoint=endpoint, method=method, status=result['status'])
+        db = _request_db.get()
+        request_sql_statements.observe(db[0], endpoint=endpoint)
+        request_db_seconds.observe(db[1], endpoint=endpoint)
+        _request_db.reset(token)
+        http_in_flight.dec(endpoint=endpoint)
+
+
+def authorized(authorization_header):
+    """Whether a scrape may read /metrics (always, without METRICS_TOKEN)"""
+    if not Config.METRICS_TOKEN:
+        return True
+    return authorization_header == f"Bearer {Config.METRICS_TOKEN}"
+
+
+def init_app(app):
+    """Per-request metrics middleware plus the /metrics endpoint"""
+    from flask import Response, abort, g, request
+
+    from .cache import exam_page_cache, roster_cache
+
+    def _endpoint_label():
+        return request.endpoint or 'unmatched'
+
+    def _collect_roster_cache():
+        for stat, value in roster_cache.stats().items():
+            roster_cache_stats.set(value, stat=stat)
+        for stat, value in exam_page_cache.stats().items():
+            exam_page_cache_stats.set(value, stat=stat)
+
+    registry.add_collector(_collect_roster_cache)
+
+    @app.before_request
+    def _start_metrics():
+        g.metrics_start = time.perf_counter()
+        g.metrics_db = _request_db.set([0, 0.0])
+        http_in_flight.inc(endpoint=_endpoint_label())
+
+    @app.after_request
+    def _record_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        endpoint = _endpoint_label()
+        http_latency.observe(time.perf_counter() - start,
+                             endpoint=endpoint, method=request.method)
+        http_requests.inc(endpoint=endpoint, method=request.method,
+                          status=response.status_code)
+        db = _request_db.get()
+        if db is not None:
+            request_sql_statements.observe(db[0], endpoint=endpoint)
+            request_db_seconds.observe(db[1], endpoint=endpoint)
+        return response
+
+    @app.teardown_request
+    def _finish_metrics(exc):
+        token = g.pop('metrics_db', None)
+        if token is not None:
+            http_in_flight.dec(endpoint=_endpoint_label())
+            _request_db.reset(token)
+
+    @app.route('/metrics')
+    def metrics():
+        if not authorized(request.headers.get('Authorization')):
+            abort(401)
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,277 @@
+# src/migrations.py
+"""
+Versioned schema migrations.
+
+    python -m src.migrations status
+    python -m src.migrations up [--target N]
+    python -m src.migrations down --target N
+    python -m src.migrations check
+
+Applied versions are recorded in schema_migrations. Each migration runs
+in its own transaction. ``check`` EXPLAINs the hot-path queries of
+ExamManager and fails if any of them needs a sequential scan.
+"""
+import argparse
+import datetime
+import sys
+from typing import List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+
+from .exam_events import EVENTS_CHANNEL
+from .queries import (
+    access_exists_statement,
+    eligibility_statement,
+    exam_status_statement,
+    inscription_email_statement,
+    inscription_turno_key_statement,
+    start_exam_statement,
+    submit_batch_statement,
+    submit_exam_statement,
+)
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    up: List[str]
+    down: List[str]
+
+
+def _add_unique_constraint(table, name, column):
+    # ADD CONSTRAINT no acepta IF NOT EXISTS
+    return f"""
+        DO $$ BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{name}') THEN
+                ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({column});
+            END IF;
+        END $$
+    """
+
+
+MIGRATIONS = [
+    Migration(
+        1, 'hot_path_indexes',
+        up=[
+            _add_unique_constraint('alumno', 'alumno_dni_key', 'dni'),
+            "CREATE INDEX IF NOT EXISTS inscriptos_iddni_idx ON inscriptos (iddni)",
+            "CREATE INDEX IF NOT EXISTS acceso_idins_idx ON acceso (idins)",
+            "CREATE INDEX IF NOT EXISTS turnos_idtec_regular_idx ON turnos (idtec, regular)",
+        ],
+        down=[
+            "DROP INDEX IF EXISTS turnos_idtec_regular_idx",
+            "DROP INDEX IF EXISTS acceso_idins_idx",
+            "DROP INDEX IF EXISTS inscriptos_iddni_idx",
+            "ALTER TABLE alumno DROP CONSTRAINT IF EXISTS alumno_dni_key",
+        ],
+    ),
+    Migration(
+        2, 'email_outbox',
+        up=[
+            """
+            CREATE TABLE IF NOT EXISTS email_outbox (
+                id SERIAL PRIMARY KEY,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                html_content TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending'
+                    CHECK (status IN ('pending', 'sent', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMP NOT NULL DEFAULT now(),
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                sent_at TIMESTAMP,
+                last_error TEXT
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS email_outbox_pending_idx
+                ON email_outbox (next_attempt_at) WHERE status = 'pending'
+            """,
+        ],
+        down=[
+            "DROP TABLE IF EXISTS email_outbox",
+        ],
+    ),
+    Migration(
+        3, 'acceso_idins_unique',
+        up=[
+            # Conservar un acceso por inscripción: el ya enviado, si lo hay,
+            # y si no el primero que se registró
+            """
+            DELETE FROM acceso WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (
+                        PARTITION BY idins ORDER BY (hora IS NULL), id
+                    ) AS rn
+                    FROM acceso
+                ) duplicados
+                WHERE rn > 1
+            )
+            """,
+            _add_unique_constraint('acceso', 'acceso_idins_key', 'idins'),
+            "DROP INDEX IF EXISTS acceso_idins_idx",
+        ],
+        down=[
+            "CREATE INDEX IF NOT EXISTS acceso_idins_idx ON acceso (idins)",
+            "ALTER TABLE acceso DROP CONSTRAINT IF EXISTS acceso_idins_key",
+        ],
+    ),
+    Migration(
+        4, 'acceso_extra_minutes',
+        up=[
+            "ALTER TABLE acceso ADD COLUMN IF NOT EXISTS extra_minutes INTEGER NOT NULL DEFAULT 0",
+        ],
+        down=[
+            "ALTER TABLE acceso DROP COLUMN IF EXISTS extra_minutes",
+        ],
+    ),
+]
+
+
+def _ensure_version_table(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def applied_versions(engine):
+    with engine.begin() as connection:
+        _ensure_version_table(connection)
+        rows = connection.execute(text("SELECT version FROM schema_migrations"))
+        return {row[0] for row in rows}
+
+
+def migrate_up(engine, target=None, migrations=MIGRATIONS):
+    """Apply pending migrations up to ``target`` (all when None)"""
+    done = applied_versions(engine)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as connection:
+            for statement in migration.up:
+                connection.execute(text(statement))
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:v, :n)"),
+                {'v': migration.version, 'n': migration.name}
+            )
+        applied.append(migration)
+    return applied
+
+
+def migrate_down(engine, target, migrations=MIGRATIONS):
+    """Revert applied migrations newer than ``target``"""
+    done = applied_versions(engine)
+    reverted = []
+    for migration in sorted(migrations, key=lambda m: m.version, reverse=True):
+        if migration.version <= target or migration.version not in done:
+            continue
+        with engine.begin() as connection:
+            for statement in migration.down:
+                connection.execute(text(statement))
+            connection.execute(
+                text("DELETE FROM schema_migrations WHERE version = :v"),
+                {'v': migration.version}
+            )
+        reverted.append(migration)
+    return reverted
+
+
+def hot_path_queries():
+    """
+    (name, statement) of every per-request statement that must use an
+    index: the same builders ExamManager executes. EXPLAIN does not run
+    the writes.
+    """
+    now = datetime.datetime(2000, 1, 1)
+    return [
+        ('validate_dni', eligibility_statement(0)),
+        ('access_exists', access_exists_statement(0)),
+        ('check_exam_status', exam_status_statement(0)),
+        ('inscription_turno_key', inscription_turno_key_statement(0)),
+        ('start_exam', start_exam_statement(0, now)),
+        ('submit_exam.acceso', submit_exam_statement(0, now, '')),
+        ('submit_exam.inscriptos', inscription_email_statement(0)),
+        ('submit_exam.batch', submit_batch_statement([(0, '', '')], now, '', channel=EVENTS_CHANNEL)),
+    ]
+
+
+def seq_scans(plan):
+    """Relations read with a Seq Scan anywhere in an EXPLAIN JSON plan"""
+    found = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            found.append(node.get('Relation Name'))
+        stack.extend(node.get('Plans', []))
+    return found
+
+
+def check_hot_paths(engine, queries=None):
+    """
+    EXPLAIN each hot-path query with sequential scans disabled, so the
+    planner only keeps one when no usable index exists. A statement that
+    cannot be planned at all (a missing table or unique index) is also a
+    violation. Returns a list of (query name, problem) violations.
+    """
+    violations = []
+    dialect = postgresql.dialect()
+    for name, statement in queries or hot_path_queries():
+        sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+        try:
+            with engine.begin() as connection:
+                connection.execute(text("SET LOCAL enable_seqscan = off"))
+                plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        except DBAPIError as e:
+            # p.ej. el ON CONFLICT de start_exam sin su índice único
+            violations.append((name, f"no se puede planificar: {str(e.orig).splitlines()[0]}"))
+            continue
+        for relation in seq_scans(plan[0]['Plan']):
+            violations.append((name, f"Seq Scan sobre {relation}"))
+    return violations
+
+
+def main(argv=None):
+    from .database import get_engine
+
+    parser = argparse.ArgumentParser(description='Migraciones de esquema')
+    parser.add_argument('command', choices=['status', 'up', 'down', 'check'])
+    parser.add_argument('--target', type=int)
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+
+    if args.command == 'status':
+        done = applied_versions(engine)
+        for migration in MIGRATIONS:
+            mark = 'x' if migration.version in done else ' '
+            print(f"[{mark}] {migration.version:04d} {migration.name}")
+    elif args.command == 'up':
+        for migration in migrate_up(engine, args.target):
+            print(f"Aplicada {migration.version:04d} {migration.name}")
+    elif args.command == 'down':
+        if args.target is None:
+            parser.error('down requiere --target')
+        for migration in migrate_down(engine, args.target):
+            print(f"Revertida {migration.version:04d} {migration.name}")
+    else:
+        violations = check_hot_paths(engine)
+        for name, problem in violations:
+            print(f"{name}: {problem}")
+        if violations:
+            return 1
+        print("Todas las consultas del hot path usan índices")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
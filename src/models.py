@@ -1,5 +1,5 @@
 # src/models.py
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -12,6 +12,7 @@ class Alumno(Base):
 
 class Inscriptos(Base):
     __tablename__ = 'inscriptos'
+    __table_args__ = (Index('inscriptos_iddni_idx', 'iddni'),)
     id = Column(Integer, primary_key=True)
     iddni = Column(Integer)
     idtectun = Column(Integer)
@@ -25,6 +26,7 @@ class Tecnicatura(Base):
 
 class Turnos(Base):
     __tablename__ = 'turnos'
+    __table_args__ = (Index('turnos_idtec_regular_idx', 'idtec', 'regular'),)
     id = Column(Integer, primary_key=True)
     idtec = Column(Integer)
     idexa = Column(Integer)
@@ -40,8 +42,25 @@ class Examen(Base):
 
 class Acceso(Base):
     __tablename__ = 'acceso'
+    __table_args__ = (UniqueConstraint('idins', name='acceso_idins_key'),)
     id = Column(Integer, primary_key=True)
     idins = Column(Integer)
     acceso = Column(DateTime)
     hora = Column(DateTime, nullable=True)
-    link = Column(String, nullable=True)
\ No newline at end of file
+    link = Column(String, nullable=True)
+    # Prórroga administrativa sobre el tiempo del turno
+    extra_minutes = Column(Integer, nullable=False, default=0, server_default='0')
+
+class EmailOutbox(Base):
+    __tablename__ = 'email_outbox'
+    __table_args__ = (Index('email_outbox_pending_idx', 'next_attempt_at'),)
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html_content = Column(String, nullable=False)
+    status = Column(String, nullable=False, default='pending')
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
@@ -0,0 +1,208 @@
+# src/prewarm.py
+"""
+Cache pre-warming ahead of each turno.
+
+The turnos table says when a window opens and for which (idtec, regular).
+PREWARM_LEAD_MINUTES before f_desde the Prewarmer of each process:
+
+* opens PREWARM_POOL_CONNECTIONS pooled connections (SELECT 1), so the
+  first requests do not pay for the connect/auth handshake;
+* loads every student inscribed for those turnos into roster_cache
+  (one query), which also pulls alumno/inscriptos pages into Postgres'
+  buffer cache;
+* renders the /exam page of each turno's exam into exam_page_cache.
+
+Warmed entries get a TTL that covers the lead time, so they are still
+there when the window opens. main.py and the ASGI lifespan run it in a
+daemon thread, restarted in every forked child (gunicorn --preload
+workers); every warm-up is logged with its duration and counts.
+"""
+import contextlib
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import text
+
+from .cache import exam_page_cache, roster_cache
+from .config import Config
+from .database import DatabaseConnection, replica_engines
+from .exam_page import rendered_page
+from .logging_config import LOGGER_NAME
+from .queries import exam_instructions_statement, roster_statement
+from .records import RosterEntry
+from .turno_index import turno_index
+
+logger = logging.getLogger(LOGGER_NAME)
+
+
+class WarmupReport(NamedTuple):
+    turnos: tuple
+    students: int
+    exam_pages: int
+    connections: int
+    seconds: float
+
+
+def warm_pool(engine, connections):
+    """Check out ``connections`` connections at once so the pool keeps them open"""
+    with contextlib.ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(engine.connect()).execute(text('SELECT 1'))
+        return connections
+
+
+class Prewarmer:
+    """
+    Warms the caches of this process for the turnos about to open.
+    ``render_page(instructions)`` renders exam.html (it depends on the
+    app); ``pool_warmer(connections)`` replaces warm_pool over
+    ``db.engine`` and the replicas (for the asyncpg engine of the ASGI app).
+    """
+
+    def __init__(self, db, render_page=None, pool_warmer=None, lead_minutes=None,
+                 poll_seconds=None, pool_connections=None):
+        self.db = db
+        self.render_page = render_page
+        self.pool_warmer = pool_warmer or (
+            lambda n: sum(warm_pool(engine, n) for engine in [db.engine, *replica_engines()])
+        )
+        self.lead = datetime.timedelta(minutes=Config.PREWARM_LEAD_MINUTES
+                                       if lead_minutes is None else lead_minutes)
+        self.poll_seconds = poll_seconds or Config.PREWARM_POLL_SECONDS
+        self.pool_connections = (Config.PREWARM_POOL_CONNECTIONS
+                                 if pool_connections is None else pool_connections)
+        self.warmed = set()
+        self._stop = threading.Event()
+
+    def due(self, now):
+        """Turnos opening within the lead time (or already open) not warmed yet"""
+        turno_index.ensure_fresh(self.db)
+        return [w for w in turno_index.starting_by(now + self.lead, now)
+                if w.turno_id not in self.warmed]
+
+    def warm(self, windows, now):
+        start = time.perf_counter()
+        connections = self.pool_warmer(self.pool_connections) if self.pool_connections else 0
+
+        # Hasta la apertura más tardía y después un TTL completo
+        opens_in = max((w.f_desde - now).total_seconds() for w in windows)
+        students = self._warm_roster({(w.idtec, w.regular) for w in windows},
+                                     max(opens_in, 0) + Config.ROSTER_CACHE_TTL)
+        exam_pages = 0
+        if self.render_page is not None:
+            for exam_id in sorted({w.idexa for w in windows}):
+                exam_pages += self._warm_page(exam_id, max(opens_in, 0) + Config.EXAM_PAGE_CACHE_TTL)
+
+        self.warmed.update(w.turno_id for w in windows)
+        report = WarmupReport(tuple(sorted(w.turno_id for w in windows)), students,
+                              exam_pages, connections, time.perf_counter() - start)
+        logger.info(
+            "Pre-warm de turnos %s: %s alumnos, %s páginas de examen, %s conexiones en %.3fs",
+            list(report.turnos), report.students, report.exam_pages, report.connections,
+            report.seconds,
+        )
+        return report
+
+    def _warm_roster(self, turno_keys, ttl):
+        session = self.db.get_connection(read_only=True)
+        try:
+            rows = session.execute(roster_statement(turno_keys)).all()
+        finally:
+            session.close()
+        by_dni = OrderedDict()
+        for row in rows:
+            by_dni.setdefault(row.dni, []).append(RosterEntry(*row))
+        if len(by_dni) > roster_cache.max_entries:
+            logger.warning("Pre-warm: %s alumnos no entran en roster_cache (ROSTER_CACHE_MAX_ENTRIES=%s)",
+                           len(by_dni), roster_cache.max_entries)
+        for dni, entries in by_dni.items():
+            roster_cache.set(dni, tuple(entries), ttl=ttl)
+        return len(by_dni)
+
+    def _warm_page(self, exam_id, ttl):
+        session = self.db.get_connection(read_only=True)
+        try:
+            instructions = session.execute(exam_instructions_statement(exam_id)).scalar()
+        finally:
+            session.close()
+        if instructions is None:
+            logger.warning("Pre-warm: examen %s sin instrucciones, no se cachea /exam", exam_id)
+            return 0
+        exam_page_cache.set(exam_id, rendered_page(self.render_page(instructions)), ttl=ttl)
+        return 1
+
+    def run_once(self, now=None):
+        """Warm whatever is due; returns the WarmupReport or None"""
+        now = now or datetime.datetime.now()
+        windows = self.due(now)
+        return self.warm(windows, now) if windows else None
+
+    def seconds_until_next(self, now):
+        """Until the next warm-up is due, at most ``poll_seconds``"""
+        next_start = turno_index.next_start_after(now + self.lead)
+        if next_start is None:
+            return self.poll_seconds
+        due_in = (next_start - self.lead - now).total_seconds()
+        return min(self.poll_seconds, max(due_in, 0))
+
+    def run_forever(self):
+        # poll_seconds acota la espera: turnos nuevos llegan con el índice
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+                wait = self.seconds_until_next(datetime.datetime.now())
+            except Exception as e:
+                logger.error("Error en el pre-warm de turnos: %s", e, exc_info=True)
+                wait = self.poll_seconds
+            self._stop.wait(wait)
+
+    def stop(self):
+        self._stop.set()
+
+
+# Prewarmers arrancados en este proceso: se rearrancan en cada hijo de un fork
+_prewarmers = []
+
+
+def _start_thread(prewarmer):
+    thread = threading.Thread(target=prewarmer.run_forever, name='prewarm', daemon=True)
+    thread.start()
+    return thread
+
+
+def start_prewarm_thread(render_page=None, pool_warmer=None, db=None):
+    """Run a Prewarmer in a daemon thread of this process (and of its forks)"""
+    prewarmer = Prewarmer(db or DatabaseConnection(), render_page, pool_warmer)
+    _prewarmers.append(prewarmer)
+    _start_thread(prewarmer)
+    return prewarmer
+
+
+def _restart_after_fork():
+    # El fork sólo copia el hilo que lo llama: con gunicorn --preload el
+    # pre-warm arrancado al importar main.py no existiría en los workers.
+    # Los cachés heredados siguen valiendo, así que se conserva ``warmed``
+    for prewarmer in _prewarmers:
+        if not prewarmer._stop.is_set():
+            prewarmer._stop = threading.Event()
+            _start_thread(prewarmer)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def flask_page_renderer(app):
+    """render_page for the Flask app: exam.html as the /exam view renders it"""
+    from flask import render_template
+
+    def render_page(instructions):
+        # Contexto de request: las plantillas usan url_for('static', ...)
+        with app.test_request_context('/exam'):
+            return render_template('exam.html', exam_instructions=instructions or '')
+    return render_page
@@ -0,0 +1,234 @@
+# src/queries.py
+from sqlalchemy import Integer, String, Text, column, exists, func, insert, literal, or_, select, update, values
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import Alumno, Inscriptos, Tecnicatura, Turnos, Examen, Acceso, EmailOutbox
+
+
+def eligibility_statement(dni):
+    """
+    Alumno -> Inscriptos -> Tecnicatura, plus whether an Acceso already
+    exists, as a single joined SELECT. Returns one row per inscription;
+    the turno is resolved separately through the turno window index.
+    """
+    access_exists = (
+        exists().where(Acceso.idins == Inscriptos.id).label('access_exists')
+    )
+    return (
+        select(
+            Alumno.id.label('alumno_id'),
+            Alumno.dni,
+            Alumno.apenom,
+            Inscriptos.id.label('inscripcion_id'),
+            Inscriptos.idtectun,
+            Inscriptos.regular,
+            Inscriptos.email,
+            Tecnicatura.tectun,
+            access_exists,
+        )
+        .join(Inscriptos, Inscriptos.iddni == Alumno.id)
+        .outerjoin(Tecnicatura, Tecnicatura.id == Inscriptos.idtectun)
+        .where(Alumno.dni == dni)
+        .order_by(Inscriptos.id)
+    )
+
+
+def roster_statement(turno_keys):
+    """
+    Every inscription (RosterEntry columns) of the students inscribed in
+    any of ``turno_keys`` ((idtec, regular) pairs), ordered by DNI and
+    then like eligibility_statement, to pre-load roster_cache.
+    """
+    inscribed = select(Inscriptos.iddni).where(or_(*(
+        (Inscriptos.idtectun == idtec) & (Inscriptos.regular == regular)
+        for idtec, regular in turno_keys
+    )))
+    return (
+        select(
+            Alumno.id.label('alumno_id'),
+            Alumno.dni,
+            Alumno.apenom,
+            Inscriptos.id.label('inscripcion_id'),
+            Inscriptos.idtectun,
+            Inscriptos.regular,
+            Inscriptos.email,
+            Tecnicatura.tectun,
+        )
+        .join(Inscriptos, Inscriptos.iddni == Alumno.id)
+        .outerjoin(Tecnicatura, Tecnicatura.id == Inscriptos.idtectun)
+        .where(Alumno.id.in_(inscribed))
+        .order_by(Alumno.dni, Inscriptos.id)
+    )
+
+
+def exam_instructions_statement(exam_id):
+    """
+    exalink of an exam with a turno, the instructions shown on /exam.
+    Not filtered by the window: /exam checks it against turno_index on
+    every request, and the pre-warm renders the page before f_desde.
+    """
+    return (
+        select(Examen.exalink)
+        .join(Turnos, Turnos.idexa == Examen.id)
+        .where(Examen.id == exam_id)
+        .limit(1)
+    )
+
+
+def access_exists_statement(inscripcion_id):
+    """Whether the inscription already has an Acceso row"""
+    return select(exists().where(Acceso.idins == inscripcion_id))
+
+
+def turno_windows_statement():
+    """Every turno window, in the column order of TurnoWindow"""
+    return select(
+        Turnos.id,
+        Turnos.idtec,
+        Turnos.idexa,
+        Turnos.regular,
+        Turnos.f_desde,
+        Turnos.f_hasta,
+        Turnos.tiempo,
+    ).where(Turnos.f_desde.isnot(None), Turnos.f_hasta.isnot(None))
+
+
+def exam_status_statement(access_id):
+    """Acceso row plus the inscription's turno key, for check_exam_status"""
+    return (
+        select(
+            Acceso.id,
+            Acceso.acceso,
+            Acceso.hora,
+            Acceso.extra_minutes,
+            Inscriptos.id.label('inscripcion_id'),
+            Inscriptos.idtectun,
+            Inscriptos.regular,
+        )
+        .outerjoin(Inscriptos, Inscriptos.id == Acceso.idins)
+        .where(Acceso.id == access_id)
+    )
+
+
+def inscription_turno_key_statement(inscripcion_id):
+    """(idtectun, regular) of an inscription, the turno_index key"""
+    return select(Inscriptos.idtectun, Inscriptos.regular).where(
+        Inscriptos.id == inscripcion_id
+    )
+
+
+def start_exam_statement(inscripcion_id, now, dialect_name='postgresql'):
+    """
+    INSERT ... ON CONFLICT (idins) that returns the access row whether it
+    was just created or already existed. The no-op DO UPDATE (instead of
+    DO NOTHING) is what makes RETURNING yield the existing row.
+    """
+    insert = sqlite.insert if dialect_name == 'sqlite' else postgresql.insert
+    statement = insert(Acceso).values(idins=inscripcion_id, acceso=now)
+    statement = statement.on_conflict_do_update(
+        index_elements=[Acceso.idins],
+        set_={'idins': statement.excluded.idins}
+    )
+    return statement.returning(Acceso.id, Acceso.idins, Acceso.acceso, Acceso.extra_minutes)
+
+
+def submit_exam_statement(access_id, now, link):
+    """Marks one Acceso as submitted; returns its idins, no row if it does not exist"""
+    return (
+        update(Acceso)
+        .where(Acceso.id == access_id)
+        .values(hora=now, link=link)
+        .returning(Acceso.idins)
+    )
+
+
+def inscription_email_statement(inscripcion_id):
+    """email of an inscription, for the submission confirmation"""
+    return select(Inscriptos.email).where(Inscriptos.id == inscripcion_id)
+
+
+def submit_batch_statement(submissions, now, subject, channel=None):
+    """
+    Submit many exams in one Postgres statement (src/group_commit.py):
+
+        WITH updated AS (UPDATE acceso ... FROM (VALUES ...) RETURNING ...),
+             queued AS (INSERT INTO email_outbox SELECT ... FROM updated)
+        SELECT updated.id [, pg_notify(...)] FROM updated
+
+    ``submissions`` are (access_id, link, html_content) tuples with unique
+    ids. Returns the ids that exist; the confirmation email of each goes
+    to the outbox and, with ``channel``, a 'submitted' ExamEvent is
+    published when the transaction commits.
+    """
+    batch = values(
+        column('access_id', Integer), column('link', String), column('html_content', String),
+        name='batch',
+    ).data(list(submissions))
+    updated = (
+        update(Acceso)
+        .where(Acceso.id == batch.c.access_id)
+        .values(hora=now, link=batch.c.link)
+        .returning(Acceso.id, Acceso.idins, batch.c.html_content)
+        .cte('updated')
+    )
+    queued = insert(EmailOutbox).from_select(
+        ['to_email', 'subject', 'html_content', 'status', 'attempts', 'next_attempt_at', 'created_at'],
+        select(Inscriptos.email, literal(subject), updated.c.html_content, literal('pending'),
+               literal(0), literal(now), literal(now))
+        .join_from(updated, Inscriptos, Inscriptos.id == updated.c.idins)
+        .where(Inscriptos.email.isnot(None), Inscriptos.email != ''),
+    ).cte('queued')
+
+    columns = [updated.c.id]
+    if channel is not None:
+        payload = func.json_build_object(
+            'access_id', updated.c.id, 'name', 'submitted', 'data', func.json_build_object()
+        )
+        columns.append(func.pg_notify(channel, payload.cast(Text)))
+    return select(*columns).add_cte(queued)
+
+
+def extend_exam_statement(access_id, minutes):
+    """Add ``minutes`` to a not yet submitted access; returns its new state"""
+    return (
+        update(Acceso)
+        .where(Acceso.id == access_id, Acceso.hora.is_(None))
+        .values(extra_minutes=Acceso.extra_minutes + minutes)
+        .returning(Acceso.id, Acceso.idins, Acceso.acceso, Acceso.extra_minutes)
+    )
+
+
+def submissions_statement(turno_id=None, since=None, until=None):
+    """
+    Acceso + alumno/inscripción for the export (src/export.py), in id
+    order. ``turno_id`` keeps the accesses started inside that turno's
+    window; ``since``/``until`` bound the start time (until exclusive).
+    """
+    statement = (
+        select(
+            Acceso.id.label('access_id'),
+            Alumno.dni,
+            Alumno.apenom,
+            Inscriptos.email,
+            Tecnicatura.tectun,
+            Acceso.acceso.label('started_at'),
+            Acceso.hora.label('submitted_at'),
+            Acceso.link,
+            Acceso.extra_minutes,
+        )
+        .join(Inscriptos, Inscriptos.id == Acceso.idins)
+        .join(Alumno, Alumno.id == Inscriptos.iddni)
+        .outerjoin(Tecnicatura, Tecnicatura.id == Inscriptos.idtectun)
+        .order_by(Acceso.id)
+    )
+    if turno_id is not None:
+        statement = statement.join(Turnos, (
+            (Turnos.idtec == Inscriptos.idtectun)
+            & (Turnos.regular == Inscriptos.regular)
+            & Acceso.acceso.between(Turnos.f_desde, Turnos.f_hasta)
+        )).where(Turnos.id == turno_id)
+    if since is not None:
+        statement = statement.where(Acceso.acceso >= since)
+    if until is not None:
+        statement = statement.where(Acceso.acceso < until)
+    return statement
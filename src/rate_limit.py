@@ -0,0 +1,237 @@
+# src/rate_limit.py
+"""
+Token-bucket rate limiting for the JSON API, checked before any
+database work.
+
+* every IP gets RATE_LIMIT_REQUESTS requests per minute across the
+  limited endpoints (burst of the same size);
+* every DNI gets RATE_LIMIT_PER_MINUTE attempts per minute on
+  /validate_dni, so a script walking DNIs from many IPs is slowed too.
+
+A rejected request gets 429 with Retry-After. Buckets live in this
+process (MemoryBackend) or, with RATE_LIMIT_BACKEND=redis, in Redis
+(RedisBackend), so every worker and instance shares them. If Redis is
+unreachable the limiter lets requests through: it protects the
+database, it must not take the exam down.
+"""
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from .config import Config
+from .logging_config import LOGGER_NAME
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Endpoints (mismo nombre en src/routes.py y src/asgi.py) que consultan la base
+LIMITED_ENDPOINTS = frozenset({'validate_dni', 'start_exam', 'submit_exam', 'check_exam_status'})
+
+
+class Limit(NamedTuple):
+    capacity: int
+    per_seconds: float
+
+    @property
+    def rate(self):
+        """Tokens refilled per second"""
+        return self.capacity / self.per_seconds
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+    scope: str = ''
+
+    def retry_after_header(self):
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+ALLOWED = Decision(True)
+
+
+class MemoryBackend:
+    """Buckets of this process; the least recently used go past ``max_keys``"""
+
+    blocking = False
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, limit):
+        """Take one token; returns the seconds to wait, 0 when allowed"""
+        now = self.clock()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# Todo el bucket en un solo round trip y de forma atómica entre workers
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return wait
+"""
+
+
+class RedisBackend:
+    """Buckets shared through Redis (or anything speaking its protocol and Lua)"""
+
+    blocking = True
+
+    def __init__(self, client, prefix='ratelimit:'):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_LUA)
+
+    @classmethod
+    def from_url(cls, url):
+        import redis
+        return cls(redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5))
+
+    def take(self, key, limit):
+        # Milisegundos de reloj de pared: los workers comparten el bucket
+        try:
+            wait_ms = self._script(
+                keys=[self.prefix + key],
+                args=[limit.capacity, limit.rate / 1000, int(time.time() * 1000)],
+            )
+        except Exception as e:
+            logger.warning("Rate limit sin Redis, se deja pasar la request: %s", e)
+            return 0.0
+        return int(wait_ms) / 1000
+
+
+class RateLimiter:
+    def __init__(self, backend, per_ip, per_dni):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_dni = per_dni
+
+    def check(self, ip, dni=None):
+        """Decision for one request from ``ip`` (and about ``dni``, if any)"""
+        wait = self.backend.take(f'ip:{ip}', self.per_ip)
+        if wait:
+            return Decision(False, wait, 'ip')
+        if dni is not None:
+            wait = self.backend.take(f'dni:{dni}', self.per_dni)
+            if wait:
+                return Decision(False, wait, 'dni')
+        return ALLOWED
+
+    async def acheck(self, ip, dni=None):
+        """check() for the ASGI app; a network backend runs off the event loop"""
+        if not self.backend.blocking:
+            return self.check(ip, dni)
+        return await asyncio.get_running_loop().run_in_executor(None, self.check, ip, dni)
+
+
+def client_ip(remote_addr, forwarded_for=None, trusted_proxies=None):
+    """
+    The client address. With N trusted proxies in front, the client is
+    the N-th address from the right of X-Forwarded-For.
+    """
+    if trusted_proxies is None:
+        trusted_proxies = Config.RATE_LIMIT_TRUSTED_PROXIES
+    if trusted_proxies and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(',') if hop.strip()]
+        if hops:
+            return hops[-min(trusted_proxies, len(hops))]
+    return remote_addr or 'unknown'
+
+
+def rejection_body(decision):
+    return {
+        'status': 'error',
+        'message': (
+            f"Demasiadas solicitudes, reintente en {decision.retry_after_header()} segundos"
+        ),
+    }
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """The limiter of this process per Config, or None when disabled"""
+    global _limiter
+    if not Config.RATE_LIMIT_ENABLED:
+        return None
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if Config.RATE_LIMIT_BACKEND == 'redis':
+                    backend = RedisBackend.from_url(Config.RATE_LIMIT_REDIS_URL)
+                else:
+                    backend = MemoryBackend()
+                _limiter = RateLimiter(
+                    backend,
+                    per_ip=Limit(Config.RATE_LIMIT_REQUESTS, 60),
+                    per_dni=Limit(Config.RATE_LIMIT_PER_MINUTE, 60),
+                )
+    return _limiter
+
+
+def dni_of(endpoint, body):
+    """The DNI a /validate_dni body asks about (per-DNI bucket key)"""
+    if endpoint != 'validate_dni' or not isinstance(body, dict):
+        return None
+    dni = body.get('dni')
+    return str(dni) if dni is not None else None
+
+
+def init_app(app):
+    """Check the limited endpoints in a before_request hook"""
+    from flask import jsonify, request
+
+    from . import metrics
+
+    @app.before_request
+    def _rate_limit():
+        limiter = get_limiter()
+        if limiter is None or request.endpoint not in LIMITED_ENDPOINTS:
+            return None
+        decision = limiter.check(
+            client_ip(request.remote_addr, request.headers.get('X-Forwarded-For')),
+            dni_of(request.endpoint, request.get_json(silent=True)),
+        )
+        if decision.allowed:
+            return None
+        metrics.rate_limited.inc(endpoint=request.endpoint, scope=decision.scope)
+        response = jsonify(rejection_body(decision))
+        response.status_code = 429
+        response.headers['Retry-After'] = decision.retry_after_header()
+        return response
@@ -0,0 +1,72 @@
+# src/records.py
+import datetime
+from typing import NamedTuple, Optional
+
+
+class RosterEntry(NamedTuple):
+    """Alumno + inscripción + tecnicatura for one DNI; safe to cache"""
+    alumno_id: int
+    dni: int
+    apenom: str
+    inscripcion_id: int
+    idtectun: int
+    regular: Optional[str]
+    email: Optional[str]
+    tectun: Optional[str]
+
+
+class TurnoWindow(NamedTuple):
+    """One row of the turnos table, as kept by the turno window index"""
+    turno_id: int
+    idtec: int
+    idexa: int
+    regular: Optional[str]
+    f_desde: datetime.datetime
+    f_hasta: datetime.datetime
+    tiempo: Optional[int]
+
+    def is_open(self, now):
+        return self.f_desde <= now <= self.f_hasta
+
+
+class AccessRecord(NamedTuple):
+    """An Acceso row as returned by start_exam, in start_exam_statement's column order"""
+    id: int
+    idins: int
+    acceso: datetime.datetime
+    extra_minutes: int
+
+
+class EligibilityRecord(NamedTuple):
+    """Everything /validate_dni needs about a student"""
+    roster: RosterEntry
+    turno: Optional[TurnoWindow]
+    access_exists: bool
+
+    @property
+    def dni(self):
+        return self.roster.dni
+
+    @property
+    def apenom(self):
+        return self.roster.apenom
+
+    @property
+    def email(self):
+        return self.roster.email
+
+    @property
+    def tectun(self):
+        return self.roster.tectun
+
+    @property
+    def inscripcion_id(self):
+        return self.roster.inscripcion_id
+
+    @property
+    def tiempo(self):
+        return self.turno.tiempo if self.turno else None
+
+    def window_open(self, now):
+        """True when the matching turno is open at ``now``"""
+        return self.turno is not None and self.turno.is_open(now)
@@ -0,0 +1,349 @@
+# src/routes.py
+import logging
+import re
+
+from flask import (
+    Response,
+    abort,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    send_from_directory,
+)
+
+from . import assets
+from .config import Config
+from .exam_page import cached_page, not_modified, page_headers, parse_exam_id, remember_page
+from .logging_config import LOGGER_NAME
+
+# create_app() configura los handlers (setup_logging)
+logger = logging.getLogger(LOGGER_NAME)
+
+
+def _exam_manager():
+    # Import diferido: SQLAlchemy y los modelos se cargan recién con la
+    # primera request que los necesita, no en el arranque en frío
+    from .exam_manager import ExamManager
+    return ExamManager()
+
+
+def index():
+    logger.info("Accessing index page")
+    return render_template('index.html')
+
+def validate_dni():
+    dni = request.json.get('dni')
+    
+    logger.info("Validating DNI: %s", dni)
+    
+    # Validate DNI input
+    if not re.match(r'^\d+$', str(dni)):
+        logger.warning("Invalid DNI format: %s", dni)
+        return jsonify({
+            'error': 'DNI inválido. Solo se permiten números.'
+        }), 400
+
+    exam_manager = _exam_manager()
+    result = exam_manager.check_exam_eligibility(int(dni))
+    
+    if result['eligible']:
+        logger.info("DNI %s is eligible for exam", dni)
+        return jsonify({
+            'status': 'success',
+            'student_info': {
+                'dni': result['student_data'].dni,
+                'nombre': result['student_data'].apenom,
+                'email': result['student_data'].email,
+                'tecnicatura': result['student_data'].tectun,
+                'exam_time_limit': result['exam_time_limit'],
+                'exam_id': result['student_data'].turno.idexa,
+                'inscriptos': {
+                    'id': result['student_data'].inscripcion_id  # Añadir ID de inscripción
+                }
+            }
+        })
+    else:
+        logger.warning("DNI %s not eligible: %s", dni, result['message'])
+        return jsonify({
+            'status': 'error',
+            'message': result['message']
+        }), 400
+
+def exam():
+    # El examen sale del turno del alumno (student_info.exam_id); sin
+    # parámetro, el único examen con turno abierto. Un examen sin turno
+    # abierto es 404 aunque el pre-warm ya tenga su página: el exalink no
+    # se publica antes de f_desde
+    exam_id = parse_exam_id(request.args.get('exam_id'))
+    exam_manager = _exam_manager()
+    if exam_id is None:
+        exam_id = exam_manager.open_exam_id()
+    elif not exam_manager.is_exam_open(exam_id):
+        abort(404)
+    page = cached_page(exam_id)
+    if page is None:
+        logger.info("Rendering exam page for exam %s", exam_id)
+        exam_instructions = exam_manager.get_exam_instructions(exam_id) if exam_id else None
+        page = remember_page(
+            exam_id,
+            render_template('exam.html', exam_instructions=exam_instructions or ''),
+            exam_instructions,
+        )
+
+    headers = page_headers(page)
+    if not_modified(request.headers.get('If-None-Match'), page.etag):
+        return '', 304, headers
+    return page.body, 200, headers
+
+# Ruta para iniciar examen
+def start_exam():
+    logger.info("Starting exam")
+    exam_manager = _exam_manager()
+    
+    try:
+        # Obtener datos del estudiante del JSON
+        student_data = request.json.get('student_data')
+        
+        if not student_data:
+            logger.error("No student data provided")
+            return jsonify({
+                'status': 'error', 
+                'message': 'Datos del estudiante no proporcionados'
+            }), 400
+        
+        # Extraer el ID de inscripción
+        inscriptos_id = student_data.get('inscriptos', {}).get('id')
+        
+        if not inscriptos_id:
+            logger.error("No inscriptos ID found")
+            return jsonify({
+                'status': 'error', 
+                'message': 'ID de inscripción no encontrado'
+            }), 400
+        
+        # Iniciar examen
+        access_record = exam_manager.start_exam(inscriptos_id)
+        
+        if access_record:
+            return jsonify({
+                'status': 'success', 
+                'access_id': access_record.id,  # Esto debería funcionar ahora
+                'exam_token': exam_manager.issue_exam_token(access_record)
+            })
+        else:
+            return jsonify({
+                'status': 'error', 
+                'message': 'No se pudo iniciar el examen'
+            }), 500
+    
+    except Exception as e:
+        logger.error("Error starting exam: %s", e, exc_info=True)
+        return jsonify({
+            'status': 'error', 
+            'message': f'Error interno: {str(e)}'
+        }), 500
+        
+# Ruta para enviar examen
+def submit_exam():
+    logger.info("Submit exam request received")
+    
+    try:
+        # Obtener datos JSON de manera segura
+        data = request.get_json()
+        
+        # Validar que se recibieron datos
+        if not data:
+            logger.error("No data received in submit_exam")
+            return jsonify({
+                'status': 'error', 
+                'message': 'No se recibieron datos de envío'
+            }), 400
+        
+        # Extraer github_link y access_id
+        github_link = data.get('github_link')
+        access_id = data.get('access_id')
+        
+        # Validar campos
+        if not github_link:
+            logger.error("Missing GitHub link")
+            return jsonify({
+                'status': 'error', 
+                'message': 'Falta el enlace de GitHub'
+            }), 400
+        
+        if not access_id:
+            logger.error("Missing access_id")
+            return jsonify({
+                'status': 'error', 
+                'message': 'Falta el ID de acceso'
+            }), 400
+        
+        # Instanciar ExamManager
+        exam_manager = _exam_manager()
+        
+        # Intentar enviar el examen
+        result = exam_manager.submit_exam(access_id, github_link)
+        
+        if result:
+            return jsonify({
+                'status': 'success',
+                'message': 'Examen enviado exitosamente'
+            })
+        else:
+            return jsonify({
+                'status': 'error', 
+                'message': 'No se pudo enviar el examen'
+            }), 500
+    
+    except Exception as e:
+        logger.error("Unexpected error in submit_exam: %s", e, exc_info=True)
+        return jsonify({
+            'status': 'error', 
+            'message': f'Error interno: {str(e)}'
+        }), 500
+
+# Manejo del tiempo
+def check_exam_status():
+    """Verificar si el examen puede continuar"""
+    try:
+        data = request.json
+        access_id = data.get('access_id')
+        
+        if not access_id:
+            return jsonify({
+                'can_continue': False,
+                'message': 'ID de acceso no proporcionado'
+            }), 400
+        
+        exam_manager = _exam_manager()
+        
+        # Con un token válido no se consulta la base salvo que se pida
+        # confirmar o haya vencido la última confirmación
+        try:
+            status = exam_manager.check_exam_status(
+                access_id,
+                token=data.get('exam_token'),
+                confirm=bool(data.get('confirm'))
+            )
+        except Exception as e:
+            logger.error("Error en check_exam_status: %s", e, exc_info=True)
+            return jsonify({
+                'can_continue': False,
+                'message': 'Error al verificar el estado del examen'
+            }), 500
+        
+        if not status['can_continue']:
+            return jsonify(status), 400
+        
+        return jsonify(status)
+    
+    except Exception as e:
+        logger.error("Error checking exam status: %s", e, exc_info=True)
+        return jsonify({
+            'can_continue': False,
+            'message': 'Error interno del servidor'
+        }), 500
+                
+def catch_all(path):
+    logger.info("Catching route: %s", path)
+    # Plantillas leídas al arrancar (register_routes), sin tocar el disco
+    if path in current_app.config['PAGE_TEMPLATES']:
+        return render_template(f'{path}.html')
+    
+    # If no specific template, default to index
+    return render_template('index.html')
+
+# Assets con hash (python -m src.assets): inmutables y precomprimidos
+def hashed_asset(filename):
+    negotiated = assets.get_manifest().negotiate(filename, request.headers.get('Accept-Encoding'))
+    if negotiated is None:
+        abort(404)
+    path, encoding = negotiated
+    response = send_from_directory(assets.DIST_DIR, path, mimetype=assets.asset_mimetype(filename))
+    response.headers.update(assets.asset_headers(encoding))
+    return response
+
+# Manejo de errores
+def page_not_found(e):
+    logger.error("404 error: %s", request.url)
+    return render_template('error.html', 
+                           error_title='Página No Encontrada', 
+                           error_message='La página solicitada no existe'), 404
+
+def internal_server_error(e):
+    logger.error("500 error: %s", e)
+    return render_template('error.html', 
+                           error_title='Error Interno del Servidor', 
+                           error_message='Ocurrió un error inesperado'), 500
+
+
+def _admin_authorized():
+    expected = Config.ADMIN_API_TOKEN
+    return bool(expected) and request.headers.get('Authorization') == f"Bearer {expected}"
+
+# Prórroga administrativa del examen de un alumno
+def extend_exam():
+    if not _admin_authorized():
+        return jsonify({'status': 'error', 'message': 'No autorizado'}), 401
+
+    data = request.get_json(silent=True) or {}
+    access_id = data.get('access_id')
+    minutes = data.get('minutes')
+    if not access_id or not isinstance(minutes, int) or minutes <= 0:
+        return jsonify({
+            'status': 'error',
+            'message': 'Se requieren access_id y minutes (entero positivo)'
+        }), 400
+
+    deadline = _exam_manager().extend_exam(access_id, minutes)
+    if deadline is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Examen inexistente o ya enviado'
+        }), 404
+    return jsonify({'status': 'success', 'deadline': int(deadline.timestamp())})
+
+# Exportación de entregas en streaming (src/export.py)
+def export_submissions():
+    if not _admin_authorized():
+        return jsonify({'status': 'error', 'message': 'No autorizado'}), 401
+
+    from . import export
+    from .database import DatabaseConnection
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in export.CONTENT_TYPES:
+        return jsonify({'status': 'error', 'message': 'format debe ser csv o jsonl'}), 400
+    try:
+        filters = export.ExportFilters.parse(
+            request.args.get('turno'), request.args.get('since'), request.args.get('until')
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    logger.info("Exportando entregas: turno=%s desde=%s hasta=%s", *filters)
+    return Response(
+        export.stream_submissions(DatabaseConnection(), filters, fmt),
+        content_type=export.CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename="{filters.filename(fmt)}"'},
+    )
+
+
+def register_routes(app):
+    app.config['PAGE_TEMPLATES'] = assets.page_templates(app.template_folder)
+    app.jinja_env.globals['asset_url'] = assets.asset_url
+
+    app.add_url_rule('/', view_func=index)
+    app.add_url_rule('/validate_dni', view_func=validate_dni, methods=['POST'])
+    app.add_url_rule('/exam', view_func=exam)
+    app.add_url_rule('/start_exam', view_func=start_exam, methods=['POST'])
+    app.add_url_rule('/submit_exam', view_func=submit_exam, methods=['POST'])
+    app.add_url_rule('/check_exam_status', view_func=check_exam_status, methods=['POST'])
+    app.add_url_rule('/admin/extend_exam', view_func=extend_exam, methods=['POST'])
+    app.add_url_rule('/admin/submissions', view_func=export_submissions)
+    app.add_url_rule('/static/dist/<path:filename>', view_func=hashed_asset)
+    # Add a catch-all route for client-side routing
+    app.add_url_rule('/<path:path>', view_func=catch_all)
+    app.register_error_handler(404, page_not_found)
+    app.register_error_handler(500, internal_server_error)
@@ -0,0 +1,160 @@
+# src/turno_index.py
+import asyncio
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+from .cache import DATA_STAMP_PATH, StampFile
+from .config import Config
+from .queries import turno_windows_statement
+from .records import TurnoWindow
+
+
+class _Windows:
+    """Windows of one (idtec, regular) sorted by f_desde"""
+
+    __slots__ = ('starts', 'windows', 'max_end')
+
+    def __init__(self, windows):
+        self.windows = sorted(windows, key=lambda w: (w.f_desde, w.turno_id))
+        self.starts = [w.f_desde for w in self.windows]
+        # max_end[i] = mayor f_hasta entre windows[0..i]; permite cortar la
+        # búsqueda hacia atrás en cuanto ninguna ventana anterior sigue abierta
+        self.max_end = []
+        latest = None
+        for window in self.windows:
+            latest = window.f_hasta if latest is None else max(latest, window.f_hasta)
+            self.max_end.append(latest)
+
+    def open_at(self, now):
+        i = bisect.bisect_right(self.starts, now) - 1
+        while i >= 0 and self.max_end[i] >= now:
+            window = self.windows[i]
+            if window.f_hasta >= now:
+                return window
+            i -= 1
+        return None
+
+    def next_after(self, now):
+        i = bisect.bisect_right(self.starts, now)
+        return self.windows[i] if i < len(self.windows) else None
+
+
+class TurnoWindowIndex:
+    """
+    In-memory interval index over the turnos table.
+
+    Windows are grouped by (idtec, regular) and sorted by f_desde, so the
+    turno open at a given instant is found with a bisect instead of a
+    query. When several windows overlap, the one that started last wins.
+    ``ensure_fresh`` reloads it when older than ``max_age`` seconds, after
+    ``invalidate()``, or when the import scripts touch the shared stamp.
+    """
+
+    def __init__(self, max_age, stamp=None):
+        self.max_age = max_age
+        self.stamp = stamp
+        self._by_key = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+        self._async_lock = None
+
+    def load(self, windows):
+        grouped = defaultdict(list)
+        for window in windows:
+            grouped[(window.idtec, window.regular)].append(window)
+        self._by_key = {key: _Windows(items) for key, items in grouped.items()}
+        self._loaded_at = time.monotonic()
+
+    def refresh(self, db):
+        session = db.get_connection(read_only=True)
+        try:
+            rows = session.execute(turno_windows_statement()).all()
+        finally:
+            session.close()
+        self.load(TurnoWindow(*row) for row in rows)
+
+    def ensure_fresh(self, db):
+        """Reload from the database if the index is missing or too old"""
+        if not self._is_stale():
+            return
+        with self._lock:
+            if self._is_stale():
+                self.refresh(db)
+
+    async def ensure_fresh_async(self, db):
+        """ensure_fresh for an AsyncDatabaseConnection (src/async_database.py)"""
+        if not self._is_stale():
+            return
+        # Un lock por event loop alcanza: el resto de las corrutinas espera
+        # la misma recarga en lugar de lanzar la suya
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            if self._is_stale():
+                async with db.get_connection() as session:
+                    rows = (await session.execute(turno_windows_statement())).all()
+                self.load(TurnoWindow(*row) for row in rows)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def open_at(self, idtec, regular, now):
+        """The turno open at ``now`` for this inscription, or None"""
+        windows = self._by_key.get((idtec, regular))
+        return windows.open_at(now) if windows else None
+
+    def next_after(self, idtec, regular, now):
+        """The first turno starting after ``now``, or None"""
+        windows = self._by_key.get((idtec, regular))
+        return windows.next_after(now) if windows else None
+
+    def starting_by(self, until, now):
+        """Windows not yet closed at ``now`` that start no later than ``until``"""
+        return [
+            window
+            for windows in self._by_key.values()
+            for window in windows.windows[:bisect.bisect_right(windows.starts, until)]
+            if window.f_hasta >= now
+        ]
+
+    def next_start_after(self, now):
+        """The earliest f_desde after ``now`` over every window, or None"""
+        starts = [w.next_after(now) for w in self._by_key.values()]
+        return min((w.f_desde for w in starts if w is not None), default=None)
+
+    def exam_open_at(self, now):
+        """The exam of every turno open at ``now`` when there is only one, else None"""
+        exams = {
+            window.idexa
+            for windows in self._by_key.values()
+            for window in windows.windows
+            if window.is_open(now)
+        }
+        return exams.pop() if len(exams) == 1 else None
+
+    def exam_is_open(self, exam_id, now):
+        """Whether some turno of ``exam_id`` is open at ``now``"""
+        return any(
+            window.idexa == exam_id and window.is_open(now)
+            for windows in self._by_key.values()
+            for window in windows.windows
+        )
+
+    def __len__(self):
+        return sum(len(w.windows) for w in self._by_key.values())
+
+    def _is_stale(self):
+        if self.stamp is not None and self.stamp.changed():
+            self._loaded_at = None
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at > self.max_age
+        )
+
+
+turno_index = TurnoWindowIndex(
+    max_age=Config.TURNO_INDEX_REFRESH_SECONDS,
+    stamp=StampFile(DATA_STAMP_PATH, Config.ROSTER_CACHE_STAMP_CHECK_SECONDS),
+)
@@ -15,39 +15,131 @@ document.addEventListener('DOMContentLoaded', () => {
     const examInfo = JSON.parse(localStorage.getItem('examInfo') || '{}');
     const examTimeLimit = examInfo.exam_time_limit || 120; // Default 2 hours
 
+    // access_id cuyo estado ya se confirmó contra la base en este navegador;
+    // mientras el token siga vigente, una recarga consulta solo con el token
+    const CONFIRMED_KEY = 'examStatusConfirmed';
+
+    function needsConfirmation() {
+        const storedEndTime = parseInt(localStorage.getItem('examEndTime'));
+        return localStorage.getItem(CONFIRMED_KEY) !== String(examInfo.access_id)
+            || !storedEndTime || Date.now() >= storedEndTime;
+    }
+
     class ExamTimer {
         constructor(totalMinutes) {
             this.totalMinutes = totalMinutes;
             this.timerInterval = null;
             this.startTime = null;
             this.endTime = null;
+            this.eventSource = null;
+        }
+
+        // Estado del examen empujado por el servidor (/exam_events, solo en
+        // el despliegue ASGI). Resuelve con el primer estado, o null si no
+        // hay stream y hay que consultar /check_exam_status
+        openStream() {
+            if (!window.EventSource || !examInfo.exam_token) {
+                return Promise.resolve(null);
+            }
+            const params = new URLSearchParams({
+                access_id: examInfo.access_id,
+                token: examInfo.exam_token
+            });
+
+            return new Promise((resolve) => {
+                let settled = false;
+                const first = (statusData) => {
+                    if (settled) {
+                        return false;
+                    }
+                    settled = true;
+                    resolve(statusData);
+                    return true;
+                };
+
+                const source = new EventSource(`/exam_events?${params}`);
+                this.eventSource = source;
+
+                // 'deadline' llega al conectar (y reconectar), 'extended' con una prórroga
+                source.addEventListener('deadline', (e) => {
+                    const data = JSON.parse(e.data);
+                    if (!first({ can_continue: true, deadline: data.deadline })) {
+                        this.setDeadline(data.deadline);
+                    }
+                });
+                source.addEventListener('extended', (e) => {
+                    this.setDeadline(JSON.parse(e.data).deadline);
+                });
+                ['ended', 'expired', 'submitted'].forEach((name) => {
+                    source.addEventListener(name, (e) => {
+                        this.closeStream();
+                        if (!first(JSON.parse(e.data))) {
+                            this.onTimerEnd();
+                        }
+                    });
+                });
+                source.onerror = () => {
+                    // Después del primer evento EventSource reconecta solo
+                    if (!settled) {
+                        this.closeStream();
+                        first(null);
+                    }
+                };
+            });
+        }
+
+        closeStream() {
+            if (this.eventSource) {
+                this.eventSource.close();
+                this.eventSource = null;
+            }
+        }
+
+        setDeadline(deadline) {
+            this.endTime = deadline * 1000;
+            localStorage.setItem('examEndTime', this.endTime);
         }
 
         async initialize() {
             // Verificar estado del examen con el servidor
             try {
-                const response = await fetch('/check_exam_status', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({ 
-                        access_id: examInfo.access_id 
-                    })
-                });
-
-                const statusData = await response.json();
+                let statusData = await this.openStream();
+                if (statusData === null) {
+                    const request = {
+                        access_id: examInfo.access_id,
+                        exam_token: examInfo.exam_token
+                    };
+                    if (needsConfirmation()) {
+                        request.confirm = true;
+                    }
+                    const response = await fetch('/check_exam_status', {
+                        method: 'POST',
+                        headers: {
+                            'Content-Type': 'application/json',
+                        },
+                        body: JSON.stringify(request)
+                    });
+                    statusData = await response.json();
+                }
 
                 if (!statusData.can_continue) {
                     this.onTimerEnd();
                     return false;
                 }
 
+                localStorage.setItem(CONFIRMED_KEY, String(examInfo.access_id));
+
                 // Establecer tiempos basados en respuesta del servidor o localStorage
                 const storedStartTime = localStorage.getItem('examStartTime');
                 const storedEndTime = localStorage.getItem('examEndTime');
 
-                if (storedStartTime && storedEndTime) {
+                if (statusData.deadline) {
+                    // El servidor informa el vencimiento real del examen
+                    this.endTime = statusData.deadline * 1000;
+                    this.startTime = storedStartTime ? parseInt(storedStartTime) : Date.now();
+                    localStorage.setItem('examStartTime', this.startTime);
+                    localStorage.setItem('examEndTime', this.endTime);
+                } else if (storedStartTime && storedEndTime) {
                     this.startTime = parseInt(storedStartTime);
                     this.endTime = parseInt(storedEndTime);
                 } else {
@@ -97,17 +189,20 @@ document.addEventListener('DOMContentLoaded', () => {
 
         onTimerEnd() {
             this.stop();
+            this.closeStream();
             githubLinkInput.disabled = true;
             submitExamButton.disabled = true;
             alert('Tiempo de examen terminado');
             localStorage.removeItem('examStartTime');
             localStorage.removeItem('examEndTime');
+            localStorage.removeItem(CONFIRMED_KEY);
         }
     }
 
+    const timer = new ExamTimer(examTimeLimit);
+
     // Inicializar y comenzar el temporizador
     async function initializeExam() {
-        const timer = new ExamTimer(examTimeLimit);
         const canContinue = await timer.initialize();
         
         if (canContinue) {
@@ -139,6 +234,9 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
     
+        // El envío propio no debe llegar como evento 'submitted'
+        timer.closeStream();
+
         try {
             const response = await fetch('/submit_exam', {
                 method: 'POST',
@@ -155,6 +253,7 @@ document.addEventListener('DOMContentLoaded', () => {
     
             if (response.ok) {
                 alert('Examen enviado exitosamente');
+                localStorage.removeItem(CONFIRMED_KEY);
                 window.location.href = '/';
             } else {
                 alert(responseData.message || 'Error al enviar el examen');
@@ -1,4 +1,26 @@
 // static/js/index.js
+
+// Un 503 "busy" es el servidor descartando carga al abrir el turno:
+// se reintenta tras Retry-After con jitter para no volver todos juntos
+async function postWithRetry(url, body, attempts = 4) {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify(body)
+        });
+        if (response.status !== 503 || attempt + 1 >= attempts) {
+            return response;
+        }
+        const data = await response.clone().json().catch(() => ({}));
+        const base = Number(data.retry_after || response.headers.get('Retry-After')) || 1;
+        const delay = base * (1 + Math.random() * (2 ** (attempt + 1) - 1));
+        await new Promise(resolve => setTimeout(resolve, delay * 1000));
+    }
+}
+
 document.addEventListener('DOMContentLoaded', () => {
     const dniForm = document.getElementById('dni-form');
     const studentInfo = document.getElementById('student-info');
@@ -25,13 +47,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
 
         try {
-            const response = await fetch('/validate_dni', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ dni: dni })
-            });
+            const response = await postWithRetry('/validate_dni', { dni: dni });
 
             const data = await response.json();
 
@@ -70,14 +86,8 @@ document.addEventListener('DOMContentLoaded', () => {
     
         try {
             // Llamar a la ruta para iniciar examen
-            const response = await fetch('/start_exam', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify({ 
-                    student_data: studentInfo 
-                })
+            const response = await postWithRetry('/start_exam', {
+                student_data: studentInfo
             });
     
             const data = await response.json();
@@ -85,10 +95,13 @@ document.addEventListener('DOMContentLoaded', () => {
             if (data.status === 'success') {
                 // Guardar access_id para usar en la página de examen
                 studentInfo.access_id = data.access_id;
+                studentInfo.exam_token = data.exam_token;
                 localStorage.setItem('examInfo', JSON.stringify(studentInfo));
                 
                 // Redirigir a la página de examen
-                window.location.href = '/exam';
+                // El examen del turno del alumno; la página queda cacheada por examen
+                const examId = studentInfo.exam_id ? `?exam_id=${studentInfo.exam_id}` : '';
+                window.location.href = `/exam${examId}`;
             } else {
                 alert(data.message || 'No se pudo iniciar el examen');
             }
@@ -134,6 +134,23 @@ class DatabaseManager:
                 CONSTRAINT check_fecha_valida CHECK (f_desde < f_hasta)
             );
 
+            -- Tabla Email Outbox (emails pendientes de envío)
+            CREATE TABLE email_outbox (
+                id SERIAL PRIMARY KEY,
+                to_email TEXT NOT NULL,
+                subject TEXT NOT NULL,
+                html_content TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending'
+                    CHECK (status IN ('pending', 'sent', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at TIMESTAMP NOT NULL DEFAULT now(),
+                created_at TIMESTAMP NOT NULL DEFAULT now(),
+                sent_at TIMESTAMP,
+                last_error TEXT
+            );
+            CREATE INDEX email_outbox_pending_idx
+                ON email_outbox (next_attempt_at) WHERE status = 'pending';
+
             -- Comentarios explicativos
             COMMENT ON TABLE alumno IS 'Tabla que almacena la información de los alumnos';
             COMMENT ON COLUMN alumno.id IS 'Identificador único generado automáticamente';
@@ -144,6 +161,7 @@ class DatabaseManager:
             # Ejecutar script de creación de tablas
             cursor_alumnos.execute(tablas_script)
             print("Tablas creadas exitosamente.")
+            print("Ejecutar `python -m src.migrations up` para crear índices y restricciones.")
         
         except (Exception, psycopg2.Error) as error:
             print(f"Error al crear las tablas: {error}")
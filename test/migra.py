@@ -1,6 +1,16 @@
+import argparse
 import csv
+import io
 import psycopg2
+from psycopg2.extras import execute_values
 import os
+import sys
+import time
+
+# Permitir importar src/ al ejecutar el script desde test/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.cache import invalidate_roster_cache
 
 class DatabaseLoader:
     def __init__(self, host='localhost', port=5432, user='postgres', password='', database='alumnos'):
@@ -174,8 +184,158 @@ class DatabaseLoader:
         except (Exception, psycopg2.Error) as error:
             print(f"Error al cargar inscriptos: {error}")
             self.connection.rollback()
-            
+
+    def _leer_filas(self, archivo_csv, columnas, rechazados):
+        """
+        Recorre un CSV separado por punto y coma sin cargarlo en memoria.
+        Las filas con otra cantidad de columnas se anotan en ``rechazados``.
+
+        Args:
+            archivo_csv (str): Ruta del archivo CSV
+            columnas (int): Cantidad de columnas esperada
+            rechazados (list): Acumulador de (archivo, línea, motivo)
+        """
+        with open(archivo_csv, 'r', encoding='utf-8') as file:
+            csv_reader = csv.reader(file, delimiter=';')
+            next(csv_reader, None)
+            for linea, fila in enumerate(csv_reader, start=2):
+                if len(fila) != columnas:
+                    rechazados.append((archivo_csv, linea, f"se esperaban {columnas} columnas"))
+                    continue
+                yield linea, [valor.strip() for valor in fila]
+
+    def _cargar_mapa(self, consulta):
+        self.cursor.execute(consulta)
+        return {clave: id_ for clave, id_ in self.cursor.fetchall()}
+
+    def _insertar_nuevos(self, consulta, filas, mapa, lote):
+        """
+        Inserta ``filas`` con execute_values en lotes y agrega al mapa los
+        IDs devueltos por RETURNING (clave, id).
+        """
+        for inicio in range(0, len(filas), lote):
+            devueltos = execute_values(
+                self.cursor, consulta, filas[inicio:inicio + lote],
+                page_size=lote, fetch=True
+            )
+            mapa.update({clave: id_ for clave, id_ in devueltos})
+
+    def _copiar_inscriptos(self, buffer):
+        buffer.seek(0)
+        self.cursor.copy_expert(
+            "COPY inscriptos (iddni, idtectun, regular, email) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+
+    def carga_masiva(self, alumnos_csv, tecnicaturas_csv, inscriptos_csv, lote=5000):
+        """
+        Carga alumnos, tecnicaturas e inscriptos en una sola transacción.
+
+        Los IDs de alumno (por DNI) y de tecnicatura (por tectun) se resuelven
+        con mapas en memoria armados una vez, los alumnos y tecnicaturas
+        nuevos se insertan con execute_values y los inscriptos se envían con
+        COPY FROM STDIN de a ``lote`` filas. Si algo falla no queda nada
+        cargado. Las filas rechazadas se informan al final.
+
+        Args:
+            alumnos_csv (str): CSV dni;apenom
+            tecnicaturas_csv (str): CSV tectun
+            inscriptos_csv (str): CSV dni;tecnicatura;regular;email
+            lote (int): Filas por lote de INSERT / COPY
+
+        Returns:
+            dict: Filas cargadas por tabla y lista de rechazados
+        """
+        rechazados = []
+        cargados = {'alumno': 0, 'tecnicatura': 0, 'inscriptos': 0}
+        inicio = time.perf_counter()
+        autocommit_previo = self.connection.autocommit
+        self.connection.autocommit = False
+
+        try:
+            # 1. Alumnos: sólo se insertan los DNI que no existen
+            alumnos = self._cargar_mapa("SELECT dni, id FROM alumno")
+            nuevos = {}
+            for linea, (dni, apenom) in self._leer_filas(alumnos_csv, 2, rechazados):
+                if not dni.isdigit() or not apenom:
+                    rechazados.append((alumnos_csv, linea, f"DNI o nombre inválido: {dni!r}"))
+                    continue
+                dni = int(dni)
+                if dni not in alumnos and dni not in nuevos:
+                    nuevos[dni] = apenom
+            self._insertar_nuevos(
+                "INSERT INTO alumno (dni, apenom) VALUES %s RETURNING dni, id",
+                list(nuevos.items()), alumnos, lote
+            )
+            cargados['alumno'] = len(nuevos)
+
+            # 2. Tecnicaturas
+            tecnicaturas = self._cargar_mapa("SELECT tectun, id FROM tecnicatura")
+            nuevas = []
+            for linea, (tectun,) in self._leer_filas(tecnicaturas_csv, 1, rechazados):
+                if tectun and tectun not in tecnicaturas and tectun not in nuevas:
+                    nuevas.append(tectun)
+            self._insertar_nuevos(
+                "INSERT INTO tecnicatura (tectun) VALUES %s RETURNING tectun, id",
+                [(tectun,) for tectun in nuevas], tecnicaturas, lote
+            )
+            cargados['tecnicatura'] = len(nuevas)
+
+            # 3. Inscriptos vía COPY, resolviendo IDs en memoria
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            en_buffer = 0
+            for linea, (dni, tecnicatura, regular, email) in self._leer_filas(inscriptos_csv, 4, rechazados):
+                id_alumno = alumnos.get(int(dni)) if dni.isdigit() else None
+                id_tecnicatura = tecnicaturas.get(tecnicatura)
+                if id_alumno is None or id_tecnicatura is None:
+                    rechazados.append((inscriptos_csv, linea, f"No se encontró ID para DNI {dni} o tecnicatura {tecnicatura}"))
+                    continue
+                if regular not in ('COMPLETO', 'INCOMPLETO'):
+                    rechazados.append((inscriptos_csv, linea, f"Regularidad inválida: {regular!r}"))
+                    continue
+                writer.writerow((id_alumno, id_tecnicatura, regular, email or None))
+                en_buffer += 1
+                if en_buffer >= lote:
+                    self._copiar_inscriptos(buffer)
+                    cargados['inscriptos'] += en_buffer
+                    buffer.seek(0)
+                    buffer.truncate()
+                    en_buffer = 0
+            if en_buffer:
+                self._copiar_inscriptos(buffer)
+                cargados['inscriptos'] += en_buffer
+
+            self.connection.commit()
+        except (Exception, psycopg2.Error) as error:
+            self.connection.rollback()
+            print(f"Error en la carga masiva, no se cargó nada: {error}")
+            raise
+        finally:
+            self.connection.autocommit = autocommit_previo
+
+        duracion = time.perf_counter() - inicio
+        total = sum(cargados.values())
+        print(
+            f"Carga masiva: {cargados['alumno']} alumnos, {cargados['tecnicatura']} tecnicaturas, "
+            f"{cargados['inscriptos']} inscriptos en {duracion:.2f}s "
+            f"({total / duracion if duracion else 0:.0f} filas/s)"
+        )
+        if rechazados:
+            print(f"{len(rechazados)} filas rechazadas:")
+            for archivo, linea, motivo in rechazados:
+                print(f"  {archivo}:{linea}: {motivo}")
+
+        return {'cargados': cargados, 'rechazados': rechazados, 'segundos': duracion}
+
 def main():
+    parser = argparse.ArgumentParser(description='Carga alumnos, tecnicaturas e inscriptos desde CSV')
+    parser.add_argument('--masivo', action='store_true',
+                        help='Carga masiva en una transacción (COPY + mapas de IDs en memoria)')
+    parser.add_argument('--lote', type=int, default=5000, help='Filas por lote en la carga masiva')
+    args = parser.parse_args()
+
     # Configuración de conexión
     # IMPORTANTE: Reemplazar con tus credenciales
     db_loader = DatabaseLoader(
@@ -190,14 +350,20 @@ def main():
         # Conectar a la base de datos
         db_loader.connect()
         
-        # 1. Cargar alumnos desde CSV
-        db_loader.cargar_alumnos('alumnos.csv')
-        
-        # 2. Cargar tecnicaturas desde CSV
-        db_loader.cargar_tecnicaturas('tecnicaturas.csv')
-        
-        # 3. Cargar inscriptos desde CSV
-        db_loader.cargar_inscriptos('inscriptos.csv')
+        if args.masivo:
+            db_loader.carga_masiva('alumnos.csv', 'tecnicaturas.csv', 'inscriptos.csv', lote=args.lote)
+        else:
+            # 1. Cargar alumnos desde CSV
+            db_loader.cargar_alumnos('alumnos.csv')
+            
+            # 2. Cargar tecnicaturas desde CSV
+            db_loader.cargar_tecnicaturas('tecnicaturas.csv')
+            
+            # 3. Cargar inscriptos desde CSV
+            db_loader.cargar_inscriptos('inscriptos.csv')
+
+        # 4. Descartar el roster cacheado por la aplicación
+        invalidate_roster_cache()
 
     except Exception as e:
         print(f"Ocurrió un error: {e}")
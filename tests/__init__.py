@@ -0,0 +1,12 @@
+import os
+
+# src.config reads these at import time and main.py appends a generated
+# key to .env when none is configured; give the test run a complete, inert
+# setup (no log file either).
+os.environ.setdefault('FLASK_SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('DB_HOST', 'localhost')
+os.environ.setdefault('DB_PORT', '5432')
+os.environ.setdefault('DB_NAME', 'alumnos_test')
+os.environ.setdefault('DB_USER', 'evalua')
+os.environ.setdefault('DB_PASSWORD', 'evalua')
+os.environ.setdefault('LOG_FILE', '')
@@ -0,0 +1,90 @@
+import datetime
+import os
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.migrations import migrate_up
+from src.models import Base
+
+# Base Postgres descartable para los tests marcados con skipUnless
+TEST_DATABASE_URL = os.getenv('TEST_DATABASE_URL')
+
+APP_TABLES = ('email_outbox', 'acceso', 'inscriptos', 'turnos', 'alumno', 'tecnicatura', 'examen')
+
+
+class SQLiteConnection:
+    """Stand-in for DatabaseConnection backed by an in-memory SQLite db"""
+
+    def __init__(self):
+        self.engine = create_engine(
+            'sqlite://',
+            connect_args={'check_same_thread': False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.statements = []
+        event.listen(
+            self.engine, 'before_cursor_execute',
+            lambda conn, cursor, statement, *args: self.statements.append(statement)
+        )
+
+    def get_connection(self, read_only=False, sticky_key=None):
+        return self.Session()
+
+
+class PostgresConnection:
+    """Stand-in for DatabaseConnection on an engine of TEST_DATABASE_URL"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.Session = sessionmaker(bind=engine)
+
+    def get_connection(self, read_only=False, sticky_key=None):
+        return self.Session()
+
+
+class AsyncPostgresConnection:
+    """Stand-in for AsyncDatabaseConnection on an async engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+        self.engine = engine
+        self.Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    def get_connection(self, read_only=False, sticky_key=None):
+        return self.Session()
+
+
+def postgres_engine(**kwargs):
+    """Engine on TEST_DATABASE_URL with the app schema migrated and every app table empty"""
+    engine = create_engine(TEST_DATABASE_URL, **kwargs)
+    Base.metadata.create_all(engine)
+    migrate_up(engine)
+    with engine.begin() as connection:
+        connection.execute(text(f"TRUNCATE {', '.join(APP_TABLES)} RESTART IDENTITY CASCADE"))
+    return engine
+
+
+def seed_postgres(engine, tiempo=None, now=None):
+    """
+    Alumno 1 (DNI 30111222) inscribed as inscripción 1 in tecnicatura 1.
+    With ``tiempo``, also turno 1 (exam 1) open around ``now``.
+    """
+    now = now or datetime.datetime.now()
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO alumno (id, dni, apenom) VALUES (1, 30111222, 'Perez, Ana')"))
+        connection.execute(text("INSERT INTO tecnicatura (id, tectun) VALUES (1, 'Informatica')"))
+        connection.execute(text(
+            "INSERT INTO inscriptos (id, iddni, idtectun, regular, email) "
+            "VALUES (1, 1, 1, 'COMPLETO', 'ana@example.com')"
+        ))
+        if tiempo is not None:
+            connection.execute(text("INSERT INTO examen (id, exalink) VALUES (1, 'https://github.com/alfa/examen')"))
+            connection.execute(text(
+                "INSERT INTO turnos (id, idtec, idexa, regular, tiempo, f_desde, f_hasta) "
+                "VALUES (1, 1, 1, 'COMPLETO', :tiempo, :desde, :hasta)"
+            ), {'tiempo': tiempo, 'desde': now - datetime.timedelta(hours=1),
+                'hasta': now + datetime.timedelta(hours=1)})
@@ -0,0 +1,116 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+import psycopg2
+from openpyxl import Workbook
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from actualiza import COLUMNAS, importar_turnos, leer_lotes, validar_lote
+from tests.support import TEST_DATABASE_URL, postgres_engine
+
+DESDE = datetime.datetime(2025, 3, 1, 8, 0)
+HASTA = datetime.datetime(2025, 3, 1, 12, 0)
+
+
+def fila(**cambios):
+    valores = {'f_desde': DESDE, 'f_hasta': HASTA, 'idtec': 1, 'idexa': 1,
+               'regular': 'completo', 'tiempo': 120}
+    valores.update(cambios)
+    return [valores[c] for c in COLUMNAS]
+
+
+def write_xlsx(filas, encabezado=COLUMNAS):
+    path = os.path.join(tempfile.mkdtemp(), 'turnos.xlsx')
+    wb = Workbook()
+    ws = wb.active
+    ws.append(list(encabezado))
+    for valores in filas:
+        ws.append(valores)
+    wb.save(path)
+    return path
+
+
+class ValidarLoteTest(unittest.TestCase):
+    def validar(self, *filas):
+        df = pd.DataFrame([[n] + f for n, f in enumerate(filas, start=2)],
+                          columns=['fila'] + COLUMNAS)
+        return validar_lote(df, tecnicaturas=[1, 2], examenes=[1])
+
+    def motivo(self, **cambios):
+        validas, rechazadas = self.validar(fila(**cambios))
+        self.assertTrue(validas.empty)
+        return rechazadas['motivo'].iloc[0]
+
+    def test_valid_row_is_normalized(self):
+        validas, rechazadas = self.validar(fila(idtec='2', regular=' incompleto '))
+        self.assertTrue(rechazadas.empty)
+        self.assertEqual(validas['idtec'].tolist(), [2])
+        self.assertEqual(validas['regular'].tolist(), ['INCOMPLETO'])
+
+    def test_rejection_rules(self):
+        self.assertEqual(self.motivo(f_desde=HASTA, f_hasta=DESDE),
+                         'f_desde debe ser anterior a f_hasta')
+        self.assertEqual(self.motivo(f_hasta=DESDE), 'f_desde debe ser anterior a f_hasta')
+        self.assertEqual(self.motivo(f_desde='mañana'), 'fecha inválida')
+        self.assertEqual(self.motivo(idtec=9), 'idtec desconocido')
+        self.assertEqual(self.motivo(idtec=None), 'idtec desconocido')
+        self.assertEqual(self.motivo(idexa=7), 'idexa desconocido')
+        self.assertEqual(self.motivo(regular='AUSENTE'), 'regular debe ser COMPLETO o INCOMPLETO')
+        self.assertEqual(self.motivo(regular=None), 'regular debe ser COMPLETO o INCOMPLETO')
+        self.assertEqual(self.motivo(tiempo=0), 'tiempo inválido')
+        self.assertEqual(self.motivo(tiempo=None), 'tiempo inválido')
+
+    def test_mixed_batch_keeps_row_numbers(self):
+        validas, rechazadas = self.validar(fila(), fila(idexa=7), fila())
+        self.assertEqual(validas['fila'].tolist(), [2, 4])
+        self.assertEqual(rechazadas['fila'].tolist(), [3])
+
+
+class LeerLotesTest(unittest.TestCase):
+    def test_batches_skip_empty_rows(self):
+        path = write_xlsx([fila(), [None] * 6, fila(), fila()])
+        lotes = list(leer_lotes(path, lote=2))
+        self.assertEqual([len(df) for df in lotes], [2, 1])
+        self.assertEqual(lotes[0]['fila'].tolist(), [2, 4])
+
+    def test_missing_columns(self):
+        path = write_xlsx([], encabezado=COLUMNAS[:-1])
+        with self.assertRaises(ValueError):
+            list(leer_lotes(path))
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL no configurada')
+class ImportarTurnosTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = postgres_engine()
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connection:
+            connection.execute(text("INSERT INTO tecnicatura (id, tectun) VALUES (1, 'Informatica')"))
+            connection.execute(text("INSERT INTO examen (id, exalink) VALUES (1, 'https://x')"))
+        url = make_url(TEST_DATABASE_URL).set(drivername='postgresql')
+        self.conn = psycopg2.connect(url.render_as_string(hide_password=False))
+        self.addCleanup(self.conn.close)
+        self.path = write_xlsx([fila(), fila(idtec=9), fila(), fila()])
+
+    def turnos(self):
+        with self.engine.connect() as connection:
+            return connection.execute(text("SELECT count(*) FROM turnos")).scalar()
+
+    def test_dry_run_rolls_back(self):
+        insertadas, rechazadas = importar_turnos(self.conn, self.path, lote=2, dry_run=True)
+        self.assertEqual(insertadas, 3)
+        self.assertEqual(rechazadas, [(3, 'idtec desconocido')])
+        self.assertEqual(self.turnos(), 0)
+
+    def test_import_commits(self):
+        insertadas, _ = importar_turnos(self.conn, self.path, lote=2)
+        self.assertEqual(insertadas, 3)
+        self.assertEqual(self.turnos(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
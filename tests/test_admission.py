@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+
+from src import admission
+from src.admission import QUEUE_FULL, TIMEOUT, AdmissionGate, AsyncAdmissionGate
+from src.app_factory import create_app
+from src.config import Config
+
+
+class AdmissionGateTest(unittest.TestCase):
+    def test_waits_for_a_slot_then_sheds(self):
+        gate = AdmissionGate(max_concurrent=1, max_waiting=1, wait_seconds=5)
+        self.assertIsNone(gate.enter('validate_dni'))
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(gate.enter('validate_dni')))
+        waiter.start()
+        while gate.waiting == 0:
+            pass
+        # La cola (de uno) ya está llena
+        self.assertEqual(gate.enter('start_exam'), QUEUE_FULL)
+
+        gate.leave()
+        waiter.join()
+        self.assertEqual(results, [None])
+        gate.leave()
+
+    def test_timeout(self):
+        gate = AdmissionGate(max_concurrent=1, max_waiting=5, wait_seconds=0.01)
+        gate.enter('validate_dni')
+        self.assertEqual(gate.enter('validate_dni'), TIMEOUT)
+        self.assertEqual(gate.waiting, 0)
+
+
+class AsyncAdmissionGateTest(unittest.TestCase):
+    def test_queue_full_and_timeout(self):
+        async def scenario():
+            gate = AsyncAdmissionGate(max_concurrent=1, max_waiting=1, wait_seconds=0.05)
+            self.assertIsNone(await gate.enter('validate_dni'))
+            waiter = asyncio.ensure_future(gate.enter('validate_dni'))
+            await asyncio.sleep(0)
+            self.assertEqual(await gate.enter('validate_dni'), QUEUE_FULL)
+            self.assertEqual(await waiter, TIMEOUT)
+
+            gate.leave()
+            self.assertIsNone(await gate.enter('validate_dni'))
+
+        asyncio.run(scenario())
+
+
+class FlaskAdmissionTest(unittest.TestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.manager = mock.Mock()
+
+        def eligibility(dni):
+            self.release.wait(5)
+            return {'eligible': False, 'message': 'no habilitado'}
+
+        self.manager.check_exam_eligibility.side_effect = eligibility
+        for patcher in (mock.patch.object(Config, 'RATE_LIMIT_ENABLED', False),
+                        mock.patch.object(Config, 'ADMISSION_ENABLED', True),
+                        mock.patch.object(Config, 'ADMISSION_MAX_CONCURRENT', 1),
+                        mock.patch.object(Config, 'ADMISSION_MAX_WAITING', 0),
+                        mock.patch('src.routes._exam_manager', return_value=self.manager)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.app = create_app()
+
+    def test_503_with_retry_after_while_the_slot_is_busy(self):
+        statuses = []
+        busy = threading.Thread(target=lambda: statuses.append(
+            self.app.test_client().post('/validate_dni', json={'dni': '30111222'}).status_code
+        ))
+        busy.start()
+        while self.manager.check_exam_eligibility.call_count == 0:
+            pass
+
+        response = self.app.test_client().post('/validate_dni', json={'dni': '30111223'})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], str(Config.ADMISSION_RETRY_AFTER))
+        self.assertEqual(response.get_json()['status'], 'busy')
+        # Las páginas no pasan por la compuerta
+        self.assertEqual(self.app.test_client().get('/').status_code, 200)
+
+        self.release.set()
+        busy.join()
+        self.assertEqual(statuses, [400])
+        # El slot se liberó en el teardown
+        response = self.app.test_client().post('/validate_dni', json={'dni': '30111223'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_disabled(self):
+        with mock.patch.object(Config, 'ADMISSION_ENABLED', False):
+            self.assertIsNone(admission.init_app(create_app()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks.cold_start import measure_once
+from src.config import Config
+
+
+class ColdStartTest(unittest.TestCase):
+    def test_serverless_start_is_lazy_and_writes_nothing(self):
+        sample = measure_once(paths=['/'])
+        self.assertEqual(sample['heavy_modules'], [])
+        self.assertEqual(sample['files_written'], [])
+        self.assertEqual(sample['first_request']['/']['status'], 200)
+
+
+class EnsureSecretKeyTest(unittest.TestCase):
+    def test_ephemeral_key_is_not_persisted(self):
+        with tempfile.TemporaryDirectory() as workdir, \
+                mock.patch.object(Config, 'SECRET_KEY', None):
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                key = Config.ensure_secret_key(persist=False)
+                self.assertEqual(Config.ensure_secret_key(persist=False), key)
+            finally:
+                os.chdir(cwd)
+            self.assertTrue(key)
+            self.assertEqual(os.listdir(workdir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import assets
+from src.app_factory import create_app
+
+
+class MinifyJsTest(unittest.TestCase):
+    def test_indentation_and_comments_are_dropped(self):
+        source = "function f() {\n    // comentario\n\n    return 'a  // b';\n}\n"
+        self.assertEqual(assets.minify_js(source), "function f() {\nreturn 'a  // b';\n}\n")
+
+    def test_multi_line_template_literals_are_untouched(self):
+        source = (
+            "    const html = `\n"
+            "        <p>${nombre}</p>\n"
+            "\n"
+            "        // no es un comentario\n"
+            "    `;  \n"
+            "    // sí es un comentario\n"
+            "    const url = `/exam?${'id'}`;\n"
+        )
+        self.assertEqual(assets.minify_js(source), (
+            "const html = `\n"
+            "        <p>${nombre}</p>\n"
+            "\n"
+            "        // no es un comentario\n"
+            "    `;  \n"
+            "const url = `/exam?${'id'}`;\n"
+        ))
+
+    def test_backticks_in_strings_and_comments_do_not_open_a_literal(self):
+        source = "const a = '`';\n    let b = 1; // `x\n    // c\n"
+        self.assertEqual(assets.minify_js(source), "const a = '`';\nlet b = 1; // `x\n")
+
+
+class BuildTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.static_dir = os.path.join(workdir.name, 'static')
+        self.dist_dir = os.path.join(self.static_dir, 'dist')
+        os.makedirs(os.path.join(self.static_dir, 'css'))
+        with open(os.path.join(self.static_dir, 'css', 'site.css'), 'w') as f:
+            f.write('/* site */\nbody {\n    color: red;\n}\n' + 'p { margin: 0; }\n' * 50)
+
+    def test_hashed_minified_and_compressed(self):
+        manifest = assets.build(self.static_dir, self.dist_dir)
+        entry = manifest['css/site.css']
+        self.assertRegex(entry['file'], r'^css/site\.[0-9a-f]{10}\.css$')
+        self.assertIn('gzip', entry['encodings'])
+
+        with open(os.path.join(self.dist_dir, entry['file'])) as f:
+            minified = f.read()
+        self.assertTrue(minified.startswith('body{color:red}p{margin:0}'))
+        with gzip.open(os.path.join(self.dist_dir, entry['file'] + '.gz'), 'rt') as f:
+            self.assertEqual(f.read(), minified)
+
+        # El build se repite idéntico: mismo contenido, mismo hash
+        self.assertEqual(assets.build(self.static_dir, self.dist_dir), manifest)
+
+    def test_negotiate(self):
+        assets.build(self.static_dir, self.dist_dir)
+        manifest = assets.Manifest.load(self.dist_dir)
+        hashed = manifest.entries['css/site.css']['file']
+        self.assertEqual(manifest.url('css/site.css'), '/static/dist/' + hashed)
+        self.assertEqual(manifest.url('img/none.png'), '/static/img/none.png')
+        self.assertEqual(manifest.negotiate(hashed, 'gzip, deflate'), (hashed + '.gz', 'gzip'))
+        self.assertEqual(manifest.negotiate(hashed, 'gzip;q=0'), (hashed, None))
+        self.assertIsNone(manifest.negotiate('css/site.0000000000.css', 'gzip'))
+
+    def test_flask_serves_immutable_precompressed_assets(self):
+        manifest = assets.build(self.static_dir, self.dist_dir)
+        hashed = manifest['css/site.css']['file']
+        with mock.patch.object(assets, 'DIST_DIR', self.dist_dir), \
+                mock.patch.object(assets, '_manifest', assets.Manifest.load(self.dist_dir)):
+            client = create_app().test_client()
+            response = client.get('/static/dist/' + hashed, headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertEqual(response.headers['Cache-Control'], assets.IMMUTABLE_CACHE_CONTROL)
+            self.assertEqual(response.mimetype, 'text/css')
+            response.close()
+            self.assertEqual(client.get('/static/dist/css/site.0000000000.css').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
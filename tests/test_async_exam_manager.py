@@ -0,0 +1,72 @@
+import importlib.util
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from src.cache import roster_cache
+from src.turno_index import turno_index
+from tests.support import (
+    TEST_DATABASE_URL, AsyncPostgresConnection, postgres_engine, seed_postgres,
+)
+HAS_ASYNCPG = importlib.util.find_spec('asyncpg') is not None
+
+
+@unittest.skipUnless(TEST_DATABASE_URL and HAS_ASYNCPG, 'TEST_DATABASE_URL/asyncpg no disponibles')
+class AsyncExamManagerTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        engine = postgres_engine()
+        seed_postgres(engine, tiempo=90)
+        engine.dispose()
+        roster_cache.clear()
+        turno_index.invalidate()
+
+    async def asyncSetUp(self):
+        from sqlalchemy.ext.asyncio import create_async_engine
+        from src.async_exam_manager import AsyncExamManager
+
+        url = make_url(TEST_DATABASE_URL).set(drivername='postgresql+asyncpg')
+        self.engine = create_async_engine(url)
+        self.manager = AsyncExamManager.__new__(AsyncExamManager)
+        self.manager.db = AsyncPostgresConnection(self.engine)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+        turno_index.invalidate()
+
+    async def test_exam_flow_matches_sync_contract(self):
+        result = await self.manager.check_exam_eligibility(30111222)
+        self.assertTrue(result['eligible'])
+        self.assertEqual(result['exam_time_limit'], 90)
+
+        access = await self.manager.start_exam(1)
+        again = await self.manager.start_exam(1)
+        self.assertEqual(access.id, again.id)
+        token = await self.manager.issue_exam_token(access)
+        self.assertIsNotNone(token)
+
+        status = await self.manager.check_exam_status(access.id, token=token, confirm=True)
+        self.assertTrue(status['can_continue'])
+
+        result = await self.manager.check_exam_eligibility(30111222)
+        self.assertEqual(result['message'], 'Ya ha ocupado su cupón de EXAMEN')
+
+        self.assertTrue(await self.manager.submit_exam(access.id, 'https://github.com/ana/final'))
+        # Sin confirm: la confirmación previa ya no vale después del envío
+        status = await self.manager.check_exam_status(access.id, token=token)
+        self.assertEqual(status, {'can_continue': False, 'message': 'El examen ya ha sido enviado'})
+        self.assertFalse(await self.manager.submit_exam(999999, 'https://github.com/x'))
+
+        async with self.manager.db.get_connection() as session:
+            queued = (await session.execute(text(
+                "SELECT to_email FROM email_outbox WHERE status = 'pending'"
+            ))).scalars().all()
+        self.assertEqual(queued, ['ana@example.com'])
+
+    async def test_only_exams_with_an_open_turno_are_open(self):
+        self.assertTrue(await self.manager.is_exam_open(1))
+        self.assertFalse(await self.manager.is_exam_open(2))
+
+
+if __name__ == '__main__':
+    unittest.main()
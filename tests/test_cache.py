@@ -0,0 +1,51 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.cache import StampFile, TTLCache
+
+
+class TTLCacheTest(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        cache = TTLCache(max_entries=10, ttl=60)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 1)
+        self.assertEqual(cache.get('a'), 1)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        cache = TTLCache(max_entries=2, ttl=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_falsy_values_are_cached(self):
+        cache = TTLCache(max_entries=2, ttl=60)
+        cache.set('a', ())
+        self.assertEqual(cache.get('a'), ())
+
+    def test_broadcast_clear_reaches_other_caches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stamp = os.path.join(tmp, 'roster.stamp')
+            reader = TTLCache(10, 60, stamp=StampFile(stamp, check_interval=0))
+            writer = TTLCache(10, 60, stamp=StampFile(stamp, check_interval=0))
+            reader.set('a', 1)
+            writer.clear(broadcast=True)
+            self.assertIsNone(reader.get('a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import datetime
+import math
+import unittest
+from unittest import mock
+
+from src import database
+from src.config import Config
+from src.database import DatabaseConnection, ReplicaSet, dispose_engine, get_engine, mark_written
+from src.exam_manager import ExamManager
+from src.turno_index import turno_index
+from tests.support import SQLiteConnection
+from tests.test_exam_manager import seed
+
+
+class SharedEngineTest(unittest.TestCase):
+    def tearDown(self):
+        dispose_engine()
+
+    def test_connections_share_one_engine(self):
+        first = DatabaseConnection()
+        second = DatabaseConnection()
+        self.assertIs(first.engine, second.engine)
+        self.assertIs(first.Session, second.Session)
+
+    def test_pool_settings_come_from_config(self):
+        engine = get_engine()
+        self.assertEqual(engine.pool.size(), Config.DB_POOL_SIZE)
+        self.assertEqual(engine.pool._max_overflow, Config.DB_MAX_OVERFLOW)
+        self.assertEqual(engine.pool._recycle, Config.DB_POOL_RECYCLE)
+        self.assertEqual(engine.pool._pre_ping, Config.DB_POOL_PRE_PING)
+
+    def test_dispose_creates_a_fresh_engine(self):
+        engine = get_engine()
+        dispose_engine()
+        self.assertIsNone(database._engine)
+        self.assertIsNot(get_engine(), engine)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class ReplicaSetTest(unittest.TestCase):
+    def setUp(self):
+        self.lags = {'a': 1.0, 'b': 30.0}
+        self.measured = []
+        self.clock = FakeClock()
+
+        def measure(engine):
+            self.measured.append(engine)
+            lag = self.lags[engine]
+            if isinstance(lag, Exception):
+                raise lag
+            return lag
+
+        # Los "engines" sólo se pasan a measure_lag
+        with mock.patch.object(database, 'sessionmaker'):
+            self.replicas = ReplicaSet([('a', 'a'), ('b', 'b')], max_lag=5, check_interval=10,
+                                       measure_lag=measure, clock=self.clock)
+
+    def test_late_replicas_are_skipped(self):
+        self.assertEqual({self.replicas.pick().name for _ in range(4)}, {'a'})
+        self.lags['b'] = 0.5
+        self.assertEqual({self.replicas.pick().name for _ in range(4)}, {'a'})
+        # El atraso se vuelve a medir pasado check_interval
+        self.clock.now += 10
+        self.assertEqual({self.replicas.pick().name for _ in range(4)}, {'a', 'b'})
+
+    def test_lag_is_measured_once_per_interval(self):
+        for _ in range(10):
+            self.replicas.pick()
+        self.assertEqual(sorted(self.measured), ['a', 'b'])
+
+    def test_unreachable_replicas_fall_back_to_the_primary(self):
+        self.lags = {'a': ConnectionError('down'), 'b': 30.0}
+        self.assertIsNone(self.replicas.pick())
+        self.assertEqual(self.replicas.replicas[0].lag, math.inf)
+
+
+class ReadRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.replica = SQLiteConnection()
+        replicas = ReplicaSet([('r', self.replica.engine)], max_lag=5, check_interval=10)
+        patcher = mock.patch.object(database, '_replicas', replicas)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(database.recent_writes.clear)
+        self.addCleanup(dispose_engine)
+        self.db = DatabaseConnection()
+
+    def test_reads_go_to_the_replica_and_writes_to_the_primary(self):
+        self.assertIs(self.db.get_connection(read_only=True).get_bind(), self.replica.engine)
+        self.assertIs(self.db.get_connection().get_bind(), self.db.engine)
+
+    def test_own_writes_stick_to_the_primary(self):
+        mark_written(('acceso', 7))
+        session = self.db.get_connection(read_only=True, sticky_key=('acceso', 7))
+        self.assertIs(session.get_bind(), self.db.engine)
+        session = self.db.get_connection(read_only=True, sticky_key=('acceso', 8))
+        self.assertIs(session.get_bind(), self.replica.engine)
+
+
+class _PrimaryAndReplica:
+    """Two SQLite databases; the replica never receives the writes"""
+
+    def __init__(self):
+        self.primary = SQLiteConnection()
+        self.replica = SQLiteConnection()
+
+    def get_connection(self, read_only=False, sticky_key=None):
+        return (self.replica if read_only else self.primary).get_connection()
+
+
+class ReadYourWritesTest(unittest.TestCase):
+    def test_status_of_an_access_the_replica_does_not_have_yet(self):
+        now = datetime.datetime.now()
+        manager = ExamManager.__new__(ExamManager)
+        manager.db = _PrimaryAndReplica()
+        seed(manager.db.primary, now)
+        seed(manager.db.replica, now)
+        turno_index.invalidate()
+        self.addCleanup(database.recent_writes.clear)
+
+        access = manager.start_exam(1)
+        status = manager.check_exam_status(access.id)
+        self.assertTrue(status['can_continue'])
+        # Se buscó primero en la réplica y, al no estar, en el primario
+        self.assertTrue(any('FROM acceso' in sql for sql in manager.db.replica.statements))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import datetime
+import socketserver
+import threading
+import unittest
+
+from src.email_outbox import OutboxWorker, enqueue_email
+from src.email_sender import MemoryTransport, SMTPTransport
+from src.models import EmailOutbox
+from tests.support import SQLiteConnection
+
+
+class FailingTransport:
+    def send(self, to_email, subject, html_content):
+        raise ConnectionError('proveedor caído')
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP to accept one message per connection"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        self.reply('220 sink')
+        in_data = False
+        lines = []
+        for raw in self.rfile:
+            line = raw.decode('utf-8').rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    self.server.messages.append('\n'.join(lines))
+                    in_data = False
+                    self.reply('250 queued')
+                else:
+                    lines.append(line)
+                continue
+            command = line.split(' ', 1)[0].upper()
+            if command == 'DATA':
+                in_data = True
+                self.reply('354 go ahead')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SMTPSinkHandler)
+        self.messages = []
+
+
+class OutboxWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = SQLiteConnection()
+        self.now = datetime.datetime(2024, 12, 10, 9, 0, 0)
+        session = self.db.get_connection()
+        enqueue_email(session, 'ana@example.com', 'Confirmación', '<p>ok</p>', now=self.now)
+        enqueue_email(session, 'juan@example.com', 'Confirmación', '<p>ok</p>', now=self.now)
+        session.commit()
+        session.close()
+
+    def rows(self):
+        session = self.db.get_connection()
+        try:
+            return session.query(EmailOutbox).order_by(EmailOutbox.id).all()
+        finally:
+            session.close()
+
+    def test_batch_is_sent_and_marked(self):
+        transport = MemoryTransport()
+        worker = OutboxWorker(self.db, transport, batch_size=10)
+
+        self.assertEqual(worker.drain_once(now=self.now), 2)
+        self.assertEqual([m['to_email'] for m in transport.sent],
+                         ['ana@example.com', 'juan@example.com'])
+        self.assertEqual({row.status for row in self.rows()}, {'sent'})
+        self.assertEqual(worker.drain_once(now=self.now), 0)
+
+    def test_failures_back_off_then_give_up(self):
+        worker = OutboxWorker(self.db, FailingTransport(), batch_size=10,
+                              max_attempts=2, backoff_seconds=60)
+
+        worker.drain_once(now=self.now)
+        row = self.rows()[0]
+        self.assertEqual((row.status, row.attempts), ('pending', 1))
+        self.assertEqual(row.next_attempt_at, self.now + datetime.timedelta(seconds=60))
+
+        # Nada que reintentar antes del backoff
+        self.assertEqual(worker.drain_once(now=self.now), 0)
+
+        worker.drain_once(now=self.now + datetime.timedelta(seconds=61))
+        self.assertEqual({row.status for row in self.rows()}, {'failed'})
+
+    def test_smtp_transport_against_local_sink(self):
+        sink = SMTPSink()
+        thread = threading.Thread(target=sink.serve_forever, daemon=True)
+        thread.start()
+        try:
+            transport = SMTPTransport(host='127.0.0.1', port=sink.server_address[1])
+            worker = OutboxWorker(self.db, transport, batch_size=10)
+            self.assertEqual(worker.drain_once(now=self.now), 2)
+        finally:
+            sink.shutdown()
+            sink.server_close()
+        self.assertEqual(len(sink.messages), 2)
+        self.assertIn('To: ana@example.com', sink.messages[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
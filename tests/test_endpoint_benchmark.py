@@ -0,0 +1,71 @@
+import os
+import unittest
+
+from benchmarks.endpoints import compare, disposable_database, percentile, run, seed
+
+BENCH_ADMIN_URL = os.getenv('BENCH_ADMIN_URL')
+
+
+class CompareTest(unittest.TestCase):
+    baseline = {'validate_dni': {'8': {
+        'throughput_rps': 100.0, 'p50_ms': 5.0, 'p95_ms': 10.0, 'p99_ms': 20.0,
+        'queries_per_request': 1.0, 'errors': 0, 'requests': 100,
+    }}}
+
+    def report(self, **overrides):
+        current = dict(self.baseline['validate_dni']['8'], **overrides)
+        return {'validate_dni': {'8': current}}
+
+    def test_within_threshold(self):
+        self.assertEqual(compare(self.report(p95_ms=12.0), self.baseline, 0.25), [])
+
+    def test_latency_throughput_and_queries_regressions(self):
+        problems = compare(
+            self.report(p95_ms=13.0, throughput_rps=70.0, queries_per_request=2.0),
+            self.baseline, 0.25)
+        self.assertEqual(len(problems), 3)
+
+    def test_errors_always_fail(self):
+        self.assertEqual(len(compare(self.report(errors=1), {}, 0.25)), 1)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 99), 0.0)
+
+
+@unittest.skipUnless(BENCH_ADMIN_URL, 'BENCH_ADMIN_URL no configurada')
+class EndpointBenchmarkSmokeTest(unittest.TestCase):
+    """Small end-to-end run; guards the per-request statement counts"""
+
+    def tearDown(self):
+        from src.config import Config
+        from src.database import dispose_engine
+        dispose_engine()
+        Config.DATABASE_URL = None
+        os.environ.pop('DATABASE_URL', None)
+
+    def test_small_run(self):
+        from sqlalchemy import create_engine
+        from src.database import dispose_engine
+
+        with disposable_database(BENCH_ADMIN_URL) as url:
+            engine = create_engine(url)
+            seed(engine, students=40)
+            engine.dispose()
+            report = run(url, students=40, concurrency_levels=[4], requests=40)
+            dispose_engine()
+
+        self.assertEqual(compare(report, {}, 0.25), [])
+        self.assertLessEqual(report['validate_dni']['4']['queries_per_request'], 1.1)
+        self.assertLessEqual(report['check_exam_status']['4']['queries_per_request'], 1.0)
+        self.assertLessEqual(report['start_exam']['4']['queries_per_request'], 2.0)
+        # Group commit: a lo sumo una sentencia y un COMMIT por envío
+        self.assertLessEqual(report['submit_exam']['4']['queries_per_request'], 1.0)
+        self.assertLessEqual(report['submit_exam']['4']['commits_per_request'],
+                             report['submit_exam_per_request']['4']['commits_per_request'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import asyncio
+import importlib.util
+import json
+import time
+import unittest
+from unittest import mock
+
+from sqlalchemy.engine import make_url
+
+from src import exam_events
+from src.config import Config
+from src.exam_events import (
+    ExamEvent,
+    ExamEventListener,
+    RegistryFull,
+    SubscriberRegistry,
+    format_sse,
+    notify_statement,
+    parse_notification,
+)
+from tests.support import TEST_DATABASE_URL, postgres_engine
+HAS_ASYNCPG = importlib.util.find_spec('asyncpg') is not None
+HAS_STARLETTE = importlib.util.find_spec('starlette') is not None
+
+
+class SubscriberRegistryTest(unittest.IsolatedAsyncioTestCase):
+    async def test_limits_per_access_and_per_process(self):
+        registry = SubscriberRegistry(max_subscribers=3, max_per_access=2, queue_size=4)
+        first = registry.subscribe(1)
+        registry.subscribe(1)
+        with self.assertRaises(RegistryFull):
+            registry.subscribe(1)
+        registry.subscribe(2)
+        with self.assertRaises(RegistryFull):
+            registry.subscribe(3)
+
+        registry.unsubscribe(first)
+        registry.unsubscribe(first)
+        registry.subscribe(3)
+        self.assertEqual(registry.stats(), {'subscribers': 3, 'accesses': 3, 'rejected': 2})
+
+    async def test_publish_reaches_only_that_access(self):
+        registry = SubscriberRegistry(max_subscribers=10, max_per_access=2, queue_size=4)
+        tabs = [registry.subscribe(7), registry.subscribe(7)]
+        other = registry.subscribe(8)
+
+        event = ExamEvent(7, 'extended', {'deadline': 1700000000})
+        self.assertEqual(registry.publish(event), 2)
+        for tab in tabs:
+            self.assertEqual(await tab.next_event(1), event)
+        self.assertIsNone(await other.next_event(0.01))
+
+    async def test_slow_stream_keeps_the_latest_events(self):
+        registry = SubscriberRegistry(max_subscribers=10, max_per_access=1, queue_size=2)
+        subscriber = registry.subscribe(7)
+        for deadline in (1, 2, 3):
+            registry.publish(ExamEvent(7, 'extended', {'deadline': deadline}))
+        await asyncio.sleep(0)
+
+        received = [(await subscriber.next_event(1)).data['deadline'] for _ in range(2)]
+        self.assertEqual(received, [2, 3])
+
+    async def test_publish_from_another_thread(self):
+        registry = SubscriberRegistry(max_subscribers=10, max_per_access=1, queue_size=2)
+        subscriber = registry.subscribe(7)
+        event = ExamEvent(7, 'submitted', {})
+        await asyncio.get_running_loop().run_in_executor(None, registry.publish, event)
+        self.assertEqual(await subscriber.next_event(1), event)
+
+
+class EventFormatTest(unittest.TestCase):
+    def test_notification_round_trip(self):
+        statement = notify_statement(7, 'extended', deadline=1700000000)
+        channel, payload = statement.compile().params.values()
+        self.assertEqual(channel, 'exam_events')
+        self.assertEqual(parse_notification(payload),
+                         ExamEvent(7, 'extended', {'deadline': 1700000000}))
+
+    def test_format_sse(self):
+        message = format_sse('deadline', {'deadline': 1700000000})
+        self.assertEqual(message, 'event: deadline\ndata: {"deadline": 1700000000}\n\n')
+        self.assertEqual(json.loads(message.split('data: ')[1]), {'deadline': 1700000000})
+
+
+@unittest.skipUnless(TEST_DATABASE_URL and HAS_ASYNCPG, 'TEST_DATABASE_URL/asyncpg no disponibles')
+class ExamEventListenerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_committed_notify_reaches_subscribers(self):
+        if make_url(TEST_DATABASE_URL).get_backend_name() != 'postgresql':
+            self.skipTest('LISTEN/NOTIFY requiere Postgres')
+        registry = SubscriberRegistry(max_subscribers=10, max_per_access=1, queue_size=4)
+        subscriber = registry.subscribe(7)
+        listener = ExamEventListener.from_url(TEST_DATABASE_URL, registry)
+        listener.start()
+        engine = postgres_engine()
+        try:
+            await asyncio.sleep(0.5)
+            loop = asyncio.get_running_loop()
+
+            def notify(commit):
+                with engine.connect() as connection:
+                    connection.execute(notify_statement(7, 'extended', deadline=1))
+                    if commit:
+                        connection.commit()
+
+            await loop.run_in_executor(None, notify, False)
+            await loop.run_in_executor(None, notify, True)
+            self.assertEqual(await subscriber.next_event(5),
+                             ExamEvent(7, 'extended', {'deadline': 1}))
+            self.assertIsNone(await subscriber.next_event(0.2))
+        finally:
+            await listener.stop()
+            engine.dispose()
+
+
+@unittest.skipUnless(HAS_STARLETTE, 'starlette no instalado')
+class ExamStreamResponseTest(unittest.IsolatedAsyncioTestCase):
+    async def test_disconnect_before_the_body_releases_the_subscriber(self):
+        with mock.patch.object(Config, 'DATABASE_URL', 'sqlite://'):
+            from src import asgi
+        registry = SubscriberRegistry(max_subscribers=1, max_per_access=1, queue_size=4)
+        patcher = mock.patch.object(exam_events, 'registry', registry)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        subscriber = registry.subscribe(7)
+        status = {'can_continue': True, 'deadline': time.time() + 60}
+        response = asgi._ExamStreamResponse(subscriber, asgi._exam_stream(subscriber, status))
+
+        async def send(message):
+            raise OSError('cliente desconectado')
+
+        async def receive():
+            return {'type': 'http.disconnect'}
+
+        scope = {'type': 'http', 'asgi': {'spec_version': '2.4'}}
+        with self.assertRaises(Exception):
+            await response(scope, receive, send)
+        # El generador nunca arrancó y aun así hay lugar para otro stream
+        self.assertEqual(registry.stats()['subscribers'], 0)
+        registry.subscribe(7)
+
+
+if __name__ == '__main__':
+    unittest.main()
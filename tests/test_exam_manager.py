@@ -0,0 +1,230 @@
+import datetime
+import unittest
+
+from src.cache import roster_cache
+from src.exam_manager import ExamManager, status_confirmations
+from src.turno_index import turno_index
+from src.models import Alumno, Inscriptos, Tecnicatura, Turnos, Examen, Acceso, EmailOutbox
+from src.records import AccessRecord
+from tests.support import SQLiteConnection
+
+
+def make_manager():
+    manager = ExamManager.__new__(ExamManager)
+    manager.db = SQLiteConnection()
+    return manager
+
+
+def seed(db, now):
+    session = db.get_connection()
+    session.add_all([
+        Alumno(id=1, dni=30111222, apenom='Perez, Ana'),
+        Tecnicatura(id=1, tectun='Informatica'),
+        Inscriptos(id=1, iddni=1, idtectun=1, regular='COMPLETO', email='ana@example.com'),
+        Examen(id=1, exalink='https://github.com/alfa/examen'),
+        Turnos(
+            id=1, idtec=1, idexa=1, regular='COMPLETO', tiempo=90,
+            f_desde=now - datetime.timedelta(days=30),
+            f_hasta=now - datetime.timedelta(days=29),
+        ),
+        Turnos(
+            id=2, idtec=1, idexa=1, regular='COMPLETO', tiempo=120,
+            f_desde=now - datetime.timedelta(hours=1),
+            f_hasta=now + datetime.timedelta(hours=1),
+        ),
+    ])
+    session.commit()
+    session.close()
+
+
+class CheckExamEligibilityTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.datetime.now()
+        self.manager = make_manager()
+        seed(self.manager.db, self.now)
+        roster_cache.clear()
+        turno_index.invalidate()
+
+    def test_eligible_student_resolved_in_one_statement(self):
+        turno_index.ensure_fresh(self.manager.db)
+        self.manager.db.statements.clear()
+        result = self.manager.check_exam_eligibility(30111222)
+
+        self.assertTrue(result['eligible'])
+        self.assertEqual(len(self.manager.db.statements), 1)
+        record = result['student_data']
+        self.assertEqual(record.apenom, 'Perez, Ana')
+        self.assertEqual(record.tectun, 'Informatica')
+        self.assertEqual(record.inscripcion_id, 1)
+        self.assertEqual(record.turno.turno_id, 2)
+        self.assertEqual(result['exam_time_limit'], 120)
+
+    def test_unknown_dni(self):
+        result = self.manager.check_exam_eligibility(99999999)
+        self.assertFalse(result['eligible'])
+        # Los DNIs desconocidos no ocupan lugar en el roster cacheado
+        self.assertIsNone(roster_cache.get(99999999))
+        self.assertEqual(len(roster_cache), 0)
+
+    def test_existing_access_blocks_exam(self):
+        session = self.manager.db.get_connection()
+        session.add(Acceso(idins=1, acceso=self.now))
+        session.commit()
+        session.close()
+
+        result = self.manager.check_exam_eligibility(30111222)
+        self.assertFalse(result['eligible'])
+        self.assertEqual(result['message'], 'Ya ha ocupado su cupón de EXAMEN')
+
+    def test_cached_roster_still_checks_access_in_db(self):
+        self.assertTrue(self.manager.check_exam_eligibility(30111222)['eligible'])
+
+        session = self.manager.db.get_connection()
+        session.add(Acceso(idins=1, acceso=self.now))
+        session.commit()
+        session.close()
+
+        self.manager.db.statements.clear()
+        result = self.manager.check_exam_eligibility(30111222)
+        self.assertFalse(result['eligible'])
+        self.assertEqual(len(self.manager.db.statements), 1)
+        self.assertIn('acceso', self.manager.db.statements[0])
+
+
+class CheckExamStatusTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.datetime.now().replace(microsecond=0)
+        self.manager = make_manager()
+        seed(self.manager.db, self.now)
+        turno_index.invalidate()
+        status_confirmations.clear()
+        session = self.manager.db.get_connection()
+        self.access = Acceso(id=5, idins=1, acceso=self.now - datetime.timedelta(minutes=10))
+        session.add(self.access)
+        session.commit()
+        session.refresh(self.access)
+        session.expunge(self.access)
+        session.close()
+
+    def test_token_answers_without_db_after_confirmation(self):
+        token = self.manager.issue_exam_token(self.access)
+        first = self.manager.check_exam_status(5, token=token)
+        self.assertTrue(first['can_continue'])
+
+        self.manager.db.statements.clear()
+        second = self.manager.check_exam_status(5, token=token)
+        self.assertTrue(second['can_continue'])
+        self.assertEqual(second['deadline'], first['deadline'])
+        self.assertEqual(self.manager.db.statements, [])
+
+    def test_confirm_reads_submission_from_db(self):
+        token = self.manager.issue_exam_token(self.access)
+        self.manager.check_exam_status(5, token=token)
+
+        session = self.manager.db.get_connection()
+        session.query(Acceso).filter_by(id=5).update({'hora': self.now})
+        session.commit()
+        session.close()
+
+        status = self.manager.check_exam_status(5, token=token, confirm=True)
+        self.assertFalse(status['can_continue'])
+        self.assertEqual(status['message'], 'El examen ya ha sido enviado')
+
+    def test_submission_ends_token_only_polls(self):
+        access = self.manager.start_exam(1)
+        token = self.manager.issue_exam_token(access)
+        self.assertTrue(self.manager.check_exam_status(access.id, token=token)['can_continue'])
+
+        self.assertTrue(self.manager.submit_exam(access.id, 'https://github.com/ana/final'))
+        status = self.manager.check_exam_status(access.id, token=token)
+        self.assertEqual(status, {'can_continue': False, 'message': 'El examen ya ha sido enviado'})
+
+    def test_without_token_uses_db(self):
+        status = self.manager.check_exam_status(5)
+        self.assertTrue(status['can_continue'])
+        self.assertEqual(
+            status['deadline'],
+            int((self.access.acceso + datetime.timedelta(minutes=120)).timestamp())
+        )
+
+
+class ExtendExamTest(unittest.TestCase):
+    setUp = CheckExamStatusTest.setUp
+
+    def test_extension_moves_the_deadline(self):
+        token = self.manager.issue_exam_token(self.access)
+        self.manager.check_exam_status(5, token=token)
+
+        deadline = self.manager.extend_exam(5, 30)
+        self.assertEqual(deadline, self.access.acceso + datetime.timedelta(minutes=150))
+
+        # La confirmación en memoria se descarta: la próxima consulta va a la base
+        status = self.manager.check_exam_status(5, token=token)
+        self.assertEqual(status['deadline'], int(deadline.timestamp()))
+
+    def test_submitted_exam_cannot_be_extended(self):
+        session = self.manager.db.get_connection()
+        session.query(Acceso).filter_by(id=5).update({'hora': self.now})
+        session.commit()
+        session.close()
+
+        self.assertIsNone(self.manager.extend_exam(5, 30))
+        self.assertIsNone(self.manager.extend_exam(99, 30))
+
+
+class StartExamTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        seed(self.manager.db, datetime.datetime.now())
+
+    def test_repeated_calls_converge_on_one_row(self):
+        first = self.manager.start_exam(1)
+        second = self.manager.start_exam('1')
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(first.acceso, second.acceso)
+        session = self.manager.db.get_connection()
+        self.assertEqual(session.query(Acceso).filter_by(idins=1).count(), 1)
+        session.close()
+
+    def test_returns_a_record_not_an_entity(self):
+        access = self.manager.start_exam(1)
+        self.assertIsInstance(access, AccessRecord)
+        self.assertEqual((access.idins, access.extra_minutes), (1, 0))
+
+
+class SubmitExamTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.datetime.now()
+        self.manager = make_manager()
+        seed(self.manager.db, self.now)
+        session = self.manager.db.get_connection()
+        session.add(Acceso(id=5, idins=1, acceso=self.now))
+        session.commit()
+        session.close()
+
+    def test_confirmation_email_is_queued_with_the_submission(self):
+        link = 'https://github.com/ana/final'
+        self.assertTrue(self.manager.submit_exam(5, link))
+
+        session = self.manager.db.get_connection()
+        access = session.get(Acceso, 5)
+        queued = session.query(EmailOutbox).all()
+        session.close()
+
+        self.assertEqual(access.link, link)
+        self.assertIsNotNone(access.hora)
+        self.assertEqual(len(queued), 1)
+        self.assertEqual(queued[0].to_email, 'ana@example.com')
+        self.assertEqual(queued[0].status, 'pending')
+        self.assertIn(link, queued[0].html_content)
+
+    def test_unknown_access_is_not_submitted(self):
+        self.assertFalse(self.manager.submit_exam(999, 'https://github.com/x'))
+
+    def test_non_numeric_access_is_not_submitted(self):
+        self.assertFalse(self.manager.submit_exam('abc', 'https://github.com/x'))
+
+
+if __name__ == '__main__':
+    unittest.main()
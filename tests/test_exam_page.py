@@ -0,0 +1,85 @@
+import datetime
+import unittest
+from unittest import mock
+
+from src.app_factory import create_app
+from src.cache import exam_page_cache, invalidate_roster_cache
+from src.exam_page import not_modified, rendered_page
+from src.models import Examen, Turnos
+from src.turno_index import turno_index
+from tests.test_exam_manager import make_manager, seed
+
+
+class NotModifiedTest(unittest.TestCase):
+    def test_if_none_match(self):
+        self.assertTrue(not_modified('"a", W/"b"', '"b"'))
+        self.assertTrue(not_modified('*', '"b"'))
+        self.assertFalse(not_modified('"a"', '"b"'))
+        self.assertFalse(not_modified(None, '"b"'))
+
+
+class ExamPageTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = make_manager()
+        seed(self.manager.db, datetime.datetime.now().replace(microsecond=0))
+        turno_index.invalidate()
+        exam_page_cache.clear()
+        patcher = mock.patch('src.routes._exam_manager', return_value=self.manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = create_app().test_client()
+
+    def test_revalidation_skips_db_and_template(self):
+        first = self.client.get('/exam?exam_id=1')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('https://github.com/alfa/examen', first.get_data(as_text=True))
+        etag = first.headers['ETag']
+        self.assertIn('must-revalidate', first.headers['Cache-Control'])
+
+        self.manager.db.statements.clear()
+        with mock.patch('src.routes.render_template') as render:
+            again = self.client.get('/exam?exam_id=1', headers={'If-None-Match': etag})
+            cached = self.client.get('/exam?exam_id=1')
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.headers['ETag'], etag)
+        self.assertEqual(cached.headers['ETag'], etag)
+        render.assert_not_called()
+        self.assertEqual(self.manager.db.statements, [])
+
+    def test_exam_id_defaults_to_the_open_turno(self):
+        page = self.client.get('/exam')
+        self.assertIn('https://github.com/alfa/examen', page.get_data(as_text=True))
+        self.assertEqual(page.headers['ETag'], self.client.get('/exam?exam_id=1').headers['ETag'])
+
+    def test_unknown_exam_is_not_found(self):
+        self.assertEqual(self.client.get('/exam?exam_id=99').status_code, 404)
+        self.assertEqual(len(exam_page_cache), 0)
+
+    def test_exam_without_an_open_turno_is_not_found(self):
+        # Turno de mañana, con la página ya calentada por el pre-warm
+        now = datetime.datetime.now()
+        session = self.manager.db.get_connection()
+        session.add_all([
+            Examen(id=2, exalink='https://github.com/beta/examen'),
+            Turnos(id=3, idtec=1, idexa=2, regular='COMPLETO', tiempo=60,
+                   f_desde=now + datetime.timedelta(days=1),
+                   f_hasta=now + datetime.timedelta(days=1, hours=2)),
+        ])
+        session.commit()
+        session.close()
+        turno_index.invalidate()
+        exam_page_cache.set(2, rendered_page('<p>https://github.com/beta/examen</p>'))
+
+        page = self.client.get('/exam?exam_id=2')
+        self.assertEqual(page.status_code, 404)
+        self.assertNotIn('beta/examen', page.get_data(as_text=True))
+
+    def test_reload_clears_rendered_pages(self):
+        self.client.get('/exam?exam_id=1')
+        with mock.patch('src.cache.roster_cache.stamp'):
+            invalidate_roster_cache()
+        self.assertEqual(len(exam_page_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
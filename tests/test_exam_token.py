@@ -0,0 +1,39 @@
+import datetime
+import unittest
+
+from src.exam_token import InvalidTokenError, issue_token, read_token
+
+
+class ExamTokenTest(unittest.TestCase):
+    def setUp(self):
+        self.start = datetime.datetime(2024, 12, 10, 9, 0, 0)
+        self.deadline = self.start + datetime.timedelta(minutes=120)
+
+    def test_round_trip(self):
+        token = issue_token(7, self.start, self.deadline, secret='s3cret')
+        claims = read_token(token, secret='s3cret')
+        self.assertEqual(claims.access_id, 7)
+        self.assertEqual(claims.started_at, self.start)
+        self.assertEqual(claims.deadline, self.deadline)
+        self.assertTrue(claims.expired(self.deadline + datetime.timedelta(seconds=1)))
+        self.assertFalse(claims.expired(self.start))
+
+    def test_wrong_secret_is_rejected(self):
+        token = issue_token(7, self.start, self.deadline, secret='s3cret')
+        with self.assertRaises(InvalidTokenError):
+            read_token(token, secret='other')
+
+    def test_tampered_payload_is_rejected(self):
+        token = issue_token(7, self.start, self.deadline, secret='s3cret')
+        forged = issue_token(8, self.start, self.deadline, secret='other')
+        with self.assertRaises(InvalidTokenError):
+            read_token(forged.split('.')[0] + '.' + token.split('.')[1], secret='s3cret')
+
+    def test_garbage_is_rejected(self):
+        for token in ('', 'abc', 'abc.def', None):
+            with self.assertRaises(InvalidTokenError):
+                read_token(token, secret='s3cret')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import csv
+import datetime
+import io
+import json
+import unittest
+from unittest import mock
+
+from sqlalchemy import event, text
+
+from src.app_factory import create_app
+from src.config import Config
+from src.export import ExportFilters, stream_submissions
+from src.models import Acceso, Inscriptos
+from tests.support import TEST_DATABASE_URL, PostgresConnection, SQLiteConnection, postgres_engine
+from tests.test_exam_manager import seed
+
+
+class StreamSubmissionsTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.datetime.now().replace(microsecond=0)
+        self.db = SQLiteConnection()
+        seed(self.db, self.now)
+        session = self.db.get_connection()
+        session.add_all([
+            # Turno 1 (hace un mes) y turno 2 (abierto ahora)
+            Acceso(id=1, idins=1, acceso=self.now - datetime.timedelta(days=30),
+                   hora=self.now - datetime.timedelta(days=30), link='https://github.com/a/uno'),
+            Inscriptos(id=2, iddni=1, idtectun=1, regular='COMPLETO'),
+            Acceso(id=2, idins=2, acceso=self.now - datetime.timedelta(minutes=30)),
+        ])
+        session.commit()
+        session.close()
+
+    def export(self, fmt, chunk_size=10, **filters):
+        return list(stream_submissions(self.db, ExportFilters.parse(**filters), fmt, chunk_size))
+
+    def test_csv_in_chunks(self):
+        chunks = self.export('csv', chunk_size=1)
+        self.assertEqual(len(chunks), 2)
+        rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+        self.assertEqual([row['access_id'] for row in rows], ['1', '2'])
+        self.assertEqual(rows[0]['link'], 'https://github.com/a/uno')
+        self.assertEqual(rows[1]['submitted_at'], '')
+        self.assertEqual(rows[0]['apenom'], 'Perez, Ana')
+
+    def test_turno_filter_as_jsonl(self):
+        lines = ''.join(self.export('jsonl', turno='2')).splitlines()
+        self.assertEqual(len(lines), 1)
+        row = json.loads(lines[0])
+        self.assertEqual(row['access_id'], 2)
+        self.assertIsNone(row['submitted_at'])
+        self.assertEqual(row['tectun'], 'Informatica')
+
+    def test_date_range_and_empty_result(self):
+        today = self.now.strftime('%Y-%m-%d')
+        self.assertEqual(len(''.join(self.export('jsonl', since=today, until=today)).splitlines()), 1)
+        self.assertEqual(self.export('csv', turno='99'), [
+            'access_id,dni,apenom,email,tectun,started_at,submitted_at,link,extra_minutes\r\n'
+        ])
+        with self.assertRaises(ValueError):
+            ExportFilters.parse(since='ayer')
+
+    def test_admin_endpoint(self):
+        client = create_app().test_client()
+        with mock.patch.object(Config, 'ADMIN_API_TOKEN', 'secreto'), \
+                mock.patch('src.database.DatabaseConnection', return_value=self.db):
+            self.assertEqual(client.get('/admin/submissions').status_code, 401)
+            headers = {'Authorization': 'Bearer secreto'}
+            self.assertEqual(
+                client.get('/admin/submissions?format=xml', headers=headers).status_code, 400
+            )
+            response = client.get('/admin/submissions?format=jsonl&turno=1', headers=headers)
+            self.assertTrue(response.is_streamed)
+            self.assertEqual(response.mimetype, 'application/x-ndjson')
+            self.assertIn('entregas-turno1.jsonl', response.headers['Content-Disposition'])
+            self.assertEqual(json.loads(response.get_data(as_text=True))['access_id'], 1)
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL no configurada')
+class PostgresStreamTest(unittest.TestCase):
+    def test_uses_a_server_side_cursor(self):
+        engine = postgres_engine()
+        now = datetime.datetime.now()
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO alumno (id, dni, apenom) "
+                "SELECT g, 30000000 + g, 'Alumno ' || g FROM generate_series(1, 2500) g"
+            ))
+            connection.execute(text(
+                "INSERT INTO inscriptos (id, iddni, idtectun, regular) "
+                "SELECT g, g, 1, 'COMPLETO' FROM generate_series(1, 2500) g"
+            ))
+            connection.execute(text(
+                "INSERT INTO acceso (idins, acceso) SELECT g, :now FROM generate_series(1, 2500) g"
+            ), {'now': now})
+
+        cursors = []
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, *args: cursors.append(getattr(cursor, 'name', None)))
+        try:
+            chunks = list(stream_submissions(
+                PostgresConnection(engine), ExportFilters.parse(), 'csv', chunk_size=500
+            ))
+        finally:
+            engine.dispose()
+
+        self.assertEqual(len(chunks), 5)
+        self.assertEqual(sum(chunk.count('\n') for chunk in chunks), 2501)
+        self.assertTrue(cursors[-1], 'la consulta no usó un cursor con nombre')
+
+
+if __name__ == '__main__':
+    unittest.main()
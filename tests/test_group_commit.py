@@ -0,0 +1,114 @@
+import datetime
+import threading
+import unittest
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects import postgresql
+
+from src import group_commit
+from src.cache import status_confirmations
+from src.exam_events import parse_notification
+from src.exam_manager import ExamManager
+from src.group_commit import SubmissionWriter, _Pending, _batch_statement
+from tests.support import TEST_DATABASE_URL, PostgresConnection, postgres_engine
+
+
+class BatchStatementTest(unittest.TestCase):
+    def test_one_statement_with_the_last_link_per_access(self):
+        batch = [_Pending(1, 'https://a/uno', None), _Pending(2, 'https://b', None),
+                 _Pending(1, 'https://a/dos', None)]
+        statement = _batch_statement(batch, datetime.datetime(2024, 12, 1, 10, 0))
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        self.assertIn('UPDATE acceso SET', sql)
+        self.assertIn('FROM (VALUES', sql)
+        self.assertIn('INSERT INTO email_outbox', sql)
+        self.assertIn('pg_notify', sql)
+        params = list(compiled.params.values())
+        self.assertIn('https://a/dos', params)
+        self.assertNotIn('https://a/uno', params)
+
+
+class AcknowledgeTest(unittest.TestCase):
+    def test_submitted_accesses_lose_their_status_confirmation(self):
+        self.addCleanup(status_confirmations.clear)
+        status_confirmations.set(1, True)
+        status_confirmations.set(2, True)
+        batch = [_Pending(1, 'https://a', None), _Pending(2, 'https://b', None)]
+        group_commit._acknowledge(batch, submitted={1})
+        self.assertEqual([p.ok for p in batch], [True, False])
+        self.assertIsNone(status_confirmations.get(1))
+        self.assertTrue(status_confirmations.get(2))
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL no configurada')
+class SubmissionWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = postgres_engine()
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO inscriptos (id, iddni, idtectun, regular, email) "
+                "SELECT g, g, 1, 'COMPLETO', CASE WHEN g > 1 THEN 'a' || g || '@example.com' END "
+                "FROM generate_series(1, 20) g"
+            ))
+            connection.execute(text(
+                "INSERT INTO acceso (id, idins, acceso) SELECT g, g, now() FROM generate_series(1, 20) g"
+            ))
+        self.addCleanup(self.engine.dispose)
+        self.db = PostgresConnection(self.engine)
+        self.commits = []
+        event.listen(self.engine, 'commit', lambda conn: self.commits.append(1))
+
+    def test_concurrent_submissions_share_commits(self):
+        writer = SubmissionWriter(self.db, window_ms=50, max_batch=100)
+        results = {}
+
+        def submit(access_id):
+            results[access_id] = writer.submit(access_id, f'https://github.com/a/{access_id}')
+
+        threads = [threading.Thread(target=submit, args=(i,)) for i in list(range(1, 21)) + [999]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(results[i] for i in range(1, 21)))
+        self.assertFalse(results[999])
+        self.assertLess(len(self.commits), 21)
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text(
+                "SELECT count(*) FROM acceso WHERE hora IS NOT NULL AND link LIKE 'https://github.com/a/%'"
+            )).scalar(), 20)
+            # La inscripción 1 no tiene email
+            self.assertEqual(connection.execute(text(
+                "SELECT count(*) FROM email_outbox WHERE status = 'pending'"
+            )).scalar(), 19)
+
+    def test_notifies_each_submission(self):
+        writer = SubmissionWriter(self.db, window_ms=0)
+        batch = [_Pending(3, 'https://x', threading.Event())]
+        with self.engine.connect() as connection:
+            connection.execute(text("LISTEN exam_events"))
+            connection.commit()
+            writer.write(batch)
+            connection.execute(text("SELECT 1"))
+            notifies = connection.connection.dbapi_connection.notifies
+            events = [parse_notification(n.payload) for n in notifies]
+        self.assertTrue(batch[0].ok)
+        self.assertEqual([(e.access_id, e.name) for e in events], [(3, 'submitted')])
+
+    def test_non_numeric_access_is_rejected_before_the_writer(self):
+        manager = ExamManager.__new__(ExamManager)
+        manager.db = self.db
+        self.assertFalse(manager.submit_exam('abc', 'https://github.com/x'))
+        self.assertEqual(self.commits, [])
+
+    def test_writer_follows_the_engine(self):
+        writer = group_commit.get_submission_writer(self.db)
+        self.assertIs(group_commit.get_submission_writer(self.db), writer)
+        other = PostgresConnection(create_engine(TEST_DATABASE_URL))
+        self.assertIsNot(group_commit.get_submission_writer(other), writer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import logging
+import queue
+import sys
+import unittest
+
+from src import logging_config
+from src.logging_config import (
+    JsonFormatter,
+    RouteSampler,
+    bind_route,
+    parse_sample_rates,
+    setup_logging,
+    unbind_route,
+)
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord('examenes_finales', level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class JsonFormatterTest(unittest.TestCase):
+    def test_lazy_args_and_extra_fields(self):
+        record = make_record("Acceso %s registrado", 42, route='start_exam', access_id=42)
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual(entry['msg'], 'Acceso 42 registrado')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['route'], 'start_exam')
+        self.assertEqual(entry['access_id'], 42)
+
+    def test_exception_is_included(self):
+        try:
+            raise ValueError('boom')
+        except ValueError:
+            record = make_record("falló", level=logging.ERROR)
+            record.exc_info = sys.exc_info()
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertIn('ValueError: boom', entry['exc'])
+
+
+class RouteSamplerTest(unittest.TestCase):
+    def test_parse_sample_rates(self):
+        self.assertEqual(parse_sample_rates('check_exam_status=0.05, index=2'),
+                         {'check_exam_status': 0.05, 'index': 1.0})
+        self.assertEqual(parse_sample_rates(''), {})
+
+    def test_keeps_one_in_n_info_records_of_sampled_route(self):
+        sampler = RouteSampler({'check_exam_status': 0.25})
+        token = bind_route('check_exam_status')
+        try:
+            kept = [sampler.filter(make_record('poll')) for _ in range(8)]
+            warnings = [sampler.filter(make_record('x', level=logging.WARNING)) for _ in range(3)]
+        finally:
+            unbind_route(token)
+        self.assertEqual(kept.count(True), 2)
+        self.assertEqual(warnings, [True, True, True])
+
+    def test_other_routes_are_not_sampled(self):
+        sampler = RouteSampler({'check_exam_status': 0.0})
+        token = bind_route('submit_exam')
+        try:
+            record = make_record('ok')
+            self.assertTrue(sampler.filter(record))
+            self.assertEqual(record.route, 'submit_exam')
+        finally:
+            unbind_route(token)
+
+
+class SetupLoggingTest(unittest.TestCase):
+    def test_setup_is_idempotent(self):
+        logger = setup_logging()
+        setup_logging()
+        setup_logging()
+        queue_handlers = [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]
+        self.assertEqual(len(queue_handlers), 1)
+        self.assertFalse(logger.propagate)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = logging_config._NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        before = handler.dropped
+        handler.handle(make_record('uno'))
+        handler.handle(make_record('dos'))
+        self.assertEqual(handler.dropped - before, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
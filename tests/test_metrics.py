@@ -0,0 +1,77 @@
+import unittest
+
+from flask import Flask
+
+from src import metrics
+from src.metrics import Counter, Histogram, query_fingerprint
+from tests.support import SQLiteConnection
+
+
+class RenderTest(unittest.TestCase):
+    def test_counter_with_labels(self):
+        counter = Counter('hits_total', 'Hits', labels=('endpoint',))
+        counter.inc(endpoint='a')
+        counter.inc(2, endpoint='a')
+        self.assertIn('hits_total{endpoint="a"} 3', counter.render())
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram('lat', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+        lines = histogram.render()
+        self.assertIn('lat_bucket{le="0.1"} 1', lines)
+        self.assertIn('lat_bucket{le="1.0"} 2', lines)
+        self.assertIn('lat_bucket{le="+Inf"} 3', lines)
+        self.assertIn('lat_count 3', lines)
+
+    def test_query_fingerprint(self):
+        self.assertEqual(query_fingerprint('SELECT a.id FROM alumno JOIN x'), 'select alumno')
+        self.assertEqual(query_fingerprint('INSERT INTO acceso (idins) VALUES (1)'), 'insert acceso')
+        self.assertEqual(query_fingerprint('UPDATE acceso SET hora = 1'), 'update acceso')
+
+
+class MiddlewareTest(unittest.TestCase):
+    def test_request_latency_and_sql_counts(self):
+        db = SQLiteConnection()
+        metrics.instrument_engine(db.engine)
+        app = Flask(__name__)
+        metrics.init_app(app)
+
+        @app.route('/ping')
+        def ping():
+            session = db.get_connection()
+            session.execute(metrics_sql)
+            session.execute(metrics_sql)
+            session.close()
+            return 'ok'
+
+        client = app.test_client()
+        self.assertEqual(client.get('/ping').status_code, 200)
+        body = client.get('/metrics').get_data(as_text=True)
+
+        self.assertIn('http_requests_total{endpoint="ping",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_sql_statements_bucket{endpoint="ping",le="2"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{endpoint="ping",method="GET"} 1', body)
+        self.assertIn('http_requests_in_flight{endpoint="ping"} 0', body)
+
+
+class FailedStatementTest(unittest.TestCase):
+    def test_failed_statements_do_not_leave_start_times(self):
+        db = SQLiteConnection()
+        metrics.instrument_engine(db.engine)
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                with self.assertRaises(OperationalError):
+                    connection.execute(text('SELECT * FROM no_existe'))
+                connection.rollback()
+            connection.execute(metrics_sql)
+            self.assertEqual(connection.info['query_start'], [])
+
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+metrics_sql = text('SELECT 1')
+
+
+if __name__ == '__main__':
+    unittest.main()
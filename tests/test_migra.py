@@ -0,0 +1,128 @@
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from tests.support import TEST_DATABASE_URL, postgres_engine
+
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
+
+
+def load_migra():
+    # test/ no es un paquete: se carga el script por ruta
+    spec = importlib.util.spec_from_file_location(
+        'migra', os.path.join(PROJECT_ROOT, 'test', 'migra.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_csv(directory, name, lines):
+    path = os.path.join(directory, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL no configurada')
+class CargaMasivaTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = postgres_engine()
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connection:
+            # Ya cargado: no se vuelve a insertar, pero sí se resuelve su ID
+            connection.execute(text("INSERT INTO alumno (dni, apenom) VALUES (30000001, 'Previo, Ana')"))
+
+        url = make_url(TEST_DATABASE_URL)
+        self.loader = load_migra().DatabaseLoader(
+            host=url.host or url.query.get('host'), port=url.port or 5432,
+            user=url.username or 'postgres', password=url.password or '',
+            database=url.database,
+        )
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.loader.connect()
+        self.addCleanup(self.loader.close_connection)
+
+        directory = tempfile.mkdtemp()
+        self.alumnos = write_csv(directory, 'alumnos.csv', [
+            'dni;apenom',
+            '30000001;Previo, Ana',
+            '30000002;Gomez, Luis',
+            '30000003;Diaz, Eva',
+            '30000003;Diaz, Eva',
+            'abc;Sin DNI',
+            '30000004',
+        ])
+        self.tecnicaturas = write_csv(directory, 'tecnicaturas.csv', [
+            'tectun', 'Informatica', 'Redes', 'Informatica',
+        ])
+        self.inscriptos = write_csv(directory, 'inscriptos.csv', [
+            'dni;tecnicatura;regular;email',
+            '30000001;Informatica;COMPLETO;ana@example.com',
+            '30000002;Redes;INCOMPLETO;',
+            '30000003;Informatica;COMPLETO;eva@example.com',
+            '39999999;Informatica;COMPLETO;x@example.com',
+            '30000002;Quimica;COMPLETO;x@example.com',
+            '30000003;Redes;AUSENTE;eva@example.com',
+        ])
+
+    def carga(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            # lote=2: varios INSERT ... RETURNING y varios COPY
+            return self.loader.carga_masiva(self.alumnos, self.tecnicaturas, self.inscriptos, lote=2)
+
+    def test_counts_and_rejected_rows(self):
+        resultado = self.carga()
+
+        self.assertEqual(resultado['cargados'], {'alumno': 2, 'tecnicatura': 2, 'inscriptos': 3})
+        rechazados = [(os.path.basename(archivo), linea) for archivo, linea, _ in resultado['rechazados']]
+        self.assertEqual(sorted(rechazados), [
+            ('alumnos.csv', 6), ('alumnos.csv', 7),
+            ('inscriptos.csv', 5), ('inscriptos.csv', 6), ('inscriptos.csv', 7),
+        ])
+        motivos = {linea: motivo for archivo, linea, motivo in resultado['rechazados']
+                   if archivo == self.inscriptos}
+        self.assertIn('Regularidad inválida', motivos[7])
+
+    def test_ids_are_resolved_through_the_maps(self):
+        self.carga()
+        with self.engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT a.dni, t.tectun, i.regular, i.email FROM inscriptos i "
+                "JOIN alumno a ON a.id = i.iddni JOIN tecnicatura t ON t.id = i.idtectun "
+                "ORDER BY a.dni"
+            )).all()
+            alumnos = connection.execute(text("SELECT count(*) FROM alumno")).scalar()
+        self.assertEqual([tuple(row) for row in rows], [
+            (30000001, 'Informatica', 'COMPLETO', 'ana@example.com'),
+            (30000002, 'Redes', 'INCOMPLETO', None),
+            (30000003, 'Informatica', 'COMPLETO', 'eva@example.com'),
+        ])
+        self.assertEqual(alumnos, 3)
+
+    def test_failure_leaves_nothing_loaded(self):
+        # Una restricción violada en el COPY revierte también alumnos y tecnicaturas
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                "ALTER TABLE inscriptos ADD CONSTRAINT test_sin_email CHECK (email IS NULL)"
+            ))
+        self.addCleanup(self._drop_constraint)
+
+        with self.assertRaises(Exception):
+            self.carga()
+        with self.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT count(*) FROM alumno")).scalar(), 1)
+            self.assertEqual(connection.execute(text("SELECT count(*) FROM tecnicatura")).scalar(), 0)
+
+    def _drop_constraint(self):
+        with self.engine.begin() as connection:
+            connection.execute(text("ALTER TABLE inscriptos DROP CONSTRAINT IF EXISTS test_sin_email"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from sqlalchemy.dialects import postgresql
+
+from src.migrations import (
+    MIGRATIONS, check_hot_paths, hot_path_queries, migrate_down, migrate_up, seq_scans,
+)
+from tests.support import TEST_DATABASE_URL, postgres_engine
+
+
+class SeqScansTest(unittest.TestCase):
+    def test_nested_seq_scans_are_found(self):
+        plan = {
+            'Node Type': 'Nested Loop',
+            'Plans': [
+                {'Node Type': 'Index Scan', 'Relation Name': 'alumno'},
+                {'Node Type': 'Hash', 'Plans': [
+                    {'Node Type': 'Seq Scan', 'Relation Name': 'inscriptos'},
+                ]},
+            ],
+        }
+        self.assertEqual(seq_scans(plan), ['inscriptos'])
+
+    def test_versions_are_unique_and_ordered(self):
+        versions = [m.version for m in MIGRATIONS]
+        self.assertEqual(versions, sorted(set(versions)))
+
+    def test_hot_paths_are_the_statements_the_app_runs(self):
+        queries = dict(hot_path_queries())
+        for name in ('start_exam', 'submit_exam.acceso', 'submit_exam.inscriptos',
+                     'submit_exam.batch'):
+            self.assertIn(name, queries)
+        sql = {name: str(statement.compile(dialect=postgresql.dialect(),
+                                           compile_kwargs={'literal_binds': True}))
+               for name, statement in queries.items()}
+        self.assertIn('ON CONFLICT (idins)', sql['start_exam'])
+        self.assertTrue(sql['submit_exam.acceso'].startswith('UPDATE acceso'))
+        self.assertIn('FROM (VALUES', sql['submit_exam.batch'])
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL no configurada')
+class PostgresMigrationsTest(unittest.TestCase):
+    """Runs against a disposable Postgres database with the app tables"""
+
+    def setUp(self):
+        self.engine = postgres_engine()
+
+    def tearDown(self):
+        migrate_up(self.engine)
+        self.engine.dispose()
+
+    def test_hot_paths_use_indexes_after_migrating(self):
+        migrate_up(self.engine)
+        self.assertEqual(check_hot_paths(self.engine), [])
+
+    def test_down_reintroduces_seq_scans(self):
+        migrate_up(self.engine)
+        migrate_down(self.engine, 0)
+        # Las consultas necesitan la columna, no los índices
+        migrate_up(self.engine, migrations=[m for m in MIGRATIONS if m.name == 'acceso_extra_minutes'])
+        self.assertNotEqual(check_hot_paths(self.engine), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
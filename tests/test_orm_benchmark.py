@@ -0,0 +1,27 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.orm_vs_core import run, seed, seed_accesses
+
+
+class OrmVsCoreBenchmarkTest(unittest.TestCase):
+    def test_small_run_reports_both_paths(self):
+        engine = create_engine('sqlite://', poolclass=StaticPool)
+        self.addCleanup(engine.dispose)
+        seed(engine, 5)
+        seed_accesses(engine, 5)
+
+        # run() también verifica que ORM y Core devuelvan los mismos datos
+        report = run(engine, students=5, lookups=60)
+
+        self.assertEqual(set(report), {'roster', 'access'})
+        for case in report.values():
+            for path in ('orm', 'core'):
+                self.assertGreater(case[path]['us_per_lookup'], 0)
+                self.assertGreater(case[path]['peak_kib'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import datetime
+import os
+import threading
+import unittest
+
+from src.app_factory import create_app
+from src.cache import exam_page_cache, roster_cache
+from src.models import Alumno, Examen, Inscriptos, Tecnicatura, Turnos
+from src import prewarm
+from src.prewarm import Prewarmer, flask_page_renderer, start_prewarm_thread
+from src.turno_index import turno_index
+from tests.support import SQLiteConnection
+from tests.test_exam_manager import make_manager, seed
+
+
+class PrewarmerTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.datetime.now().replace(microsecond=0)
+        self.db = SQLiteConnection()
+        seed(self.db, self.now)
+        session = self.db.get_connection()
+        session.add_all([
+            # Turno 3 abre en 3 minutos para (2, LIBRE); el 4, mañana
+            Alumno(id=2, dni=30222333, apenom='Gomez, Luis'),
+            Tecnicatura(id=2, tectun='Redes'),
+            Inscriptos(id=2, iddni=2, idtectun=2, regular='LIBRE', email='luis@example.com'),
+            Inscriptos(id=3, iddni=2, idtectun=1, regular='COMPLETO'),
+            Examen(id=2, exalink='https://github.com/beta/examen'),
+            Turnos(id=3, idtec=2, idexa=2, regular='LIBRE', tiempo=60,
+                   f_desde=self.now + datetime.timedelta(minutes=3),
+                   f_hasta=self.now + datetime.timedelta(hours=2)),
+            Turnos(id=4, idtec=2, idexa=2, regular='LIBRE', tiempo=60,
+                   f_desde=self.now + datetime.timedelta(days=1),
+                   f_hasta=self.now + datetime.timedelta(days=1, hours=2)),
+        ])
+        session.commit()
+        session.close()
+        turno_index.invalidate()
+        roster_cache.clear()
+        exam_page_cache.clear()
+        self.pools = []
+        self.prewarmer = Prewarmer(
+            self.db, render_page=lambda instructions: f'<p>{instructions}</p>',
+            pool_warmer=lambda n: self.pools.append(n) or n,
+            lead_minutes=5, poll_seconds=60, pool_connections=3,
+        )
+
+    def test_warms_the_turnos_about_to_open(self):
+        report = self.prewarmer.run_once(self.now)
+        # El turno 2 ya está abierto: también se calienta
+        self.assertEqual(report.turnos, (2, 3))
+        self.assertEqual((report.students, report.exam_pages, report.connections), (2, 2, 3))
+        self.assertEqual(self.pools, [3])
+
+        entries = roster_cache.get(30222333)
+        self.assertEqual([e.inscripcion_id for e in entries], [2, 3])
+        self.assertEqual(entries[0].tectun, 'Redes')
+        self.assertIn('beta/examen', exam_page_cache.get(2).body)
+
+        # Ya calentados: la próxima pasada no hace nada
+        self.assertIsNone(self.prewarmer.run_once(self.now))
+
+    def test_waits_until_the_next_lead_time(self):
+        self.prewarmer.run_once(self.now)
+        self.assertEqual(self.prewarmer.seconds_until_next(self.now), 60)
+        later = self.now + datetime.timedelta(days=1, minutes=-6)
+        self.assertEqual(self.prewarmer.seconds_until_next(later), 60)
+        self.assertEqual(self.prewarmer.seconds_until_next(later + datetime.timedelta(seconds=30)), 30)
+
+    def test_validate_dni_served_from_the_warm_roster(self):
+        self.prewarmer.run_once(self.now)
+        manager = make_manager()
+        manager.db = self.db
+        self.db.statements.clear()
+        record = manager.validate_dni(30222333, now=self.now + datetime.timedelta(minutes=4))
+        self.assertEqual(record.turno.turno_id, 3)
+        # Sólo el chequeo de Acceso va a la base
+        self.assertEqual(len(self.db.statements), 1)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'sin os.fork')
+    def test_forked_child_runs_its_own_thread(self):
+        prewarmer = start_prewarm_thread(db=self.db, pool_warmer=lambda n: n)
+        self.addCleanup(prewarm._prewarmers.remove, prewarmer)
+        self.addCleanup(prewarmer.stop)
+
+        pid = os.fork()
+        if pid == 0:
+            alive = any(t.name == 'prewarm' for t in threading.enumerate())
+            os._exit(0 if alive else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+    def test_flask_renderer(self):
+        body = flask_page_renderer(create_app())('https://github.com/beta/examen')
+        self.assertIn('https://github.com/beta/examen', body)
+
+
+if __name__ == '__main__':
+    unittest.main()
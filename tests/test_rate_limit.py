@@ -0,0 +1,109 @@
+import importlib.util
+import unittest
+from unittest import mock
+
+from src import rate_limit
+from src.app_factory import create_app
+from src.config import Config
+from src.rate_limit import Limit, MemoryBackend, RateLimiter, RedisBackend, client_ip
+
+HAS_FAKEREDIS = importlib.util.find_spec('fakeredis') is not None
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class MemoryBackendTest(unittest.TestCase):
+    def test_burst_then_refill(self):
+        clock = FakeClock()
+        backend = MemoryBackend(clock=clock)
+        limit = Limit(capacity=3, per_seconds=60)
+
+        self.assertEqual([backend.take('k', limit) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(backend.take('k', limit), 20.0)
+
+        clock.now += 20
+        self.assertEqual(backend.take('k', limit), 0)
+        self.assertGreater(backend.take('k', limit), 0)
+
+    def test_key_count_is_bounded(self):
+        backend = MemoryBackend(max_keys=2)
+        for ip in ('a', 'b', 'c'):
+            backend.take(ip, Limit(1, 60))
+        self.assertEqual(len(backend), 2)
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_dni_bucket_is_shared_by_every_ip(self):
+        limiter = RateLimiter(MemoryBackend(), per_ip=Limit(100, 60), per_dni=Limit(2, 60))
+        self.assertTrue(limiter.check('10.0.0.1', '30111222').allowed)
+        self.assertTrue(limiter.check('10.0.0.2', '30111222').allowed)
+        decision = limiter.check('10.0.0.3', '30111222')
+        self.assertFalse(decision.allowed)
+        self.assertEqual((decision.scope, decision.retry_after_header()), ('dni', '30'))
+        self.assertTrue(limiter.check('10.0.0.3', '30111223').allowed)
+
+    def test_client_ip_behind_trusted_proxies(self):
+        self.assertEqual(client_ip('10.0.0.9', '1.2.3.4, 10.0.0.1', trusted_proxies=0), '10.0.0.9')
+        self.assertEqual(client_ip('10.0.0.9', '6.6.6.6, 1.2.3.4', trusted_proxies=1), '1.2.3.4')
+        self.assertEqual(client_ip('10.0.0.9', '1.2.3.4', trusted_proxies=2), '1.2.3.4')
+
+
+@unittest.skipUnless(HAS_FAKEREDIS, 'fakeredis no instalado')
+class RedisBackendTest(unittest.TestCase):
+    def test_bucket_is_shared_between_backends(self):
+        import fakeredis
+
+        server = fakeredis.FakeServer()
+        first = RedisBackend(fakeredis.FakeRedis(server=server))
+        second = RedisBackend(fakeredis.FakeRedis(server=server))
+        limit = Limit(capacity=2, per_seconds=60)
+
+        self.assertEqual(first.take('ip:a', limit), 0)
+        self.assertEqual(second.take('ip:a', limit), 0)
+        self.assertAlmostEqual(first.take('ip:a', limit), 30, delta=0.1)
+        self.assertGreater(first.client.pttl('ratelimit:ip:a'), 0)
+
+    def test_unreachable_redis_lets_requests_through(self):
+        client = mock.Mock()
+        client.register_script.return_value = mock.Mock(side_effect=ConnectionError('down'))
+        self.assertEqual(RedisBackend(client).take('ip:a', Limit(1, 60)), 0)
+
+
+class FlaskRateLimitTest(unittest.TestCase):
+    def setUp(self):
+        limiter = RateLimiter(MemoryBackend(), per_ip=Limit(3, 60), per_dni=Limit(1, 60))
+        self.manager = mock.Mock()
+        self.manager.check_exam_eligibility.return_value = {
+            'eligible': False, 'message': 'no habilitado'
+        }
+        for patcher in (mock.patch.object(rate_limit, '_limiter', limiter),
+                        mock.patch.object(Config, 'RATE_LIMIT_ENABLED', True),
+                        mock.patch('src.routes._exam_manager', return_value=self.manager)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = create_app().test_client()
+
+    def test_429_before_any_database_work(self):
+        self.assertEqual(self.client.post('/validate_dni', json={'dni': '30111222'}).status_code, 400)
+        response = self.client.post('/validate_dni', json={'dni': '30111222'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers['Retry-After'], '60')
+        self.assertEqual(self.manager.check_exam_eligibility.call_count, 1)
+
+        # Otro DNI desde la misma IP hasta agotar su bucket
+        self.assertEqual(self.client.post('/validate_dni', json={'dni': '1'}).status_code, 400)
+        self.assertEqual(self.client.post('/validate_dni', json={'dni': '2'}).status_code, 429)
+
+    def test_pages_are_not_limited(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get('/').status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
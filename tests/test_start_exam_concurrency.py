@@ -0,0 +1,54 @@
+import datetime
+import threading
+import unittest
+
+from sqlalchemy import text
+
+from src.exam_manager import ExamManager
+from tests.support import TEST_DATABASE_URL, PostgresConnection, postgres_engine, seed_postgres
+
+
+@unittest.skipUnless(TEST_DATABASE_URL, 'TEST_DATABASE_URL no configurada')
+class StartExamConcurrencyTest(unittest.TestCase):
+    """Many simultaneous start_exam calls for one inscription -> one row"""
+
+    WORKERS = 32
+
+    def setUp(self):
+        self.engine = postgres_engine(pool_size=self.WORKERS)
+        seed_postgres(self.engine)
+
+    def tearDown(self):
+        self.engine.dispose()
+
+    def test_concurrent_calls_converge(self):
+        manager = ExamManager.__new__(ExamManager)
+        manager.db = PostgresConnection(self.engine)
+        barrier = threading.Barrier(self.WORKERS)
+        results = []
+        errors = []
+
+        def call():
+            barrier.wait()
+            try:
+                results.append(manager.start_exam(1))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(self.WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len({r.id for r in results}), 1)
+        self.assertEqual(len({r.acceso for r in results}), 1)
+        self.assertIsInstance(results[0].acceso, datetime.datetime)
+        with self.engine.connect() as connection:
+            count = connection.execute(text("SELECT count(*) FROM acceso WHERE idins = 1")).scalar()
+        self.assertEqual(count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import datetime
+import unittest
+
+from src.records import TurnoWindow
+from src.turno_index import TurnoWindowIndex
+
+
+def window(turno_id, start, end, idtec=1, regular='COMPLETO'):
+    base = datetime.datetime(2024, 12, 1)
+    return TurnoWindow(
+        turno_id, idtec, 1, regular,
+        base + datetime.timedelta(hours=start),
+        base + datetime.timedelta(hours=end),
+        120,
+    )
+
+
+def at(hours):
+    return datetime.datetime(2024, 12, 1) + datetime.timedelta(hours=hours)
+
+
+class TurnoWindowIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = TurnoWindowIndex(max_age=60)
+        self.index.load([
+            window(1, 0, 2),
+            window(2, 10, 12),
+            window(3, 1, 30),    # long window overlapping the others
+            window(4, 11, 13),
+            window(5, 0, 50, regular='INCOMPLETO'),
+        ])
+
+    def test_sequential_windows(self):
+        self.assertEqual(self.index.open_at(1, 'COMPLETO', at(0.5)).turno_id, 1)
+        self.assertEqual(self.index.open_at(1, 'COMPLETO', at(10.5)).turno_id, 2)
+
+    def test_latest_started_overlapping_window_wins(self):
+        self.assertEqual(self.index.open_at(1, 'COMPLETO', at(1.5)).turno_id, 3)
+        self.assertEqual(self.index.open_at(1, 'COMPLETO', at(11.5)).turno_id, 4)
+
+    def test_long_window_found_behind_closed_ones(self):
+        self.assertEqual(self.index.open_at(1, 'COMPLETO', at(20)).turno_id, 3)
+
+    def test_closed_and_unknown(self):
+        self.assertIsNone(self.index.open_at(1, 'COMPLETO', at(40)))
+        self.assertIsNone(self.index.open_at(1, 'COMPLETO', at(-1)))
+        self.assertIsNone(self.index.open_at(2, 'COMPLETO', at(1)))
+
+    def test_regular_is_part_of_the_key(self):
+        self.assertEqual(self.index.open_at(1, 'INCOMPLETO', at(40)).turno_id, 5)
+
+    def test_next_after(self):
+        self.assertEqual(self.index.next_after(1, 'COMPLETO', at(5)).turno_id, 2)
+        self.assertIsNone(self.index.next_after(1, 'COMPLETO', at(12)))
+
+
+if __name__ == '__main__':
+    unittest.main()